@@ -0,0 +1,24 @@
+"""
+Measure time of conversion of usage graph to D3.js format on synthetic graph.
+
+    python benchmarks/bench_d3_format.py [links count] [modules count]
+"""
+import sys
+import time
+
+from synthetic import create_usage_graph
+
+from codegraph.vizualyzer import convert_to_d3_format
+
+
+def main(links: int = 100000, modules: int = 2000) -> None:
+    graph = create_usage_graph(links, modules)
+    started = time.perf_counter()
+    data = convert_to_d3_format(graph)
+    finished = time.perf_counter()
+    print(f"modules: {modules}, nodes: {len(data['nodes'])}, links: {len(data['links'])}")
+    print(f"convert to d3 format: {finished - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,41 @@
+"""
+Measure time of modules dependencies queries on synthetic code base.
+
+    python benchmarks/bench_dependencies.py [modules count] [queries count] [distance]
+"""
+import random
+import sys
+import tempfile
+import time
+from argparse import Namespace
+
+from synthetic import create_code_tree
+
+from codegraph.core import CodeGraph
+
+
+def main(modules: int = 1000, queries: int = 2000, distance: int = 3) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        create_code_tree(root, packages=modules // 100 or 1, modules=min(modules, 100), functions=10)
+        code_graph = CodeGraph(Namespace(paths=[root]))
+        code_graph.usage_graph()
+        paths = random.Random(0).choices(code_graph.paths_list, k=queries)
+
+        started = time.perf_counter()
+        code_graph.get_dependencies_index()
+        indexed = time.perf_counter()
+        for path in paths:
+            code_graph.get_dependencies(path, distance)
+            code_graph.get_dependents(path, distance)
+        finished = time.perf_counter()
+        code_graph.get_dependencies_many(paths, distance)
+        batched = time.perf_counter()
+
+    print(f"modules: {len(code_graph.paths_list)}, queries: {queries}, distance: {distance}")
+    print(f"index: {indexed - started:.3f}s")
+    print(f"single queries (dependencies + dependents): {finished - indexed:.3f}s")
+    print(f"one batched query: {batched - finished:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,42 @@
+"""
+Compare linear scan of entities lines with LinesIndex on synthetic module with many functions.
+
+    python benchmarks/bench_entity_lookup.py [functions count] [usages count]
+"""
+import random
+import sys
+import time
+
+from codegraph.core import LinesIndex
+
+
+def linear_find(entities_lines, line):
+    for entity in entities_lines:
+        if entity[0] <= line <= entity[1]:
+            return entities_lines[entity]
+    return None
+
+
+def main(functions: int = 5000, usages: int = 20000) -> None:
+    # each function is 5 lines with 2 empty lines between functions
+    entities_lines = {(i * 7 + 1, i * 7 + 5): f"func_{i}" for i in range(functions)}
+    rnd = random.Random(0)
+    lines = [rnd.randrange(1, functions * 7) for _ in range(usages)]
+
+    started = time.perf_counter()
+    expected = [linear_find(entities_lines, line) for line in lines]
+    linear_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = LinesIndex(entities_lines)
+    result = [index.find(line) for line in lines]
+    index_time = time.perf_counter() - started
+
+    assert result == expected
+    print(f"functions: {functions}, usages: {usages}")
+    print(f"linear scan: {linear_time:.3f}s")
+    print(f"lines index (with build): {index_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,48 @@
+"""
+Count file reads and time of building usage graph on synthetic code base.
+
+Each module must be read from disk once: source is decoded once and used
+both for parsing and for search of entities usage.
+
+    python benchmarks/bench_file_reads.py [modules count]
+"""
+import sys
+import tempfile
+import time
+from argparse import Namespace
+
+from synthetic import create_code_tree
+
+from codegraph import core
+
+
+def main(modules: int = 2000) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        paths = create_code_tree(root, packages=modules // 100 or 1, modules=min(modules, 100))
+        reads = []
+        read_bytes = 0
+        read_content_with_stat = core.read_content_with_stat
+
+        def counted_read(path):
+            nonlocal read_bytes
+            content, stat = read_content_with_stat(path)
+            reads.append(path)
+            read_bytes += len(content)
+            return content, stat
+
+        core.read_content_with_stat = counted_read
+        try:
+            started = time.perf_counter()
+            core.CodeGraph(Namespace(paths=[root])).usage_graph()
+            elapsed = time.perf_counter() - started
+        finally:
+            core.read_content_with_stat = read_content_with_stat
+
+        print(f"modules: {len(paths)}")
+        print(f"file reads: {len(reads)} ({len(reads) / len(paths):.2f} per module)")
+        print(f"bytes read: {read_bytes}")
+        print(f"usage graph built in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,40 @@
+"""
+Measure time of CodeGraph.save() and CodeGraph.load() on synthetic code base.
+
+    python benchmarks/bench_graph_state.py [modules count]
+"""
+import os
+import sys
+import tempfile
+import time
+from argparse import Namespace
+
+from synthetic import create_code_tree
+
+from codegraph.core import CodeGraph
+
+
+def main(modules: int = 10000) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        code_dir = os.path.join(root, "code")
+        create_code_tree(code_dir, packages=modules // 100 or 1, modules=min(modules, 100), functions=10)
+        code_graph = CodeGraph(Namespace(paths=[code_dir]))
+        graph = code_graph.usage_graph()
+        path = os.path.join(root, "graph.cgstate")
+
+        started = time.perf_counter()
+        code_graph.save(path)
+        saved = time.perf_counter()
+        loaded_graph = CodeGraph.load(path)
+        loaded = time.perf_counter()
+        size = os.path.getsize(path)
+
+    assert loaded_graph.usage_graph() == graph
+    links = sum(len(used) for entities in graph.values() for used in entities.values())
+    print(f"modules: {len(graph)}, links: {links}, file size: {size / 1024 / 1024:.1f} MB")
+    print(f"save: {saved - started:.3f}s")
+    print(f"load: {loaded - saved:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
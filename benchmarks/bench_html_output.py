@@ -0,0 +1,41 @@
+"""
+Measure size, time and peak memory of HTML output with default, compact and compressed embedding of graph data.
+
+    python benchmarks/bench_html_output.py [links count] [modules count]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import create_usage_graph
+
+from codegraph.vizualyzer import draw_graph
+
+
+def measure(graph: dict, output_path: str, mode: str, **options) -> None:
+    started = time.perf_counter()
+    draw_graph(graph, output_path=output_path, open_browser=False, **options)
+    finished = time.perf_counter()
+    # second run to measure memory, tracing slows down generation
+    tracemalloc.start()
+    draw_graph(graph, output_path=output_path, open_browser=False, **options)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(output_path) / 2**20
+    print(f"{mode}: {finished - started:.2f}s, file: {size:.1f} MB, peak memory: {peak / 2**20:.1f} MB")
+
+
+def main(links: int = 100000, modules: int = 2000) -> None:
+    graph = create_usage_graph(links, modules)
+    print(f"modules: {modules}, links: {links}")
+    with tempfile.TemporaryDirectory() as root:
+        output_path = os.path.join(root, "codegraph.html")
+        measure(graph, output_path, "default")
+        measure(graph, output_path, "compact", compact=True)
+        measure(graph, output_path, "compact + compress", compact=True, compress=True)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,42 @@
+"""
+Measure time of writing of graph to SQLite store and of entities query on synthetic code base.
+
+    python benchmarks/bench_store.py [modules count] [min links in]
+"""
+import os
+import sys
+import tempfile
+import time
+from argparse import Namespace
+
+from synthetic import create_code_tree
+
+from codegraph.core import CodeGraph
+from codegraph.store import GraphStore
+
+
+def main(modules: int = 10000, min_links_in: int = 30) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        code_dir = os.path.join(root, "code")
+        create_code_tree(code_dir, packages=modules // 100 or 1, modules=min(modules, 100), functions=10)
+        code_graph = CodeGraph(Namespace(paths=[code_dir]))
+        graph = code_graph.usage_graph()
+        metadata = code_graph.get_entity_metadata()
+
+        with GraphStore(os.path.join(root, "graph.sqlite")) as store:
+            started = time.perf_counter()
+            store.write(graph, metadata, code_graph.imports)
+            written = time.perf_counter()
+            store.write(graph, metadata, code_graph.imports)
+            rewritten = time.perf_counter()
+            found = store.find_entities("function", min_lines=4, min_links_in=min_links_in)
+            queried = time.perf_counter()
+
+    print(f"modules: {len(graph)}, entities found: {len(found)}")
+    print(f"write: {written - started:.3f}s")
+    print(f"write without changes: {rewritten - written:.3f}s")
+    print(f"query: {queried - rewritten:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
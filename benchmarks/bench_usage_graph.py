@@ -0,0 +1,32 @@
+"""
+Measure time of parsing and building usage graph on synthetic code base.
+
+    python benchmarks/bench_usage_graph.py [modules count] [functions per module]
+"""
+import sys
+import tempfile
+import time
+from argparse import Namespace
+
+from synthetic import create_code_tree
+
+from codegraph.core import CodeGraph
+
+
+def main(modules: int = 1000, functions: int = 40) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        create_code_tree(root, packages=modules // 100 or 1, modules=min(modules, 100), functions=functions)
+        started = time.perf_counter()
+        code_graph = CodeGraph(Namespace(paths=[root]))
+        parsed = time.perf_counter()
+        graph = code_graph.usage_graph()
+        finished = time.perf_counter()
+
+    edges = sum(len(deps) for module in graph.values() for deps in module.values())
+    print(f"modules: {len(graph)}, edges: {edges}")
+    print(f"parsing: {parsed - started:.2f}s")
+    print(f"usage graph: {finished - parsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,62 @@
+"""generate synthetic code base and usage graph for benchmarks"""
+import os
+import random
+from typing import List, Text
+
+
+def create_code_tree(
+    root: Text, packages: int = 10, modules: int = 50, functions: int = 20, imports: int = 3, seed: int = 0
+) -> List[Text]:
+    """
+        create packages with modules, each function calls functions from imported modules
+    :return: list of paths to created modules
+    """
+    rnd = random.Random(seed)
+    names = [(f"pkg_{p}", f"mod_{p}_{m}") for p in range(packages) for m in range(modules)]
+    paths = []
+    for package, module in names:
+        package_dir = os.path.join(root, package)
+        os.makedirs(package_dir, exist_ok=True)
+        imported = rnd.sample(names, min(imports, len(names)))
+        lines = [f"from {imp_package} import {imp_module}" for imp_package, imp_module in imported]
+        lines.append("")
+        for func in range(functions):
+            imp_package, imp_module = rnd.choice(imported)
+            lines += [
+                "",
+                f"def func_{func}(value):",
+                f'    """function {func} of {module}"""',
+                f"    result = {imp_module}.func_{rnd.randrange(functions)}(value)",
+                f"    return func_{rnd.randrange(functions)}(result) if value else result",
+                "",
+            ]
+        path = os.path.join(package_dir, f"{module}.py")
+        with open(path, "w") as module_file:
+            module_file.write("\n".join(lines))
+        paths.append(path)
+    return paths
+
+
+def create_usage_graph(links: int, modules: int, seed: int = 0) -> dict:
+    """
+    usage graph with ``links`` dependencies, 25 entities per module: most of entities names are unique,
+    ``helper`` is defined in each module
+    """
+    rnd = random.Random(seed)
+    entities = 25
+    deps_per_entity = max(1, links // (modules * entities))
+    graph = {}
+    for module in range(modules):
+        module_entities = {f"func_{module}_{entity}": [] for entity in range(entities - 1)}
+        module_entities["helper"] = []
+        for deps in module_entities.values():
+            for _ in range(deps_per_entity):
+                used_module = rnd.randrange(modules)
+                if rnd.random() < 0.1:
+                    deps.append(f"module_{used_module}.helper")
+                elif used_module == module:
+                    deps.append(f"func_{module}_{rnd.randrange(entities - 1)}")
+                else:
+                    deps.append(f"module_{used_module}.func_{used_module}_{rnd.randrange(entities - 1)}")
+        graph[f"/code/pkg_{module % 10}/module_{module}.py"] = module_entities
+    return graph
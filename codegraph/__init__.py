@@ -1 +1,3 @@
 __version__ = "1.2.0"
+
+from codegraph.graph_file import load_graph  # noqa: E402, F401
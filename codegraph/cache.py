@@ -0,0 +1,169 @@
+"""persistent on-disk cache for parsed modules, to not re-parse unchanged files between runs"""
+import hashlib
+import json
+import logging
+import os
+from typing import List, Optional, Text, Tuple
+
+from codegraph import __version__
+from codegraph.parser import AsyncFunction, Class, Function, Import
+
+logger = logging.getLogger(__name__)
+
+
+def get_default_cache_dir() -> Text:
+    """per-user cache folder, it is out of analyzed code base, so entries can't come with checkout of code"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "codegraph")
+
+
+DEFAULT_CACHE_DIR = get_default_cache_dir()
+# 256 MB
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+ENTRY_SUFFIX = ".json"
+OBJECT_TYPES = {"function": Function, "async_function": AsyncFunction, "class": Class}
+OBJECT_TYPES_NAMES = {object_type: name for name, object_type in OBJECT_TYPES.items()}
+
+
+def get_content_hash(content: bytes) -> Text:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def read_content_with_stat(path: Text) -> Tuple[bytes, os.stat_result]:
+    """content of file and its stat taken from the same open file, so they match if file is changed meanwhile"""
+    with open(path, "rb") as file_read:
+        stat = os.fstat(file_read.fileno())
+        return file_read.read(), stat
+
+
+def dump_objects(objects: List) -> List:
+    """
+        parsed objects of module as JSON data: [type, name, lineno, endno, base classes] for classes and functions,
+        ["import", imported names] for Import. Nested functions and methods are not stored,
+        graph is built only from top level objects
+    """
+    data = []
+    for obj in objects:
+        if isinstance(obj, Import):
+            data.append(["import", sorted(obj.modules)])
+        else:
+            data.append([OBJECT_TYPES_NAMES[type(obj)], obj.name, obj.lineno, obj.endno, getattr(obj, "super", None)])
+    return data
+
+
+def load_objects(data: List, file_name: Text) -> List:
+    objects = []
+    for item in data:
+        if item[0] == "import":
+            objects.append(Import(item[1]))
+            continue
+        object_type, name, lineno, endno, bases = item
+        if object_type == "class":
+            obj = Class(name, bases, file_name, lineno)
+        else:
+            obj = OBJECT_TYPES[object_type](name, file_name, lineno)
+        obj.endno = endno
+        objects.append(obj)
+    return objects
+
+
+class ParseCache:
+    """
+    Store result of parser.create_objects_array for each module in separate JSON file
+    (no pickle, so entries can't run code if cache folder is not trusted).
+
+    Entry is valid if path, mtime & size of module and codegraph version are the same,
+    if mtime or size changed (for example, after git checkout) - content hash is compared.
+    When size of cache dir exceeds max_size - least recently used entries are removed.
+    """
+
+    def __init__(self, cache_dir: Text = DEFAULT_CACHE_DIR, max_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_path(self, path: Text) -> Text:
+        key = hashlib.blake2b(f"{__version__}:{path}".encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def read_entry(self, entry_path: Text) -> Optional[dict]:
+        try:
+            with open(entry_path, encoding="utf-8") as entry_file:
+                return json.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # broken or incompatible entry - will be overwritten
+            logger.debug(f"Can not read cache entry {entry_path}: {e}")
+            return None
+
+    def write_entry(self, entry_path: Text, entry: dict) -> None:
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as entry_file:
+            json.dump(entry, entry_file, separators=(",", ":"))
+        os.replace(tmp_path, entry_path)
+
+    def get(self, path: Text, content: bytes = None, stat: os.stat_result = None) -> Optional[List]:
+        """
+            return parsed objects for module or None if there is no valid entry
+        :param content: content of module if it is already read, to not read it again to compare hash
+        :param stat: stat of module taken when content was read (read_content_with_stat())
+        """
+        entry_path = self.entry_path(path)
+        entry = self.read_entry(entry_path)
+        if not isinstance(entry, dict) or entry.get("version") != __version__ or entry.get("path") != path:
+            return None
+        if content is None or stat is None:
+            content, stat = read_content_with_stat(path)
+        if entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            if entry["size"] != stat.st_size:
+                return None
+            if entry["hash"] != get_content_hash(content):
+                return None
+            entry["mtime"] = stat.st_mtime_ns
+            self.write_entry(entry_path, entry)
+        else:
+            # mark entry as recently used
+            os.utime(entry_path)
+        try:
+            return load_objects(entry["objects"], os.path.basename(path))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug(f"Can not read cache entry {entry_path}: {e}")
+            return None
+
+    def set(self, path: Text, objects: List, content: bytes = None, stat: os.stat_result = None) -> None:
+        """
+        :param content: content of module that was parsed to objects
+        :param stat: stat of module taken when content was read, if it is taken later - mtime of changed file
+            can be stored with objects of previous content
+        """
+        if content is None or stat is None:
+            content, stat = read_content_with_stat(path)
+        entry = {
+            "version": __version__,
+            "path": path,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": get_content_hash(content),
+            "objects": dump_objects(objects),
+        }
+        self.write_entry(self.entry_path(path), entry)
+
+    def evict(self) -> None:
+        """remove least recently used entries until cache size is not bigger than max_size"""
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if dir_entry.is_file() and dir_entry.name.endswith(ENTRY_SUFFIX):
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, dir_entry.path))
+                    total_size += stat.st_size
+        if total_size <= self.max_size:
+            return
+        for _, size, entry_path in sorted(entries):
+            os.remove(entry_path)
+            total_size -= size
+            if total_size <= self.max_size:
+                break
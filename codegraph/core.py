@@ -1,47 +1,139 @@
 import logging
 import os
+import re
 from argparse import Namespace
-from collections import defaultdict, deque
-from typing import Dict, List, Set, Text, Tuple
-
+from bisect import bisect_right, insort
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import decode_source
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Text, Tuple
+
+from codegraph.cache import ParseCache, read_content_with_stat
 from codegraph.parser import Import, create_objects_array
 from codegraph.utils import get_python_paths_list
 
 logger = logging.getLogger(__name__)
 
-aliases = {}
+# name with attribute access chain, e.g. module.Class.method, group 1 - "(" if it is called
+NAME_CHAIN_RE = re.compile(r"[^\W\d]\w*(?:\.[^\W\d]\w*)*(\()?")
 
 
-def read_file_content(path: Text) -> Text:
-    with open(path, "r+") as file_read:
+def read_file_bytes(path: Text) -> bytes:
+    with open(path, "rb") as file_read:
         return file_read.read()
 
 
+def read_file_content(path: Text) -> Text:
+    return decode_source(read_file_bytes(path))
+
+
+def parse_source(path: Text, source: Text) -> List:
+    """parse module source to get objects array"""
+    return create_objects_array(source=source, fname=os.path.basename(path))
+
+
 def parse_code_file(path: Text) -> List:
     """read module source and parse to get objects array"""
-    source = read_file_content(path)
-    parsed_module = create_objects_array(source=source, fname=os.path.basename(path))
-    return parsed_module
+    return parse_source(path, read_file_content(path))
+
+
+def get_jobs_count(jobs: int) -> int:
+    """return count of worker processes to use, 0 or less - mean all available CPUs"""
+    if not jobs or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def get_chunk_size(paths_count: int, jobs: int) -> int:
+    """split files to ~4 batches per worker to balance load without too many round trips"""
+    return max(1, paths_count // (jobs * 4))
+
+
+def parse_code_files(paths_list: List, sources: Dict, jobs: int = 1) -> List:
+    """parse code files, in parallel processes if jobs > 1, return list in order of paths_list"""
+    jobs = min(get_jobs_count(jobs), len(paths_list))
+    if jobs <= 1:
+        return [parse_source(path, sources[path]) for path in paths_list]
+    # executor.map returns results in order of paths_list,
+    # so output is the same as in serial mode
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(
+                parse_source,
+                paths_list,
+                [sources[path] for path in paths_list],
+                chunksize=get_chunk_size(len(paths_list), jobs),
+            )
+        )
 
 
-def get_code_objects(paths_list: List) -> Dict:
+def load_modules(paths_list: List, jobs: int = 1, cache: ParseCache = None) -> Tuple[Dict, Dict]:
     """
-        get all code files data for paths list
+        read each code file once and parse it,
+        same decoded source is used later to search entities usage
     :param paths_list: list with paths to code files to parse
-    :return:
+    :param jobs: count of processes to parse files in parallel, 0 - use all CPUs
+    :param cache: parse cache, only modules without valid cache entry will be parsed
+    :return: sources of modules, parsed objects of modules
     """
+    sources = {}
     all_data = {}
+    contents = {}
+    stats = {}
     for path in paths_list:
-        content = parse_code_file(path)
+        contents[path], stats[path] = read_content_with_stat(path)
+        sources[path] = decode_source(contents[path])
+        if cache is not None:
+            content = cache.get(path, contents[path], stats[path])
+            if content is not None:
+                all_data[path] = content
+    to_parse = [path for path in paths_list if path not in all_data]
+    logger.debug(f"Modules to parse: {len(to_parse)}, from cache: {len(all_data)}")
+    for path, content in zip(to_parse, parse_code_files(to_parse, sources, jobs=jobs)):
         all_data[path] = content
-    return all_data
+        if cache is not None:
+            cache.set(path, content, contents[path], stats[path])
+    if cache is not None and to_parse:
+        cache.evict()
+    return sources, {path: all_data[path] for path in paths_list}
+
+
+def get_code_objects(paths_list: List, jobs: int = 1, cache: ParseCache = None) -> Dict:
+    """
+        get all code files data for paths list
+    :param paths_list: list with paths to code files to parse
+    :param jobs: count of processes to parse files in parallel, 0 - use all CPUs
+    :param cache: parse cache, only modules without valid cache entry will be parsed
+    :return:
+    """
+    return load_modules(paths_list, jobs=jobs, cache=cache)[1]
 
 
 class CodeGraph:
-    def __init__(self, args: Namespace):
-        self.paths_list = get_python_paths_list(args.paths)
-        # get py modules list data
-        self.modules_data = get_code_objects(self.paths_list)
+    def __init__(self, args: Namespace, jobs: int = None):
+        if jobs is None:
+            jobs = getattr(args, "jobs", 1)
+        self.jobs = jobs
+        cache_dir = getattr(args, "cache_dir", None)
+        self.cache = ParseCache(cache_dir) if cache_dir else None
+        self.paths_list = get_python_paths_list(
+            args.paths,
+            exclude=getattr(args, "exclude", None) or (),
+            include=getattr(args, "include", None) or (),
+            jobs=get_jobs_count(self.jobs),
+        )
+        # get py modules list data, sources are kept to search entities usage without reading files again
+        self.sources, self.modules_data = load_modules(self.paths_list, jobs=self.jobs, cache=self.cache)
+        # imported names of each module, stored separately from entities
+        self.raw_imports = extract_imports(self.modules_data)
+        self.modules_index = ModulesIndex(self.paths_list)
+        # state of last usage_graph() call, used to update graph incrementally
+        self.entities_lines = None
+        self.imports = None
+        self.dependencies = None
+        # modules adjacency built from graph on first dependencies query
+        self.dependencies_index = None
 
     def get_lines_numbers(self):
         """
@@ -91,71 +183,298 @@ class CodeGraph:
                 }
         return data
 
-    def usage_graph(self) -> Dict:
+    def usage_graph(self, rebuild: bool = False) -> Dict:
         """
             module name: function
+            graph is built once and kept on instance, next calls return the same graph,
+            CodeGraph.update() patches it when modules are changed
+        :param rebuild: build graph from scratch even if it was already built
         :return:
         """
-        entities_lines, imports, modules_names_map = get_imports_and_entities_lines(
-            self.modules_data
+        if self.dependencies is not None and not rebuild:
+            return self.dependencies
+        entities_lines, imports = get_imports_and_entities_lines(
+            self.modules_data, self.raw_imports, self.get_modules_index()
         )
-        entities_usage_in_modules = collect_entities_usage_in_modules(
-            self.modules_data, imports, modules_names_map
-        )
-        # create edges
         dependencies = defaultdict(dict)
-        for module in entities_usage_in_modules:
-            dependencies[module] = defaultdict(list)
-            for method_that_used in entities_usage_in_modules[module]:
-                method_usage_lines = entities_usage_in_modules[module][method_that_used]
-                for method_usage_line in method_usage_lines:
-                    for entity in entities_lines[module]:
-                        if entity[0] <= method_usage_line <= entity[1]:
-                            dependencies[module][entities_lines[module][entity]].append(
-                                method_that_used
-                            )
-                            break
-                    else:
-                        # mean in global of module
-                        dependencies[module]["_"].append(method_that_used)
-        dependencies = populate_free_nodes(self.modules_data, dependencies, imports, modules_names_map)
+        for module in self.modules_data:
+            dependencies[module] = get_module_dependencies(
+                module, self.modules_data, imports, entities_lines, self.get_source(module)
+            )
+        self.entities_lines = entities_lines
+        self.imports = imports
+        self.dependencies = dependencies
+        self.dependencies_index = None
         return dependencies
 
-    def get_dependencies(self, file_path: str, distance: int) -> Dict[str, Set[str]]:
+    def update(self, changed: Iterable[Text] = (), deleted: Iterable[Text] = ()) -> Dict:
+        """
+            re-parse changed (or added) modules, remove deleted modules and re-build usage graph
+            only for affected modules: changed modules and modules that import them.
+            Graph from previous usage_graph() call is patched in place.
+        :param changed: paths to changed or added python modules
+        :param deleted: paths to deleted python modules
+        :return: usage graph, same as usage_graph() returns
+        """
+        modules_index = self.get_modules_index()
+        changed = [Path(path).absolute().as_posix() for path in changed]
+        deleted = [Path(path).absolute().as_posix() for path in deleted]
+        added = [path for path in changed if path not in self.modules_data]
+        deleted = [path for path in deleted if path in self.modules_data]
+        # changed modules are parsed before any state is changed, so if parsing fails graph stays consistent
+        changed_sources, changed_data = load_modules(changed, jobs=self.jobs, cache=self.cache)
+        changed_imports = extract_imports(changed_data)
+        for path in deleted:
+            self.paths_list.remove(path)
+            del self.modules_data[path]
+            if self.sources is not None:
+                del self.sources[path]
+            self.raw_imports.pop(path, None)
+            modules_index.remove(path)
+        for path, objects in changed_data.items():
+            if path not in self.modules_data:
+                # paths are kept sorted, so updated graph has the same order of modules as graph built from scratch
+                insort(self.paths_list, path)
+                modules_index.add(path)
+            self.modules_data[path] = objects
+            if self.sources is not None:
+                self.sources[path] = changed_sources[path]
+            self.raw_imports.pop(path, None)
+            if path in changed_imports:
+                self.raw_imports[path] = changed_imports[path]
+        if added:
+            reorder(self.modules_data, self.paths_list)
+
+        if self.dependencies is None:
+            return self.usage_graph()
+        if self.entities_lines is None:
+            # graph loaded with load() has no entities lines, they are taken from parsed entities
+            self.entities_lines = defaultdict(dict)
+            for path, objects in self.modules_data.items():
+                self.entities_lines[path] = get_entities_lines(objects)
+
+        for path in deleted:
+            for data in (self.entities_lines, self.imports, self.dependencies):
+                data.pop(path, None)
+        affected = get_affected_modules(changed, self.raw_imports, self.imports, added + deleted)
+        affected.update(changed)
+        logger.debug(f"Modules affected by changes: {len(affected)}")
+        affected = [path for path in self.modules_data if path in affected]
+        for path in affected:
+            self.entities_lines[path] = get_entities_lines(self.modules_data[path])
+            self.imports[path] = get_module_imports(path, self.raw_imports.get(path, ()), modules_index)
+        for path in affected:
+            self.dependencies[path] = get_module_dependencies(
+                path, self.modules_data, self.imports, self.entities_lines, self.get_source(path)
+            )
+        if added:
+            for data in (self.entities_lines, self.imports, self.dependencies):
+                reorder(data, self.paths_list)
+        if self.dependencies_index is not None:
+            for path in deleted:
+                self.dependencies_index.remove(path)
+            for path in affected:
+                self.dependencies_index.set(path, self.dependencies[path], self.imports.get(path, ()))
+        return self.dependencies
+
+    def get_source(self, path: Text) -> Text:
+        """source of module, graph loaded with load() has no sources, they are read from disk when needed"""
+        if self.sources is None:
+            return read_file_content(path)
+        return self.sources[path]
+
+    def get_modules_index(self) -> "ModulesIndex":
+        """index of modules to resolve imports, graph loaded with load() builds it on first update"""
+        if self.modules_index is None:
+            self.modules_index = ModulesIndex(self.paths_list)
+        return self.modules_index
+
+    def save(self, path: Text) -> None:
+        """
+            write parsed entities, resolved imports and usage graph to binary file (see codegraph.graph_state),
+            graph is built if it was not built yet
+        """
+        from codegraph.graph_state import write_graph_state
+
+        dependencies = self.usage_graph()
+        write_graph_state(path, self.paths_list, self.modules_data, dependencies, self.imports, self.raw_imports)
+
+    @classmethod
+    def load(cls, path: Text) -> "CodeGraph":
+        """
+            CodeGraph saved with save(), code base is not read or parsed. usage_graph(), get_entity_metadata(),
+            get_dependencies() and other queries work as on original graph. Modules sources are not saved,
+            update() reads only sources of affected modules from disk (rebuild of graph - of all modules)
+        """
+        from codegraph.graph_state import read_graph_state
+
+        code_graph = cls.__new__(cls)
+        code_graph.jobs = 1
+        code_graph.cache = None
+        (
+            code_graph.paths_list,
+            code_graph.modules_data,
+            code_graph.dependencies,
+            code_graph.imports,
+            code_graph.raw_imports,
+        ) = read_graph_state(path)
+        code_graph.sources = None
+        code_graph.modules_index = None
+        code_graph.entities_lines = None
+        code_graph.dependencies_index = None
+        return code_graph
+
+    def get_dependencies_index(self) -> "DependenciesIndex":
+        """modules adjacency index, built once from usage graph and patched by update()"""
+        if self.dependencies_index is None:
+            graph = self.usage_graph()
+            self.dependencies_index = DependenciesIndex(graph, self.imports)
+        return self.dependencies_index
+
+    def get_dependencies(self, file_path: str, distance: int) -> Dict[int, Set[str]]:
         """
         Get dependencies that are 'distance' nodes away from the given file.
 
         :param file_path: Path of the file to start from
         :param distance: Number of edges to traverse
-        :return: Dictionary with distances as keys and sets of dependent files as values
+        :return: Dictionary with distances as keys and sets of paths of dependency modules as values
         """
-        dependencies = {i: set() for i in range(1, distance + 1)}
-        graph = self.usage_graph()
+        return self.get_dependencies_many([file_path], distance)
 
-        if file_path not in graph:
-            return dependencies
+    def get_dependencies_many(self, file_paths: Iterable[str], distance: int) -> Dict[int, Set[str]]:
+        """
+        Get dependencies of several files with one BFS: each module is reported once,
+        with the shortest distance from any of the given files.
 
-        queue = deque([(file_path, 0)])
-        visited = set()
+        :param file_paths: Paths of the files to start from
+        :param distance: Number of edges to traverse
+        :return: Dictionary with distances as keys and sets of paths of dependency modules as values
+        """
+        return self.get_dependencies_index().bfs(file_paths, distance)
 
-        while queue:
-            current_file, current_distance = queue.popleft()
+    def get_dependents(self, file_path: str, distance: int) -> Dict[int, Set[str]]:
+        """
+        Get modules that depend on the given file directly (distance 1) or through other modules.
 
-            if current_distance >= distance:
+        :param file_path: Path of the file
+        :param distance: Number of edges to traverse
+        :return: Dictionary with distances as keys and sets of paths of dependent modules as values
+        """
+        return self.get_dependents_many([file_path], distance)
+
+    def get_dependents_many(self, file_paths: Iterable[str], distance: int) -> Dict[int, Set[str]]:
+        """
+        Get modules that depend on any of the given files, with one BFS over reverse edges.
+
+        :param file_paths: Paths of the files
+        :param distance: Number of edges to traverse
+        :return: Dictionary with distances as keys and sets of paths of dependent modules as values
+        """
+        return self.get_dependencies_index().bfs(file_paths, distance, reverse=True)
+
+    def get_affected_graph(
+        self, file_paths: Iterable[str], distance: int = 1, deleted_paths: Iterable[str] = ()
+    ) -> Dict:
+        """
+        Part of usage graph with the given modules, modules they depend on and modules that depend on them.
+
+        :param file_paths: Paths of the files (e.g. changed in diff), files out of code base are skipped
+        :param distance: Number of edges to traverse from the given files in both directions
+        :param deleted_paths: Paths of deleted files, modules that imported them are taken as their dependents
+            at distance 1
+        :return: Usage graph with only affected modules
+        """
+        graph = self.usage_graph()
+        paths = {Path(path).absolute().as_posix() for path in file_paths} & graph.keys()
+        affected = set(paths)
+        seeds = [(paths, distance)]
+        deleted_paths = [Path(path).absolute().as_posix() for path in deleted_paths]
+        if deleted_paths:
+            # deleted modules are not in graph, so their dependents are found by imported names
+            dependents = get_affected_modules((), self.raw_imports, self.imports, deleted_paths) & graph.keys()
+            affected |= dependents
+            seeds.append((dependents, distance - 1))
+        for seed_paths, seed_distance in seeds:
+            if not seed_paths or seed_distance < 1:
                 continue
+            for levels in (
+                self.get_dependencies_many(seed_paths, seed_distance),
+                self.get_dependents_many(seed_paths, seed_distance),
+            ):
+                for level_paths in levels.values():
+                    affected |= level_paths
+        return {path: entities for path, entities in graph.items() if path in affected}
 
-            if current_file not in visited:
-                visited.add(current_file)
 
-                for entity, used_entities in graph[current_file].items():
-                    for used_entity in used_entities:
-                        if "." in used_entity:
-                            dependent_file = used_entity.split(".")[0] + ".py"
-                            if dependent_file != current_file:
-                                dependencies[current_distance + 1].add(dependent_file)
-                                queue.append((dependent_file, current_distance + 1))
+class DependenciesIndex:
+    """
+    Module level adjacency of usage graph: forward (module -> modules it uses)
+    and reverse (module -> modules that use it) edges as sets of paths.
+    """
 
-        return dependencies
+    def __init__(self, graph: Dict = None, imports: Dict = None):
+        self.forward = defaultdict(set)
+        self.reverse = defaultdict(set)
+        imports = imports or {}
+        for path, entities in (graph or {}).items():
+            self.set(path, entities, imports.get(path, ()))
+
+    @staticmethod
+    def get_used_modules(path: Text, entities: Dict, imports: Iterable[Text]) -> Set[Text]:
+        """paths of imported modules that are used in graph edges of module ("module.entity" or "module._")"""
+        names = defaultdict(list)
+        for import_path in imports:
+            names[get_module_name(import_path)].append(import_path)
+        used = set()
+        for used_entities in entities.values():
+            for used_entity in used_entities:
+                if "." in used_entity:
+                    used.update(names.get(used_entity.split(".", 1)[0], ()))
+        used.discard(path)
+        return used
+
+    def set(self, path: Text, entities: Dict, imports: Iterable[Text]) -> None:
+        """replace edges of module with edges from its graph entities"""
+        for used in self.forward.pop(path, ()):
+            self.reverse[used].discard(path)
+        used_modules = self.get_used_modules(path, entities, imports)
+        self.forward[path] = used_modules
+        for used in used_modules:
+            self.reverse[used].add(path)
+
+    def remove(self, path: Text) -> None:
+        for used in self.forward.pop(path, ()):
+            self.reverse[used].discard(path)
+        for user in self.reverse.pop(path, ()):
+            self.forward[user].discard(path)
+
+    def bfs(self, paths: Iterable[Text], distance: int, reverse: bool = False) -> Dict[int, Set[Text]]:
+        """
+            multi-source BFS over forward (or reverse) edges
+        :return: {distance: set of modules paths}, each module is reported only with its shortest distance
+        """
+        adjacency = self.reverse if reverse else self.forward
+        levels = {i: set() for i in range(1, distance + 1)}
+        frontier = {Path(path).absolute().as_posix() for path in paths}
+        visited = set(frontier)
+        for level in range(1, distance + 1):
+            next_frontier = set()
+            for path in frontier:
+                next_frontier.update(adjacency.get(path, ()))
+            next_frontier -= visited
+            if not next_frontier:
+                break
+            levels[level] = next_frontier
+            visited |= next_frontier
+            frontier = next_frontier
+        return levels
+
+
+def reorder(data: Dict, paths: List[Text]) -> None:
+    """put keys of dict in order of paths in place, dict keeps its type (e.g. defaultdict)"""
+    items = {path: data[path] for path in paths if path in data}
+    data.clear()
+    data.update(items)
 
 
 def get_module_name(code_path: Text) -> Text:
@@ -170,208 +489,393 @@ def module_name_in_imports(imports: List, module_name: Text) -> bool:
     return False
 
 
-def get_imports_and_entities_lines(  # noqa: C901
-    code_objects: Dict,
-) -> Tuple[Dict, Dict, Dict]:
-    # todo: need to do optimization
+def extract_imports(code_objects: Dict) -> Dict:
+    """
+        remove Import objects from parsed modules
+    :return: {module_path: set of imported names}
+    """
+    modules_imports = {}
+    for path, objects in code_objects.items():
+        if objects and isinstance(objects[-1], Import):
+            modules_imports[path] = objects.pop(-1).modules
+    return modules_imports
+
+
+class ModulesIndex:
+    """
+    Index of code base modules to resolve imported names to modules paths without scan of all modules.
+    Modules with the same name from different packages are resolved by dotted name of import
+    ("pkg_a.utils" -> ".../pkg_a/utils.py") or by relative import ("from . import utils"),
+    if it is not enough - module closest to importing module is used.
+    """
+
+    def __init__(self, paths: Iterable[Text]):
+        self.paths = set()
+        # module name: paths of modules with this name
+        self.modules = defaultdict(list)
+        # package name: paths of __init__.py of packages with this name
+        self.packages = defaultdict(list)
+        # dotted name ("pkg.module", "module", "pkg"): paths of modules and __init__.py
+        self.dotted = defaultdict(list)
+        for path in paths:
+            self.add(path)
+
+    @staticmethod
+    def split_path(path: Text) -> Tuple[List[Text], bool]:
+        """return parts of path without .py extension (and __init__), True if it is package"""
+        parts = path[: -len(".py")].split("/")
+        if parts[-1] == "__init__":
+            return parts[:-1], True
+        return parts, False
+
+    def add(self, path: Text) -> None:
+        if path in self.paths:
+            return
+        self.paths.add(path)
+        parts, package = self.split_path(path)
+        (self.packages if package else self.modules)[parts[-1]].append(path)
+        for i in range(1, len(parts)):
+            self.dotted[".".join(parts[i:])].append(path)
+
+    def remove(self, path: Text) -> None:
+        if path not in self.paths:
+            return
+        self.paths.remove(path)
+        parts, package = self.split_path(path)
+        names = self.packages if package else self.modules
+        names[parts[-1]].remove(path)
+        if not names[parts[-1]]:
+            del names[parts[-1]]
+        for i in range(1, len(parts)):
+            key = ".".join(parts[i:])
+            self.dotted[key].remove(path)
+            if not self.dotted[key]:
+                del self.dotted[key]
+
+    def resolve(self, path: Text, import_: Text) -> Optional[Text]:
+        """
+            return path of module (or package __init__.py) from code base that is imported
+        :param path: path of importing module
+        :param import_: imported name as it is collected by parser, e.g. "pkg.module.func as f"
+        """
+        parts = import_.split(" as ")[0].split(".")
+        names = [part for part in parts if part]
+        if len(names) < len(parts):
+            resolved = self.resolve_relative(path, names, len(parts) - len(names))
+            if resolved:
+                return resolved
+        # Try each part from right to left to find a module match
+        # e.g., simple_ddl_parser.output.dialects.dialect_by_name
+        # -> try: dialect_by_name (no), dialects (yes!)
+        for i in range(len(names) - 1, -1, -1):
+            candidate = names[i]
+            resolved = None
+            if candidate in self.modules:
+                resolved = self.choose(path, self.modules[candidate], names[: i + 1])
+            # Check for __init__.py - if the candidate is a package name
+            # e.g., from simple_ddl_parser import X -> simple_ddl_parser/__init__.py
+            if resolved is None and candidate in self.packages:
+                resolved = self.choose(path, self.packages[candidate], names[: i + 1])
+            if resolved is not None:
+                return resolved
+        return None
+
+    def resolve_relative(self, path: Text, names: List[Text], dots: int) -> Optional[Text]:
+        # parser joins "from . import name" to "..name" and "from .module import name" to ".module.name"
+        level = dots - 1 if len(names) == 1 else dots
+        base = os.path.dirname(path)
+        for _ in range(level - 1):
+            base = os.path.dirname(base)
+        for i in range(len(names), 0, -1):
+            target = "/".join([base] + names[:i])
+            for candidate in (f"{target}.py", f"{target}/__init__.py"):
+                if candidate in self.paths:
+                    return candidate
+        init_path = f"{base}/__init__.py"
+        return init_path if init_path in self.paths else None
+
+    def choose(self, path: Text, candidates: List[Text], names: List[Text]) -> Optional[Text]:
+        """
+        choose module by the longest dotted name, then by closest folder to importing module,
+        None if module is imported from package of code base, but there is no such module in package
+        """
+        for i in range(len(names) - 1):
+            matched = set(self.dotted.get(".".join(names[i:]), ()))
+            matched = [candidate for candidate in candidates if candidate in matched]
+            if matched:
+                candidates = matched
+                break
+        else:
+            if len(names) > 1 and names[-2] in self.packages:
+                return None
+        if len(candidates) > 1:
+            folder = os.path.dirname(path)
+            return max(candidates, key=lambda candidate: len(os.path.commonpath([folder, candidate])))
+        return candidates[0]
+
+
+def get_module_imports(path: Text, import_modules: Iterable, modules_index: ModulesIndex) -> List:
+    """resolve imported names of module to paths of modules from code base"""
+    imports = []
+    # Import.modules is a set - sort it to get the same order of dependencies
+    # in any process (parallel parsing, modules from cache)
+    for import_ in sorted(import_modules):
+        resolved = modules_index.resolve(path, import_)
+        if resolved is None:
+            continue
+        imports.append(resolved)
+    return imports
+
+
+def get_entities_lines(objects: List) -> Dict:
+    """return dict with lines of start and end for each entity in module"""
+    return {(entity.lineno, entity.endno): entity.name for entity in objects}
+
+
+class LinesIndex:
+    """
+    Entities lines ranges sorted by start line to find entity that contains line with bisect.
+    For nested entities the innermost one is found.
+    """
+
+    def __init__(self, entities_lines: Dict[Tuple[int, int], Text]):
+        # outer entity goes first if entities start on the same line
+        intervals = sorted(
+            (start, -(end if end is not None else start), name) for (start, end), name in entities_lines.items()
+        )
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [-end for _, end, _ in intervals]
+        self.names = [name for _, _, name in intervals]
+        # index of closest entity that was not closed when entity started, -1 if there is no such
+        self.parents = []
+        stack = []
+        for start, end in zip(self.starts, self.ends):
+            while stack and self.ends[stack[-1]] < start:
+                stack.pop()
+            self.parents.append(stack[-1] if stack else -1)
+            stack.append(len(self.parents) - 1)
+
+    def find(self, line: int) -> Optional[Text]:
+        """return name of the innermost entity that contains line or None"""
+        i = bisect_right(self.starts, line) - 1
+        while i >= 0:
+            if self.ends[i] >= line:
+                return self.names[i]
+            i = self.parents[i]
+        return None
+
+
+def get_imports_and_entities_lines(
+    code_objects: Dict, modules_imports: Dict = None, modules_index: ModulesIndex = None
+) -> Tuple[Dict, Dict]:
     """
     joined together to avoid iteration several time
-    imports - list of modules in code_objects Dict that used in current module
+    imports - list of paths of modules in code_objects Dict that used in current module
+    modules_imports - imported names of each module (result of extract_imports),
+        if not provided - Import objects are taken (and removed) from code_objects
+    modules_index - index of code_objects modules, built if not provided
     """
     entities_lines = defaultdict(dict)
     imports = defaultdict(list)
-    modules_ = code_objects.keys()
-    names_map = {}
-    # Build a set of all module names for quick lookup
-    module_names_set = {os.path.basename(m).replace(".py", "") for m in modules_}
+    if modules_index is None:
+        modules_index = ModulesIndex(code_objects)
 
+    if modules_imports is None:
+        modules_imports = extract_imports(code_objects)
     for path in code_objects:
-        names_map[get_module_name(path)] = path
         # for each module in list
-        if code_objects[path] and isinstance(code_objects[path][-1], Import):
-            # extract imports if exist
-            for import_ in code_objects[path].pop(-1).modules:
-                pathed_import = import_
-                alias = None
-                if " as " in pathed_import:
-                    pathed_import, alias = pathed_import.split(" as ")
-
-                parts = pathed_import.split(".")
-                matched = False
-
-                # Try each part from right to left to find a module match
-                # e.g., simple_ddl_parser.output.dialects.dialect_by_name
-                # -> try: dialect_by_name (no), dialects (yes!)
-                for i in range(len(parts) - 1, -1, -1):
-                    candidate = parts[i]
-
-                    # Check if this part matches a module name
-                    if candidate in module_names_set:
-                        for module_ in modules_:
-                            if candidate in module_:
-                                if alias:
-                                    aliases[candidate] = alias
-                                imports[path].append(candidate)
-                                matched = True
-                                break
-                        if matched:
-                            break
-
-                    # Check for __init__.py - if the candidate is a package name
-                    # e.g., from simple_ddl_parser import X -> simple_ddl_parser/__init__.py
-                    if not matched:
-                        for module_ in modules_:
-                            # Check if this is a package __init__.py
-                            if f"/{candidate}/__init__.py" in module_ or module_.endswith(f"{candidate}/__init__.py"):
-                                if alias:
-                                    aliases[candidate] = alias
-                                imports[path].append("__init__")
-                                matched = True
-                                break
-                        if matched:
-                            break
+        if path in modules_imports:
+            imports[path] = get_module_imports(path, modules_imports[path], modules_index)
+        entities_lines[path] = get_entities_lines(code_objects[path])
+    return entities_lines, imports
 
-        for entity in code_objects[path]:
-            # create a dict with lines of start and end for each entity in module
-            entities_lines[path][(entity.lineno, entity.endno)] = entity.name
-    return entities_lines, imports, names_map
+
+def get_affected_modules(
+    changed: Iterable[Text], modules_imports: Dict, imports: Dict, added_or_deleted: Iterable[Text] = ()
+) -> Set:
+    """
+        return modules that can use entities from changed modules:
+        modules that import them, and if modules were added or deleted -
+        modules that import something with the same name (resolution of their imports can change)
+    :param changed: paths to changed modules
+    :param modules_imports: imported names of each module (result of extract_imports)
+    :param imports: resolved imports of each module (result of get_imports_and_entities_lines)
+    :param added_or_deleted: paths to added or deleted modules
+    """
+    changed = set(changed) | set(added_or_deleted)
+    affected = {path for path, imported in imports.items() if not changed.isdisjoint(imported)}
+    names = set()
+    for path in added_or_deleted:
+        names.add(get_module_name(path))
+        if os.path.basename(path) == "__init__.py":
+            # package can be imported by name of it's folder
+            names.add(os.path.basename(os.path.dirname(path)))
+    if names:
+        for path, import_modules in modules_imports.items():
+            for import_ in import_modules:
+                if not names.isdisjoint(import_.split(" as ")[0].split(".")):
+                    affected.add(path)
+                    break
+    return affected
+
+
+def get_code_lines(source: Text) -> List[Text]:
+    """split module source by lines, lines with functions and classes definitions are commented"""
+    # to reduce count of iteration, we not need lines with functions and classes defenitions
+    source = (
+        source.replace("async ", "# async ")
+        .replace("def ", "# def ")
+        .replace("class ", "# class ")
+    )
+    return source.split("\n")
+
+
+def build_usage_index(modules: List[Tuple[Text, List, bool]]) -> Dict:
+    """
+        index of entities that can be used in module
+    :param modules: list of (module name, entities of module, True if it is current module)
+    :return: {entity name: [(module index, entity index, module name, usage key)]}
+        usage key - "module_name.entity_name" for imported modules and "entity_name" for current one
+    """
+    index = defaultdict(list)
+    for module_order, (module_name, entities, current) in enumerate(modules):
+        prefix = "" if current else f"{module_name}."
+        for entity_order, entity in enumerate(entities):
+            index[entity.name].append((module_order, entity_order, module_name, f"{prefix}{entity.name}"))
+    return index
 
 
-def search_entities_from_list_in_code(
-    entities_list: List, module_name: Text, line: Text
-) -> Text:
-    for entity in entities_list:
-        if search_entity_usage(module_name, entity.name, line):
-            yield entity
+def search_entities_from_modules_in_code(modules: List[Tuple[Text, List, bool]], code: List[Text]) -> List[Dict]:
+    """
+        find usage of entities from several modules in one pass over code lines:
+        each line is split to names chains once and each name is looked up in index.
+        Entity is used if it is called - "entity(", "module.entity(", "obj.entity(",
+        or it's attribute is accessed - "entity.attr", "module.entity.attr"
+    :param modules: list of (module name, entities of module, True if it is current module)
+    :return: list with {usage key: [lines numbers]} for each module, in order of modules
+    """
+    index = build_usage_index(modules)
+    found = [defaultdict(list) for _ in modules]
+    for num, line in enumerate(code, 1):
+        if line.startswith(("#", '"', "'")):
+            continue
+        matches = set()
+        for chain in NAME_CHAIN_RE.finditer(line):
+            called = chain.group(1) is not None
+            parts = chain.group(0).rstrip("(").split(".")
+            last = len(parts) - 1
+            for i, part in enumerate(parts):
+                for module_order, entity_order, module_name, key in index.get(part, ()):
+                    if i == last:
+                        used = called
+                    else:
+                        used = i == 0 or parts[i - 1] == module_name
+                    if used:
+                        matches.add((module_order, entity_order, key))
+        # same order as entities are defined in module
+        for module_order, _, key in sorted(matches):
+            found[module_order][key].append(num)
+    return found
 
 
-def search_entities_from_module_in_code(
-    _module: Text, _path: Text, code_objects: Dict, code: List, current: bool = False
-) -> Dict:
-    found_entities = defaultdict(list)
-    for num, line in enumerate(code):
-        if (
-            not line.startswith("#")
-            and not line.startswith('"')
-            and not line.startswith("'")
-        ):
-            entities_in_line = [
-                x
-                for x in search_entities_from_list_in_code(
-                    code_objects[_path], _module, line
-                )
-            ]
-            for entity in entities_in_line:
-                prefix = f"{_module}." if not current else ""
-                found_entities[f"{prefix}{entity.name}"].append(num + 1)
-    return found_entities
-
-
-def collect_entities_usage_in_modules(
-    code_objects: Dict, imports: Dict, modules_names_map: Dict
+def collect_entities_usage_in_module(path: Text, code_objects: Dict, imports: Dict, source: Text = None) -> Dict:
+    """
+        search usage of entities from imported modules and current module
+    :param source: module source, if not provided - module is read from disk
+    """
+    logger.debug(f"Processing module: {path}")
+    logger.debug(f"Imports in module: {imports[path]}")
+    code = get_code_lines(source if source is not None else read_file_content(path))
+    searched_modules = []
+    for _path in dict.fromkeys(imports[path]):
+        # search entities from other modules
+        searched_modules.append((get_module_name(_path), code_objects[_path], False))
+    # search entities from current module
+    searched_modules.append((get_module_name(path), code_objects[path], True))
+
+    entities_usage = defaultdict(list)
+    for found_entities in search_entities_from_modules_in_code(searched_modules, code):
+        entities_usage.update(found_entities)
+    return entities_usage
+
+
+def get_module_dependencies(
+    path: Text,
+    code_objects: Dict,
+    imports: Dict,
+    entities_lines: Dict,
+    source: Text = None,
 ) -> Dict:
-    entities_usage_in_modules = defaultdict(dict)
-    for path in code_objects:
-        entities_usage_in_modules[path] = defaultdict(list)
-        logger.debug(f"Processing module: {path}")
-        logger.debug(f"Imports in module: {imports[path]}")
-        module_content = read_file_content(path)
-        # to reduce count of iteration, we not need lines with functions and classes defenitions
-        module_content = (
-            module_content.replace("async ", "# async ")
-            .replace("def ", "# def ")
-            .replace("class ", "# class ")
-        )
-        # split by line
-        code = module_content.split("\n")
-        for _module in imports[path]:
-            # search entities from other modules (skip if not in analyzed codebase)
-            if _module not in modules_names_map:
-                continue
-            _path = modules_names_map[_module]
-            entities_usage_in_modules[path].update(
-                search_entities_from_module_in_code(_module, _path, code_objects, code)
-            )
-        # search entities from current module
-        entities_usage_in_modules[path].update(
-            search_entities_from_module_in_code(
-                get_module_name(path), path, code_objects, code, current=True
-            )
-        )
-    return entities_usage_in_modules
+    """create edges from entities of module to entities that they use"""
+    entities_usage = collect_entities_usage_in_module(path, code_objects, imports, source)
+    lines_index = LinesIndex(entities_lines[path])
+    dependencies = defaultdict(list)
+    for method_that_used, method_usage_lines in entities_usage.items():
+        for method_usage_line in method_usage_lines:
+            entity_name = lines_index.find(method_usage_line)
+            if entity_name is None:
+                # mean in global of module
+                entity_name = "_"
+            dependencies[entity_name].append(method_that_used)
+    populate_module_free_nodes(code_objects[path], dependencies, imports.get(path, []))
+    return dependencies
 
 
-def populate_free_nodes(code_objects: Dict, dependencies: Dict, imports: Dict, modules_names_map: Dict) -> Dict:
+def populate_module_free_nodes(entities: List, dependencies: Dict, imports: List) -> Dict:
     from codegraph.parser import Class
 
-    for path in code_objects:
-        # Create module-to-module connections based on imports
-        # This ensures we show connections even when specific entities aren't detected
-        # (e.g., when importing variables or when entity usage detection misses something)
-        if imports.get(path):
-            if "_" not in dependencies[path]:
-                dependencies[path]["_"] = []
-            for imp in imports[path]:
-                import_dep = f"{imp}._"
-                if import_dep not in dependencies[path]["_"]:
-                    dependencies[path]["_"].append(import_dep)
-
-        for entity in code_objects[path]:
-            if entity.name not in dependencies[path]:
-                dependencies[path][entity.name] = []
-
-            # Add inheritance connections for classes
-            if isinstance(entity, Class) and entity.super:
-                for base_class in entity.super:
-                    # Try to find the base class in imports or local module
-                    base_found = False
-
-                    # Check if it's a dotted name (e.g., module.ClassName)
-                    if "." in base_class:
-                        # Already qualified, add as-is
-                        dependencies[path][entity.name].append(base_class)
-                        base_found = True
-                    else:
-                        # Search in imports for this module
-                        for imp in imports.get(path, []):
-                            # Import could be like "dialects.HQL" or "simple_ddl_parser.dialects.HQL"
-                            if imp.endswith("." + base_class) or imp.endswith("." + base_class.split(" as ")[0]):
-                                # Found the import, extract module name
-                                parts = imp.split(".")
-                                if len(parts) >= 2:
-                                    module_name = parts[-2]  # e.g., "dialects" from "simple_ddl_parser.dialects.HQL"
-                                    dependencies[path][entity.name].append(f"{module_name}.{base_class}")
-                                    base_found = True
-                                    break
-
-                        # If not found in imports, check if it's a local class
-                        if not base_found:
-                            for local_entity in code_objects[path]:
-                                if local_entity.name == base_class:
-                                    # It's a local class, add without module prefix
-                                    dependencies[path][entity.name].append(base_class)
-                                    base_found = True
-                                    break
-
-                        # If still not found, add as-is (might be external)
-                        if not base_found:
-                            dependencies[path][entity.name].append(base_class)
+    # names of imported modules
+    imports = [get_module_name(imp) for imp in imports]
+    # Create module-to-module connections based on imports
+    # This ensures we show connections even when specific entities aren't detected
+    # (e.g., when importing variables or when entity usage detection misses something)
+    if imports:
+        if "_" not in dependencies:
+            dependencies["_"] = []
+        for imp in imports:
+            import_dep = f"{imp}._"
+            if import_dep not in dependencies["_"]:
+                dependencies["_"].append(import_dep)
+
+    for entity in entities:
+        if entity.name not in dependencies:
+            dependencies[entity.name] = []
+
+        # Add inheritance connections for classes
+        if isinstance(entity, Class) and entity.super:
+            for base_class in entity.super:
+                # Try to find the base class in imports or local module
+                base_found = False
+
+                # Check if it's a dotted name (e.g., module.ClassName)
+                if "." in base_class:
+                    # Already qualified, add as-is
+                    dependencies[entity.name].append(base_class)
+                    base_found = True
+                else:
+                    # Search in imports for this module
+                    for imp in imports:
+                        # Import could be like "dialects.HQL" or "simple_ddl_parser.dialects.HQL"
+                        if imp.endswith("." + base_class) or imp.endswith("." + base_class.split(" as ")[0]):
+                            # Found the import, extract module name
+                            parts = imp.split(".")
+                            if len(parts) >= 2:
+                                module_name = parts[-2]  # e.g., "dialects" from "simple_ddl_parser.dialects.HQL"
+                                dependencies[entity.name].append(f"{module_name}.{base_class}")
+                                base_found = True
+                                break
 
-    return dependencies
+                    # If not found in imports, check if it's a local class
+                    if not base_found:
+                        for local_entity in entities:
+                            if local_entity.name == base_class:
+                                # It's a local class, add without module prefix
+                                dependencies[entity.name].append(base_class)
+                                base_found = True
+                                break
 
+                    # If still not found, add as-is (might be external)
+                    if not base_found:
+                        dependencies[entity.name].append(base_class)
 
-def search_entity_usage(module_name: Text, name: Text, line: Text) -> bool:
-    """check exist method or entity usage in line or not"""
-    method_call = name + "("
-    dot_access = name + "."
-    if (
-        method_call in line
-        or " " + dot_access in line
-        or f"{module_name}." + method_call in line
-        or f"{module_name}." + dot_access in line
-    ):
-        return True
-    elif module_name in aliases:
-        if aliases[module_name] + "." + method_call in line:
-            return True
-    return False
+    return dependencies
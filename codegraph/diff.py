@@ -0,0 +1,230 @@
+"""
+difference between two snapshots of usage graph: added and removed modules, entities and edges.
+
+Snapshot (--snapshot PATH, save_snapshot()) is JSON with usage graph and entity metadata, modules paths in it
+are relative to scanned folder (common folder of PATHS, it is stored in snapshot as "root"), so snapshots of one
+code base from different checkouts can be compared and added or removed top level modules don't change other paths.
+Files of CodeGraph.save() can be compared too, their paths are made relative to common folder of modules.
+Edges are (module, entity, dependency) items of usage graph, all items are compared as hashed sets,
+so diff takes linear time of graphs size.
+"""
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Text, Tuple
+
+from codegraph.vizualyzer import convert_to_d3_format, iter_d3_links, iter_d3_nodes, save_html
+
+SNAPSHOT_FORMAT = "codegraph-snapshot"
+SNAPSHOT_VERSION = 1
+DIFF_KINDS = ("modules", "entities", "edges")
+CSV_DIFF_FIELDS = ["change", "kind", "module", "entity", "dependency"]
+
+
+class SnapshotError(ValueError):
+    """file is not a snapshot or its version is not supported"""
+
+
+def get_snapshot_root(paths: Iterable[Text]) -> Text:
+    """common folder of scanned paths (PATHS of codegraph command), folder of file if only one file is scanned"""
+    root = os.path.commonpath([os.path.abspath(path) for path in paths])
+    return Path(root if os.path.isdir(root) else os.path.dirname(root)).as_posix()
+
+
+def get_relative_graph(
+    modules_entities: Dict, entity_metadata: Dict = None, root: Optional[Text] = None
+) -> Tuple[Dict, Dict]:
+    """
+        usage graph and entity metadata with modules paths relative to root
+    :param root: scanned folder (get_snapshot_root()), if not set - common folder of modules
+    """
+    if not modules_entities:
+        return {}, {}
+    if root is None:
+        root = os.path.commonpath([os.path.dirname(path) for path in modules_entities])
+    paths = {path: Path(os.path.relpath(path, root)).as_posix() for path in modules_entities}
+    entity_metadata = entity_metadata or {}
+    return (
+        {paths[path]: entities for path, entities in modules_entities.items()},
+        {paths[path]: entity_metadata[path] for path in modules_entities if path in entity_metadata},
+    )
+
+
+def save_snapshot(
+    path: Text, modules_entities: Dict, entity_metadata: Dict = None, root: Optional[Text] = None
+) -> None:
+    """
+        write usage graph (CodeGraph.usage_graph()) and entity metadata to snapshot file
+    :param root: scanned folder (get_snapshot_root()) that modules paths are made relative to,
+        if not set - common folder of modules
+    """
+    graph, metadata = get_relative_graph(modules_entities, entity_metadata, root)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "root": root,
+                "graph": graph,
+                "entityMetadata": metadata,
+            },
+            file,
+            separators=(",", ":"),
+        )
+
+
+def load_snapshot(path: Text) -> Tuple[Dict, Dict]:
+    """
+        read snapshot written by save_snapshot() or CodeGraph saved with CodeGraph.save()
+    :return: usage graph and entity metadata
+    """
+    from codegraph.graph_state import MAGIC
+
+    with open(path, "rb") as file:
+        saved_graph = file.read(len(MAGIC)) == MAGIC
+    if saved_graph:
+        from codegraph.core import CodeGraph
+
+        code_graph = CodeGraph.load(path)
+        return get_relative_graph(code_graph.usage_graph(), code_graph.get_entity_metadata())
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise SnapshotError(f"{path} is not a codegraph snapshot")
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"{path} is not a codegraph snapshot")
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(f"{path} has unsupported snapshot version {data.get('version')}")
+    return data["graph"], data["entityMetadata"]
+
+
+def get_graph_items(modules_entities: Dict) -> Tuple[Set, Set, Set]:
+    """sets of modules, entities (module, entity) and edges (module, entity, dependency) of usage graph"""
+    modules = set(modules_entities)
+    entities = set()
+    edges = set()
+    for module, module_entities in modules_entities.items():
+        for entity, dependencies in module_entities.items():
+            entities.add((module, entity))
+            edges.update((module, entity, dependency) for dependency in dependencies)
+    return modules, entities, edges
+
+
+def diff_graphs(old: Dict, new: Dict) -> Dict[Text, Dict[Text, List]]:
+    """
+        compare usage graphs
+    :return: {"modules" | "entities" | "edges": {"added": [...], "removed": [...]}}, modules are paths,
+        entities - [module, entity], edges - [module, entity, dependency], lists are sorted
+    """
+    diff = {}
+    for kind, old_items, new_items in zip(DIFF_KINDS, get_graph_items(old), get_graph_items(new)):
+        diff[kind] = {
+            "added": sorted(new_items - old_items),
+            "removed": sorted(old_items - new_items),
+        }
+    return diff
+
+
+def has_changes(diff: Dict) -> bool:
+    return any(changes["added"] or changes["removed"] for changes in diff.values())
+
+
+def format_summary(diff: Dict) -> Text:
+    return ", ".join(
+        f"{kind}: +{len(diff[kind]['added'])} -{len(diff[kind]['removed'])}" for kind in DIFF_KINDS
+    )
+
+
+def export_diff_to_json(diff: Dict, output_path: Text) -> None:
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump(diff, file, indent=2)
+
+
+def export_diff_to_csv(diff: Dict, output_path: Text) -> None:
+    """write one row per change: change (added, removed), kind, module, entity, dependency"""
+    with open(output_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_DIFF_FIELDS)
+        for kind in DIFF_KINDS:
+            for change in ("added", "removed"):
+                for item in diff[kind][change]:
+                    item = [item] if kind == "modules" else list(item)
+                    writer.writerow([change, kind, *item, *[""] * (3 - len(item))])
+
+
+def merge_graphs(old: Dict, new: Dict) -> Dict:
+    """usage graph with modules, entities and dependencies of both graphs"""
+    merged: Dict[Text, Dict[Text, List]] = {}
+    for graph in (old, new):
+        for module, module_entities in graph.items():
+            merged_entities = merged.setdefault(module, {})
+            for entity, dependencies in module_entities.items():
+                merged_entities[entity] = list(dict.fromkeys([*merged_entities.get(entity, ()), *dependencies]))
+    return merged
+
+
+def get_d3_ids(modules_entities: Dict) -> Tuple[Set, Set]:
+    """ids of D3.js nodes and (source, target, type) of D3.js links of usage graph"""
+    nodes = {node["id"] for node in iter_d3_nodes(modules_entities)}
+    links = set()
+    for kind, item in iter_d3_links(modules_entities):
+        if kind == "node":
+            nodes.add(item["id"])
+        else:
+            links.add((item["source"], item["target"], item["type"]))
+    return nodes, links
+
+
+def convert_to_diff_format(old: Dict, new: Dict, old_metadata: Dict = None, new_metadata: Dict = None) -> Dict:
+    """
+    D3.js data of both graphs (merge_graphs()), nodes and links that are only in new graph have "change": "added",
+    only in old graph - "change": "removed". "diff" has counts of added and removed items of diff_graphs().
+    """
+    old_metadata, new_metadata = old_metadata or {}, new_metadata or {}
+    metadata = {
+        module: {**old_metadata.get(module, {}), **new_metadata.get(module, {})}
+        for module in {*old_metadata, *new_metadata}
+    }
+    graph_data = convert_to_d3_format(merge_graphs(old, new), metadata)
+    old_nodes, old_links = get_d3_ids(old)
+    new_nodes, new_links = get_d3_ids(new)
+    for node in graph_data["nodes"]:
+        if node["id"] not in old_nodes:
+            node["change"] = "added"
+        elif node["id"] not in new_nodes:
+            node["change"] = "removed"
+    for link in graph_data["links"]:
+        key = (link["source"], link["target"], link["type"])
+        if key not in old_links:
+            link["change"] = "added"
+        elif key not in new_links:
+            link["change"] = "removed"
+    diff = diff_graphs(old, new)
+    graph_data["diff"] = {kind: {change: len(items) for change, items in diff[kind].items()} for kind in DIFF_KINDS}
+    return graph_data
+
+
+def draw_diff_graph(
+    old: Dict,
+    new: Dict,
+    old_metadata: Dict = None,
+    new_metadata: Dict = None,
+    output_path: Text = None,
+    open_browser: bool = True,
+) -> None:
+    """Save HTML with both graphs where added and removed nodes and links are coloured, open it in browser.
+
+    Args:
+        old: Usage graph of old snapshot.
+        new: Usage graph of new snapshot.
+        old_metadata: Entity metadata of old snapshot.
+        new_metadata: Entity metadata of new snapshot.
+        output_path: Path to save HTML file. Default: ./codegraph_diff.html
+        open_browser: Open saved HTML file in browser.
+    """
+    if output_path is None:
+        output_path = os.path.join(os.getcwd(), "codegraph_diff.html")
+    output_path = os.path.abspath(output_path)
+    save_html(convert_to_diff_format(old, new, old_metadata, new_metadata), output_path, open_browser=open_browser)
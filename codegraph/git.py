@@ -0,0 +1,54 @@
+"""changed python files from local git repository, to show only part of graph touched by diff"""
+import os
+import subprocess
+from pathlib import Path
+from typing import List, Text, Tuple
+
+
+class GitError(ValueError):
+    """git is not installed, folder is not in git repository or revision is not found"""
+
+
+def run_git(args: List[Text], cwd: Text) -> Text:
+    """run git command in folder and return its output"""
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise GitError("git is not installed")
+    if result.returncode != 0:
+        raise GitError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def get_diff_files(rev_range: Text, path: Text = ".") -> Tuple[List[Text], List[Text]]:
+    """
+        paths of python files inside of path changed in git diff --name-status rev_range,
+        renamed files are reported as deleted and added
+    :param rev_range: "base..head", "base...head" or "base" (changes of working tree since base)
+    :param path: file or folder in git repository
+    :return: absolute paths of added or modified python files and absolute paths of deleted python files
+    """
+    if rev_range.startswith("-"):
+        raise GitError(f"Invalid revisions range: {rev_range}")
+    path = os.path.abspath(path)
+    cwd, pathspec = (path, ".") if os.path.isdir(path) else os.path.split(path)
+    # root of repository is found from path, not with --show-toplevel, so paths have the same symlinks as path
+    prefix = run_git(["rev-parse", "--show-prefix"], cwd).strip().rstrip("/")
+    root = os.path.normpath(os.path.join(cwd, *[".."] * len(prefix.split("/")))) if prefix else cwd
+    output = run_git(["diff", "--name-status", "--no-renames", "-z", rev_range, "--", pathspec], cwd)
+    # -z output is "status\0name\0" for each file
+    items = output.split("\0")
+    changed: List[Text] = []
+    deleted: List[Text] = []
+    for status, name in zip(items[::2], items[1::2]):
+        if name.endswith(".py"):
+            (deleted if status == "D" else changed).append(Path(root, name).as_posix())
+    return changed, deleted
+
+
+def get_changed_files(rev_range: Text, path: Text = ".") -> List[Text]:
+    """
+        paths of python files inside of path changed in git diff rev_range, deleted files are not included
+    :return: absolute paths of changed python files
+    """
+    return get_diff_files(rev_range, path)[0]
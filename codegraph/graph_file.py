@@ -0,0 +1,287 @@
+"""
+compact binary columnar format of graph: nodes and links are stored as columns of integers
+with one table of strings, file can be memory-mapped back without parsing.
+
+File layout (all numbers are little-endian):
+
+    header      8s magic b"CODEGRPH", uint32 format version, uint32 sections count
+    sections    for each section: 16s name (ascii, zero padded), 1s typecode (array module code),
+                7 pad bytes, uint64 offset of data from start of file, uint64 count of items
+    data        sections data, each section starts at offset aligned to 8 bytes
+
+Sections:
+
+    strings_offsets  Q  strings count + 1 offsets in strings_data, string i is data[offsets[i]:offsets[i + 1]]
+    strings_data     B  utf-8 encoded strings
+    node_id          I  string index of node id ("module.py", "module.py:entity", "external_name")
+    node_type        B  index in NODE_TYPES
+    node_label       I  string index of node label (entity or external name, module file name)
+    node_parent      i  node index of parent module of entity, -1 for modules and externals
+    node_path        i  string index of module path relative to common root of modules, -1 for entities and externals
+    node_lines       I  lines of code
+    node_entity_type i  string index of entity type ("function", "class"), -1 for modules and externals
+    link_source      I  node index of link source
+    link_target      I  node index of link target
+    link_type        B  index in LINK_TYPES
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Text, Tuple, Type
+
+MAGIC = b"CODEGRPH"
+FORMAT_VERSION = 1
+DEFAULT_GRAPH_FILE = "codegraph.cgraph"
+NODE_TYPES = ("module", "entity", "external")
+LINK_TYPES = ("module-entity", "dependency", "module-module")
+
+HEADER = struct.Struct("<8sII")
+SECTION = struct.Struct("<16s1s7xQQ")
+ALIGNMENT = 8
+
+NODES_COLUMNS = {
+    "node_id": "I",
+    "node_type": "B",
+    "node_label": "I",
+    "node_parent": "i",
+    "node_path": "i",
+    "node_lines": "I",
+    "node_entity_type": "i",
+}
+LINKS_COLUMNS = {
+    "link_source": "I",
+    "link_target": "I",
+    "link_type": "B",
+}
+
+
+class GraphFileError(ValueError):
+    """file is not a graph file or it's format version is not supported"""
+
+
+class StringsTable:
+    """strings interned to indexes in order of first appearance"""
+
+    def __init__(self):
+        self.indexes: Dict[Text, int] = {}
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+
+    def add(self, value: Optional[Text]) -> int:
+        if value is None:
+            return -1
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.indexes)
+            self.data += value.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return index
+
+
+def build_columns(
+    modules_entities: Dict, entity_metadata: Dict = None, strings: StringsTable = None
+) -> Dict[Text, array]:
+    """
+        columns of graph file from usage graph, nodes and links are the same as in D3.js data
+    :param strings: table to intern strings to, new one is created if not provided
+    """
+    from codegraph.vizualyzer import iter_d3_links, iter_d3_nodes
+
+    if strings is None:
+        strings = StringsTable()
+    columns = {name: array(typecode) for name, typecode in {**NODES_COLUMNS, **LINKS_COLUMNS}.items()}
+    nodes_indexes: Dict[Text, int] = {}
+
+    def add_node(node: Dict) -> None:
+        node_type = node["type"]
+        nodes_indexes[node["id"]] = len(nodes_indexes)
+        columns["node_id"].append(strings.add(node["id"]))
+        columns["node_type"].append(NODE_TYPES.index(node_type))
+        columns["node_label"].append(strings.add(node.get("label", node["id"])))
+        columns["node_parent"].append(nodes_indexes.get(node.get("parent"), -1))
+        columns["node_path"].append(strings.add(node.get("fullPath")))
+        columns["node_lines"].append(node.get("lines", 0))
+        columns["node_entity_type"].append(strings.add(node.get("entityType")))
+
+    for node in iter_d3_nodes(modules_entities, entity_metadata):
+        add_node(node)
+    for kind, item in iter_d3_links(modules_entities):
+        if kind == "node":
+            add_node(item)
+            continue
+        columns["link_source"].append(nodes_indexes[item["source"]])
+        columns["link_target"].append(nodes_indexes[item["target"]])
+        columns["link_type"].append(LINK_TYPES.index(item["type"]))
+
+    columns["strings_offsets"] = strings.offsets
+    columns["strings_data"] = array("B", strings.data)
+    return columns
+
+
+def write_sections(
+    path: Text, columns: Dict[Text, array], names: List[Text], magic: bytes = MAGIC, version: int = FORMAT_VERSION
+) -> None:
+    """write columns as sections of file with header and sections table, see module docstring for layout"""
+    offset = HEADER.size + SECTION.size * len(names)
+    sections = []
+    for name in names:
+        column = columns[name]
+        offset += -offset % ALIGNMENT
+        sections.append((name, column, offset))
+        offset += len(column) * column.itemsize
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(magic, version, len(sections)))
+        for name, column, offset in sections:
+            file.write(SECTION.pack(name.encode("ascii"), column.typecode.encode("ascii"), offset, len(column)))
+        for name, column, offset in sections:
+            file.write(b"\0" * (offset - file.tell()))
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            file.write(column.tobytes())
+
+
+def write_graph_file(columns: Dict[Text, array], path: Text) -> None:
+    """write columns to graph file"""
+    write_sections(path, columns, ["strings_offsets", "strings_data", *NODES_COLUMNS, *LINKS_COLUMNS])
+
+
+def iter_sections(
+    data: bytes, path: Text, magic: bytes = MAGIC, version: int = FORMAT_VERSION, error: Type[Exception] = None
+) -> Iterator[Tuple[Text, Text, int, int]]:
+    """
+        check header of file data written with write_sections()
+    :param error: exception class to raise if file has other magic or version, or it is truncated
+    :return: name, typecode, offset and size in bytes of each section
+    """
+    error = error or GraphFileError
+    if len(data) < HEADER.size:
+        raise error(f"{path} is not a codegraph file")
+    file_magic, file_version, sections_count = HEADER.unpack_from(data, 0)
+    if file_magic != magic:
+        raise error(f"{path} is not a codegraph file")
+    if file_version != version:
+        raise error(f"{path} has unsupported format version {file_version}")
+    for i in range(sections_count):
+        name, typecode, offset, count = SECTION.unpack_from(data, HEADER.size + i * SECTION.size)
+        typecode = typecode.decode("ascii")
+        size = count * array(typecode).itemsize
+        if offset + size > len(data):
+            raise error(f"{path} is truncated")
+        yield name.rstrip(b"\0").decode("ascii"), typecode, offset, size
+
+
+def export_to_graph_file(modules_entities: Dict, entity_metadata: Dict = None, output_path: str = None) -> None:
+    """Export graph to compact binary file.
+
+    Args:
+        modules_entities: Graph data with modules and their entities.
+        entity_metadata: Metadata for entities (lines of code, type).
+        output_path: Path to save graph file. Default: ./codegraph.cgraph
+    """
+    import click
+
+    if output_path is None:
+        output_path = os.path.join(os.getcwd(), DEFAULT_GRAPH_FILE)
+    output_path = os.path.abspath(output_path)
+
+    write_graph_file(build_columns(modules_entities, entity_metadata), output_path)
+    click.echo(f"Graph data exported to binary file: {output_path}")
+
+
+class GraphFile:
+    """
+    Graph file mapped to memory, columns are memoryviews over file data (copied only on big-endian platforms).
+    Columns can't be used after close().
+    """
+
+    def __init__(self, path: Text):
+        self.path = path
+        with open(path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.views: List[memoryview] = []
+        self.columns: Dict[Text, memoryview] = {}
+        try:
+            self.read_sections()
+        except Exception:
+            self.close()
+            raise
+        self.nodes_count = len(self.columns["node_id"])
+        self.links_count = len(self.columns["link_source"])
+
+    def read_sections(self) -> None:
+        data = memoryview(self.mmap)
+        self.views.append(data)
+        for name, typecode, offset, size in iter_sections(self.mmap, self.path):
+            if sys.byteorder == "little":
+                column = data[offset: offset + size].cast(typecode)
+                self.views.append(column)
+            else:
+                column = array(typecode, data[offset: offset + size].tobytes())
+                column.byteswap()
+                column = memoryview(column)
+            self.columns[name] = column
+
+    def string(self, index: int) -> Optional[Text]:
+        if index < 0:
+            return None
+        offsets = self.columns["strings_offsets"]
+        return str(self.columns["strings_data"][offsets[index]: offsets[index + 1]], "utf-8")
+
+    def node(self, index: int) -> Dict:
+        """node in D3.js format"""
+        columns = self.columns
+        node_type = NODE_TYPES[columns["node_type"][index]]
+        node = {"id": self.string(columns["node_id"][index]), "type": node_type}
+        if node_type == "module":
+            node.update(
+                collapsed=False,
+                fullPath=self.string(columns["node_path"][index]),
+                lines=columns["node_lines"][index],
+            )
+        elif node_type == "entity":
+            node.update(
+                label=self.string(columns["node_label"][index]),
+                parent=self.string(columns["node_id"][columns["node_parent"][index]]),
+                lines=columns["node_lines"][index],
+                entityType=self.string(columns["node_entity_type"][index]),
+            )
+        else:
+            node["label"] = self.string(columns["node_label"][index])
+        return node
+
+    def iter_nodes(self) -> Iterator[Dict]:
+        for index in range(self.nodes_count):
+            yield self.node(index)
+
+    def iter_links(self) -> Iterator[Dict]:
+        """links in D3.js format"""
+        columns = self.columns
+        node_ids = columns["node_id"]
+        for source, target, link_type in zip(columns["link_source"], columns["link_target"], columns["link_type"]):
+            yield {
+                "source": self.string(node_ids[source]),
+                "target": self.string(node_ids[target]),
+                "type": LINK_TYPES[link_type],
+            }
+
+    def close(self) -> None:
+        self.columns = {}
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.mmap.close()
+
+    def __enter__(self) -> "GraphFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_graph(path: Text) -> GraphFile:
+    """open graph file written with --graph-file option (or export_to_graph_file())"""
+    return GraphFile(path)
@@ -0,0 +1,181 @@
+"""
+binary file with state of CodeGraph (CodeGraph.save() / CodeGraph.load()): parsed entities of modules
+(with base classes of classes), imported names and resolved imports of modules and usage graph, so graph can be
+queried and updated without parsing of whole code base again.
+
+File has the same layout as graph file (see codegraph.graph_file): header with magic b"CODEGSAV" and format version,
+sections table and sections data. No pickle is used, file has only integer columns and utf-8 strings.
+
+Sections:
+
+    strings          B  utf-8 encoded strings separated by "\\0"
+    module_path      I  string index of module path, in order of CodeGraph.paths_list
+    entity_module    I  module index of entity (parsed class or function), in order of entities in module
+    entity_name      I  string index of entity name
+    entity_type      B  index in ENTITY_TYPES
+    entity_lineno    I  first line of entity
+    entity_endno     i  last line of entity, -1 if it is unknown
+    entity_bases_end I  end of entity base classes in entity_base column, they start at end of previous entity
+    entity_base      I  string index of base class name
+    graph_module     I  module index of usage graph item (entity or "_" - module level code)
+    graph_entity     I  string index of usage graph item name
+    graph_deps_end   I  end of item dependencies in dependency column, item dependencies start at end of previous item
+    dependency       I  string index of used entity ("module.entity", "entity", "module._")
+    import_module    I  module index of importing module
+    import_path      I  module index of imported module of code base
+    raw_import_mod   I  module index of module with import statement
+    raw_import_name  I  string index of imported name as it is collected by parser (e.g. "pkg.module.func as f")
+"""
+import gc
+import sys
+from array import array
+from typing import Dict, List, Text, Tuple
+
+from codegraph.graph_file import iter_sections, write_sections
+from codegraph.parser import AsyncFunction, Class, Function
+
+MAGIC = b"CODEGSAV"
+FORMAT_VERSION = 1
+ENTITY_TYPES = (Function, AsyncFunction, Class)
+
+COLUMNS = {
+    "strings": "B",
+    "module_path": "I",
+    "entity_module": "I",
+    "entity_name": "I",
+    "entity_type": "B",
+    "entity_lineno": "I",
+    "entity_endno": "i",
+    "entity_bases_end": "I",
+    "entity_base": "I",
+    "graph_module": "I",
+    "graph_entity": "I",
+    "graph_deps_end": "I",
+    "dependency": "I",
+    "import_module": "I",
+    "import_path": "I",
+    "raw_import_mod": "I",
+    "raw_import_name": "I",
+}
+
+
+class GraphStateError(ValueError):
+    """file is not a saved CodeGraph or it's format version is not supported"""
+
+
+def write_graph_state(
+    path: Text, paths_list: List[Text], modules_data: Dict, dependencies: Dict, imports: Dict, raw_imports: Dict
+) -> None:
+    """write CodeGraph state to file, see module docstring for layout"""
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    strings: Dict[Text, int] = {}
+
+    def add(value: Text) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    modules = {path: index for index, path in enumerate(paths_list)}
+    columns["module_path"].extend(add(path) for path in paths_list)
+    for module, entities in modules_data.items():
+        for entity in entities:
+            columns["entity_module"].append(modules[module])
+            columns["entity_name"].append(add(entity.name))
+            columns["entity_type"].append(ENTITY_TYPES.index(type(entity)))
+            columns["entity_lineno"].append(entity.lineno)
+            columns["entity_endno"].append(-1 if entity.endno is None else entity.endno)
+            columns["entity_base"].extend(add(base) for base in getattr(entity, "super", ()))
+            columns["entity_bases_end"].append(len(columns["entity_base"]))
+    for module, module_entities in dependencies.items():
+        for entity, used_entities in module_entities.items():
+            columns["graph_module"].append(modules[module])
+            columns["graph_entity"].append(add(entity))
+            columns["dependency"].extend(add(used) for used in used_entities)
+            columns["graph_deps_end"].append(len(columns["dependency"]))
+    for module, imported in imports.items():
+        for imported_path in imported:
+            columns["import_module"].append(modules[module])
+            columns["import_path"].append(modules[imported_path])
+    for module, imported_names in raw_imports.items():
+        # names are a set, sorted to write the same file for the same code base
+        for name in sorted(imported_names):
+            columns["raw_import_mod"].append(modules[module])
+            columns["raw_import_name"].append(add(name))
+    columns["strings"].frombytes("\0".join(strings).encode("utf-8"))
+    write_sections(path, columns, list(COLUMNS), magic=MAGIC, version=FORMAT_VERSION)
+
+
+def read_graph_state(path: Text) -> Tuple[List[Text], Dict, Dict, Dict, Dict]:
+    """
+        read CodeGraph state written with write_graph_state()
+    :return: paths of modules, parsed entities of modules, usage graph, resolved imports of modules,
+        imported names of modules
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    # objects are only created here, without reference cycles, so collections during load are wasted time
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return read_columns(path, data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def read_columns(path: Text, data: bytes) -> Tuple[List[Text], Dict, Dict, Dict, Dict]:
+    columns = {}
+    for name, typecode, offset, size in iter_sections(data, path, MAGIC, FORMAT_VERSION, GraphStateError):
+        if name == "strings":
+            columns[name] = data[offset: offset + size].decode("utf-8").split("\0")
+            continue
+        column = array(typecode)
+        column.frombytes(data[offset: offset + size])
+        if sys.byteorder != "little":
+            column.byteswap()
+        columns[name] = column
+    missing = COLUMNS.keys() - columns.keys()
+    if missing:
+        raise GraphStateError(f"{path} has no sections: {', '.join(sorted(missing))}")
+
+    strings = columns["strings"]
+    paths_list = [strings[index] for index in columns["module_path"]]
+    files_names = [path.rsplit("/", 1)[-1] for path in paths_list]
+    modules_entities: List[List] = [[] for _ in paths_list]
+    bases = [strings[index] for index in columns["entity_base"]]
+    start = 0
+    for module, name, entity_type, lineno, endno, end in zip(
+        columns["entity_module"],
+        columns["entity_name"],
+        columns["entity_type"],
+        columns["entity_lineno"],
+        columns["entity_endno"],
+        columns["entity_bases_end"],
+    ):
+        entity_class = ENTITY_TYPES[entity_type]
+        if entity_class is Class:
+            entity = Class(strings[name], bases[start:end], files_names[module], lineno)
+        else:
+            entity = entity_class(strings[name], files_names[module], lineno)
+        if endno >= 0:
+            entity.endno = endno
+        modules_entities[module].append(entity)
+        start = end
+    modules_data = dict(zip(paths_list, modules_entities))
+
+    dependencies: Dict[Text, Dict[Text, List[Text]]] = {path: {} for path in paths_list}
+    used = [strings[index] for index in columns["dependency"]]
+    start = 0
+    for module, entity, end in zip(columns["graph_module"], columns["graph_entity"], columns["graph_deps_end"]):
+        dependencies[paths_list[module]][strings[entity]] = used[start:end]
+        start = end
+
+    imports: Dict[Text, List[Text]] = {}
+    for module, imported in zip(columns["import_module"], columns["import_path"]):
+        imports.setdefault(paths_list[module], []).append(paths_list[imported])
+
+    raw_imports: Dict[Text, set] = {}
+    for module, name in zip(columns["raw_import_mod"], columns["raw_import_name"]):
+        raw_imports.setdefault(paths_list[module], set()).add(strings[name])
+    return paths_list, modules_data, dependencies, imports, raw_imports
@@ -0,0 +1,104 @@
+"""
+layout of graph computed in Python, so viewer shows graph at once instead of running force simulation from
+random positions each time HTML is opened.
+
+Layout is hierarchical: entities are placed on rings around their module, modules of one package (folder)
+are packed in rows to package block, package blocks and block of external dependencies are packed in rows too.
+It depends only on graph, so the same graph always has the same layout.
+"""
+import math
+import os
+from typing import Dict, List, Tuple
+
+from codegraph.vizualyzer import iter_d3_links, iter_d3_nodes
+
+Position = Tuple[float, float]
+
+RING_RADIUS = 90  # radius of the first ring of entities around module
+RING_GAP = 50  # distance between rings of entities
+ENTITY_SPACING = 45  # distance between entities on ring
+MODULE_RADIUS = 45  # half of the biggest module square side
+MODULE_PADDING = 40  # space around module with its entities, for labels
+PACKAGE_PADDING = 150  # space between package blocks
+EXTERNAL_SPACING = 80  # distance between external dependencies
+
+
+def get_ring_offsets(count: int) -> Tuple[List[Position], float]:
+    """offsets of count entities from module center and radius of the outer ring"""
+    offsets: List[Position] = []
+    radius = RING_RADIUS
+    outer_radius = 0.0
+    while len(offsets) < count:
+        on_ring = min(max(1, int(2 * math.pi * radius / ENTITY_SPACING)), count - len(offsets))
+        for i in range(on_ring):
+            angle = 2 * math.pi * i / on_ring
+            offsets.append((radius * math.cos(angle), radius * math.sin(angle)))
+        outer_radius = radius
+        radius += RING_GAP
+    return offsets, outer_radius
+
+
+def pack_rows(sizes: List[Position]) -> Tuple[List[Position], float, float]:
+    """
+        place boxes with sizes (width, height) in rows, so the block of boxes is about square
+    :return: centers of boxes relative to top left corner of block, width and height of block
+    """
+    if not sizes:
+        return [], 0.0, 0.0
+    row_width = max(math.sqrt(sum(width * height for width, height in sizes)), max(width for width, _ in sizes))
+    centers: List[Position] = []
+    x = y = row_height = block_width = 0.0
+    for width, height in sizes:
+        if x > 0 and x + width > row_width:
+            y += row_height
+            x = row_height = 0.0
+        centers.append((x + width / 2, y + height / 2))
+        x += width
+        row_height = max(row_height, height)
+        block_width = max(block_width, x)
+    return centers, block_width, y + row_height
+
+
+def compute_layout(modules_entities: Dict, entity_metadata: Dict = None) -> Dict[str, Position]:
+    """positions of nodes of D3.js data (iter_d3_nodes(), iter_d3_links()) by node id"""
+    packages: Dict[str, List[str]] = {}
+    module_entities: Dict[str, List[str]] = {}
+    for node in iter_d3_nodes(modules_entities, entity_metadata):
+        if node["type"] == "module":
+            packages.setdefault(os.path.dirname(node["fullPath"]), []).append(node["id"])
+            module_entities[node["id"]] = []
+        else:
+            module_entities[node["parent"]].append(node["id"])
+    externals = sorted(item["id"] for kind, item in iter_d3_links(modules_entities) if kind == "node")
+
+    # blocks: list of (width, height, {node id: position relative to top left corner of block})
+    blocks: List[Tuple[float, float, Dict[str, Position]]] = []
+    for package in sorted(packages):
+        modules = sorted(packages[package])
+        clusters = []
+        for module in modules:
+            offsets, radius = get_ring_offsets(len(module_entities[module]))
+            clusters.append((offsets, max(radius, MODULE_RADIUS) + MODULE_PADDING))
+        centers, width, height = pack_rows([(radius * 2, radius * 2) for _, radius in clusters])
+        positions: Dict[str, Position] = {}
+        for module, (offsets, _), (x, y) in zip(modules, clusters, centers):
+            x, y = x + PACKAGE_PADDING / 2, y + PACKAGE_PADDING / 2
+            positions[module] = (x, y)
+            for entity, (dx, dy) in zip(module_entities[module], offsets):
+                positions[entity] = (x + dx, y + dy)
+        blocks.append((width + PACKAGE_PADDING, height + PACKAGE_PADDING, positions))
+
+    if externals:
+        centers, width, height = pack_rows([(EXTERNAL_SPACING, EXTERNAL_SPACING)] * len(externals))
+        positions = {
+            external: (x + PACKAGE_PADDING / 2, y + PACKAGE_PADDING / 2) for external, (x, y) in zip(externals, centers)
+        }
+        blocks.append((width + PACKAGE_PADDING, height + PACKAGE_PADDING, positions))
+
+    layout: Dict[str, Position] = {}
+    centers, _, _ = pack_rows([(width, height) for width, height, _ in blocks])
+    for (width, height, positions), (x, y) in zip(blocks, centers):
+        left, top = x - width / 2, y - height / 2
+        for node_id, (node_x, node_y) in positions.items():
+            layout.setdefault(node_id, (round(left + node_x, 1), round(top + node_y, 1)))
+    return layout
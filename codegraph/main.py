@@ -3,18 +3,39 @@
 import logging
 import pprint
 import sys
+import tokenize
 from argparse import Namespace
 
 import click
 
 from codegraph import __version__, core
+from codegraph.cache import DEFAULT_CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
+# errors of reading and parsing of one module, e.g. file is saved in the middle of editing or deleted before read
+MODULE_ERRORS = (OSError, SyntaxError, UnicodeDecodeError, tokenize.TokenError)
+
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 
-@click.command(context_settings=CONTEXT_SETTINGS)
+class DefaultCommandGroup(click.Group):
+    """group that runs default command if first argument is not a name of command: codegraph PATHS"""
+
+    default_command = "graph"
+
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands:
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup, context_settings=CONTEXT_SETTINGS)
+def cli():
+    pass
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
 @click.version_option(version=__version__, message="CodeGraph version %(version)s")
 @click.argument("paths", nargs=-1, type=click.Path(exists=True))
 @click.option(
@@ -25,6 +46,12 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 )
 @click.option("--file-path", help="File path to start dependency search from")
 @click.option("--distance", type=int, help="Distance to search for dependencies")
+@click.option(
+    "--git-diff",
+    metavar="RANGE",
+    help="Output only modules changed in git diff RANGE (\"base..head\" or \"base\") and modules linked to them "
+    "up to --distance (default: 1)",
+)
 @click.option(
     "--matplotlib",
     is_flag=True,
@@ -35,17 +62,128 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
     type=click.Path(),
     help="Output path for D3.js HTML file (default: ./codegraph.html)",
 )
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Embed graph data in HTML in compact form (integer columns with strings table, no indentation)",
+)
+@click.option(
+    "--compress",
+    is_flag=True,
+    help="Embed graph data in HTML as base64 string with gzip-compressed JSON, decompressed in browser",
+)
+@click.option(
+    "--lazy",
+    is_flag=True,
+    help="Write graph data to folder next to HTML file, entities are loaded by package on module expand "
+    "(serve folder over HTTP to view)",
+)
+@click.option(
+    "--precompute-layout",
+    is_flag=True,
+    help="Compute node positions in Python and embed them in HTML, viewer starts without force simulation",
+)
+@click.option(
+    "--packages",
+    is_flag=True,
+    help="Roll modules up to package (folder) nodes with weighted links, viewer starts with top level packages "
+    "and expands package on click (not used with --lazy)",
+)
 @click.option(
     "--csv",
     type=click.Path(),
     help="Export graph data to CSV file (specify output path)",
 )
-def cli(paths, object_only, file_path, distance, matplotlib, output, csv):
+@click.option(
+    "--csv-edges",
+    type=click.Path(),
+    help="Export graph links (source, target, type) to separate CSV file, nodes are exported to --csv path",
+)
+@click.option(
+    "--graph-file",
+    type=click.Path(),
+    help="Export graph to compact binary file (specify output path), read it with codegraph.load_graph()",
+)
+@click.option(
+    "--snapshot",
+    type=click.Path(),
+    help="Save usage graph to snapshot file (specify output path) to compare it later with codegraph diff",
+)
+@click.option(
+    "--sqlite",
+    type=click.Path(dir_okay=False),
+    help="Write modules, entities, imports and edges to SQLite database (specify path), only changed modules "
+    "are rewritten in existing database, query it with codegraph.store.GraphStore",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    help="Skip files and folders matching .gitignore-style pattern (can be repeated), added to default excludes "
+    "(hidden .* files and folders, node_modules, site-packages, top level venv, env, build, dist, ...), "
+    "\"!pattern\" re-includes",
+)
+@click.option(
+    "--include",
+    multiple=True,
+    help="Use only python files matching .gitignore-style pattern or inside of matching folders (can be repeated)",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of processes to parse files (and threads to walk folders) in parallel (0 - use all CPUs)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=DEFAULT_CACHE_DIR,
+    show_default="$XDG_CACHE_HOME/codegraph or ~/.cache/codegraph",
+    help="Directory to store parsed modules cache between runs",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Don't use parsed modules cache, parse all files from scratch",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and update graph output on each change of python files in PATHS",
+)
+def graph(
+    paths,
+    object_only,
+    file_path,
+    distance,
+    git_diff,
+    matplotlib,
+    output,
+    compact,
+    compress,
+    lazy,
+    precompute_layout,
+    packages,
+    csv,
+    csv_edges,
+    graph_file,
+    snapshot,
+    sqlite,
+    exclude,
+    include,
+    jobs,
+    cache_dir,
+    no_cache,
+    watch,
+):
     """
     Tool that creates a graph of code to show dependencies between code entities (methods, classes, etc.).
     CodeGraph does not execute code, it is based only on lex and syntax parsing.
 
     PATHS: Provide path(s) to code base
+
+    Run "codegraph diff --help" to compare two snapshots of graph.
     """
     if not paths:
         click.echo(
@@ -59,17 +197,96 @@ def cli(paths, object_only, file_path, distance, matplotlib, output, csv):
         object_only=object_only,
         file_path=file_path,
         distance=distance,
+        git_diff=git_diff,
         matplotlib=matplotlib,
         output=output,
+        compact=compact,
+        compress=compress,
+        lazy=lazy,
+        precompute_layout=precompute_layout,
+        packages=packages,
         csv=csv,
+        csv_edges=csv_edges,
+        graph_file=graph_file,
+        snapshot=snapshot,
+        sqlite=sqlite,
+        exclude=list(exclude),
+        include=list(include),
+        jobs=jobs,
+        cache_dir=None if no_cache else cache_dir,
+        watch=watch,
     )
     main(args)
 
 
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("old_snapshot", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new_snapshot", type=click.Path(exists=True, dir_okay=False))
+@click.option("--json", "json_path", type=click.Path(), help="Export added and removed items to JSON file")
+@click.option("--csv", "csv_path", type=click.Path(), help="Export added and removed items to CSV file")
+@click.option(
+    "--output",
+    type=click.Path(),
+    help="Output path for D3.js HTML file with coloured changes (default: ./codegraph_diff.html, "
+    "written if --json and --csv are not set)",
+)
+@click.option("--fail-on-change", is_flag=True, help="Exit with code 1 if snapshots are different")
+def diff(old_snapshot, new_snapshot, json_path, csv_path, output, fail_on_change):
+    """
+    Compare two snapshots of graph (saved with --snapshot) and show added and removed modules, entities and links.
+
+    OLD_SNAPSHOT, NEW_SNAPSHOT: Paths to snapshot files
+    """
+    from codegraph import diff as graph_diff
+
+    try:
+        old_graph, old_metadata = graph_diff.load_snapshot(old_snapshot)
+        new_graph, new_metadata = graph_diff.load_snapshot(new_snapshot)
+    except graph_diff.SnapshotError as e:
+        raise click.ClickException(str(e))
+    changes = graph_diff.diff_graphs(old_graph, new_graph)
+    click.echo(graph_diff.format_summary(changes))
+    if json_path:
+        graph_diff.export_diff_to_json(changes, json_path)
+        click.echo(f"Diff exported to JSON: {json_path}")
+    if csv_path:
+        graph_diff.export_diff_to_csv(changes, csv_path)
+        click.echo(f"Diff exported to CSV: {csv_path}")
+    if output or not (json_path or csv_path):
+        graph_diff.draw_diff_graph(old_graph, new_graph, old_metadata, new_metadata, output_path=output)
+    if fail_on_change and graph_diff.has_changes(changes):
+        sys.exit(1)
+
+
 def main(args):
     code_graph = core.CodeGraph(args)
     usage_graph = code_graph.usage_graph()
+    output_graph(args, code_graph, usage_graph)
+    if getattr(args, "watch", False):
+        watch(args, code_graph)
+
+
+def output_graph(args, code_graph: core.CodeGraph, usage_graph: dict, open_browser: bool = True):
     entity_metadata = code_graph.get_entity_metadata()
+    deleted = {}
+
+    if getattr(args, "git_diff", None):
+        from codegraph.git import GitError, get_diff_files
+
+        changed = {}
+        try:
+            # each path is resolved in its own repository, overlapping paths give the same files
+            for path in args.paths:
+                path_changed, path_deleted = get_diff_files(args.git_diff, path)
+                changed.update(dict.fromkeys(path_changed))
+                deleted.update(dict.fromkeys(path_deleted))
+        except GitError as e:
+            raise click.ClickException(str(e))
+        usage_graph = code_graph.get_affected_graph(changed, args.distance or 1, deleted_paths=deleted)
+        click.echo(
+            f"Files changed in {args.git_diff}: {len(changed)}, deleted: {len(deleted)}, "
+            f"modules in affected graph: {len(usage_graph)}"
+        )
 
     if args.file_path and args.distance:
         dependencies = code_graph.get_dependencies(args.file_path, args.distance)
@@ -78,17 +295,92 @@ def main(args):
             click.echo(f"  Distance {distance}: {', '.join(files)}")
     elif args.object_only:
         pprint.pprint(usage_graph)
-    elif args.csv:
+    elif args.csv or getattr(args, "csv_edges", None):
         import codegraph.vizualyzer as vz
 
-        vz.export_to_csv(usage_graph, entity_metadata=entity_metadata, output_path=args.csv)
+        vz.export_to_csv(
+            usage_graph,
+            entity_metadata=entity_metadata,
+            output_path=args.csv,
+            edges_path=getattr(args, "csv_edges", None),
+        )
+    elif getattr(args, "graph_file", None):
+        from codegraph.graph_file import export_to_graph_file
+
+        export_to_graph_file(usage_graph, entity_metadata=entity_metadata, output_path=args.graph_file)
+    elif getattr(args, "snapshot", None):
+        from codegraph.diff import get_snapshot_root, save_snapshot
+
+        save_snapshot(args.snapshot, usage_graph, entity_metadata=entity_metadata, root=get_snapshot_root(args.paths))
+        click.echo(f"Snapshot saved: {args.snapshot}")
+    elif getattr(args, "sqlite", None):
+        from codegraph.store import export_to_sqlite
+
+        export_to_sqlite(
+            usage_graph,
+            entity_metadata=entity_metadata,
+            imports=code_graph.imports,
+            output_path=args.sqlite,
+            roots=args.paths,
+            # affected graph of --git-diff is a part of code base, only deleted modules are removed from store
+            deleted=deleted if getattr(args, "git_diff", None) else None,
+        )
     else:
         import codegraph.vizualyzer as vz
 
         if args.matplotlib:
             vz.draw_graph_matplotlib(usage_graph)
         else:
-            vz.draw_graph(usage_graph, entity_metadata=entity_metadata, output_path=args.output)
+            vz.draw_graph(
+                usage_graph,
+                entity_metadata=entity_metadata,
+                output_path=args.output,
+                open_browser=open_browser,
+                compact=getattr(args, "compact", False),
+                compress=getattr(args, "compress", False),
+                lazy=getattr(args, "lazy", False),
+                precompute_layout=getattr(args, "precompute_layout", False),
+                packages=getattr(args, "packages", False),
+            )
+
+
+def update_by_module(code_graph: core.CodeGraph, changed: list, deleted: list) -> dict:
+    """
+        apply changes module by module after failed update of the whole burst, modules that can't be read or parsed
+        are skipped with message, they are updated on the next change of file
+    """
+    usage_graph = code_graph.usage_graph()
+    for module_changed, module_deleted in [([], deleted), *[([path], []) for path in changed]]:
+        try:
+            usage_graph = code_graph.update(changed=module_changed, deleted=module_deleted)
+        except MODULE_ERRORS as e:
+            click.echo(f"Skipped {', '.join(module_changed or module_deleted)}: {type(e).__name__}: {e}", err=True)
+    return usage_graph
+
+
+def watch(args, code_graph: core.CodeGraph):
+    """update graph and output on each change of python files, graph is not re-built from scratch"""
+    from codegraph.watcher import Watcher
+
+    def on_change(changed, deleted):
+        click.echo(f"Files changed: {len(changed)}, deleted: {len(deleted)}, updating graph")
+        try:
+            usage_graph = code_graph.update(changed=changed, deleted=deleted)
+        except MODULE_ERRORS:
+            usage_graph = update_by_module(code_graph, changed, deleted)
+        output_graph(args, code_graph, usage_graph, open_browser=False)
+
+    watcher = Watcher(
+        args.paths,
+        paths_list=code_graph.paths_list,
+        exclude=getattr(args, "exclude", None) or (),
+        include=getattr(args, "include", None) or (),
+    )
+    click.echo("Watching for changes, press Ctrl+C to stop")
+    try:
+        watcher.watch(on_change)
+    except KeyboardInterrupt:
+        click.echo("Stopped watching")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,349 @@
+"""
+SQLite database with modules, entities, imports and edges of usage graph for ad-hoc queries over code bases.
+
+Tables:
+
+    modules   id, path (unique), root (scanned path that module belongs to), name (file name without .py), lines,
+              digest of module rows
+    entities  id, module_id, name, type ("function", "class"), lineno, endno, lines
+    imports   module_id, path of imported module of code base
+    edges     module_id, entity (using entity, "_" - module level code), dependency (as in usage graph),
+              target_module (module name from dependency, NULL for entities of the same module), target_entity,
+              count (count of lines where dependency is used)
+
+Dependency "module_b.func_b" of entity in module_a.py targets entity func_b of module module_b.py imported
+by module_a.py, dependency "func_a" - entity func_a of module_a.py. Rows of module are rewritten only if
+its digest changed, so writing of graph after small changes of code base takes a few statements.
+Each write touches only modules under its roots (PATHS of codegraph command), so one database can keep
+graphs of several code bases.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Text, Tuple
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS modules (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    lines INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS modules_name ON modules (name);
+CREATE INDEX IF NOT EXISTS modules_root ON modules (root);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    module_id INTEGER NOT NULL REFERENCES modules (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    lineno INTEGER,
+    endno INTEGER,
+    lines INTEGER NOT NULL,
+    UNIQUE (module_id, name)
+);
+CREATE INDEX IF NOT EXISTS entities_name ON entities (name);
+CREATE INDEX IF NOT EXISTS entities_lines ON entities (lines);
+CREATE TABLE IF NOT EXISTS imports (
+    module_id INTEGER NOT NULL REFERENCES modules (id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    PRIMARY KEY (module_id, path)
+);
+CREATE INDEX IF NOT EXISTS imports_path ON imports (path);
+CREATE TABLE IF NOT EXISTS edges (
+    id INTEGER PRIMARY KEY,
+    module_id INTEGER NOT NULL REFERENCES modules (id) ON DELETE CASCADE,
+    entity TEXT NOT NULL,
+    dependency TEXT NOT NULL,
+    target_module TEXT,
+    target_entity TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS edges_source ON edges (module_id, entity);
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target_entity, target_module, module_id);
+"""
+
+# conditions of edges e that target entity t of module mm: dependency from the same module
+# and dependency from module that imports mm, each of them is looked up in edges_target index
+LOCAL_EDGES = "e.target_entity = t.name AND e.target_module IS NULL AND e.module_id = t.module_id"
+IMPORTED_EDGES = """
+    e.target_entity = t.name AND e.target_module = mm.name AND (
+        e.module_id = mm.id OR EXISTS (SELECT 1 FROM imports i WHERE i.module_id = e.module_id AND i.path = mm.path)
+    )
+"""
+
+
+class StoreError(ValueError):
+    """database is not a codegraph store or it's schema version is not supported"""
+
+
+def split_dependency(dependency: Text) -> Tuple[Optional[Text], Text]:
+    """module name and entity name of dependency from usage graph, module is None for local dependencies"""
+    if "." not in dependency:
+        return None, dependency
+    parts = dependency.split(".")
+    return parts[0], parts[1]
+
+
+def is_under(path: Text, root: Text) -> bool:
+    return path == root or path.startswith(root.rstrip("/") + "/")
+
+
+def get_module_root(path: Text, roots: List[Text]) -> Text:
+    """the innermost of roots that contains module path, folder of module if it is not under any of roots"""
+    return max((root for root in roots if is_under(path, root)), key=len, default=os.path.dirname(path))
+
+
+def get_module_rows(entities_metadata: Dict, dependencies: Dict, imports: Iterable[Text]) -> Dict[Text, List]:
+    """rows of module for entities, imports and edges tables (without module id)"""
+    edges: Dict[Tuple[Text, Text], int] = {}
+    for entity, used_entities in dependencies.items():
+        for used in used_entities:
+            edges[(entity, used)] = edges.get((entity, used), 0) + 1
+    return {
+        "entities": [
+            (name, data["entity_type"], data["lineno"], data["endno"], data["lines"])
+            for name, data in entities_metadata.items()
+        ],
+        "imports": sorted(set(imports)),
+        "edges": [(entity, used, *split_dependency(used), count) for (entity, used), count in edges.items()],
+    }
+
+
+class GraphStore:
+    """
+    Usage graph in SQLite database. write() adds or updates modules of CodeGraph (only changed ones are rewritten)
+    and removes modules of its roots that are not in code base anymore, queries run in database without loading
+    of graph.
+    """
+
+    def __init__(self, path: Text):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.connection.close()
+            raise StoreError(f"{path} has unsupported schema version {version}")
+        if version == 0:
+            tables = self.connection.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+            if tables:
+                self.connection.close()
+                raise StoreError(f"{path} is not a codegraph store")
+            with self.connection:
+                self.connection.executescript(SCHEMA)
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def upsert_module(
+        self, path: Text, entities_metadata: Dict, dependencies: Dict, imports: Iterable[Text], root: Text = None
+    ) -> bool:
+        """
+            add module or replace its rows, if module rows are not changed - nothing is written
+        :param root: scanned path that module belongs to, folder of module if not set
+        :return: True if module was written
+        """
+        if root is None:
+            root = os.path.dirname(path)
+        rows = get_module_rows(entities_metadata, dependencies, imports)
+        digest = hashlib.sha1(json.dumps(rows, separators=(",", ":")).encode("utf-8")).hexdigest()
+        row = self.connection.execute("SELECT id, root, digest FROM modules WHERE path = ?", (path,)).fetchone()
+        if row is not None and row["digest"] == digest:
+            if row["root"] != root:
+                self.connection.execute("UPDATE modules SET root = ? WHERE id = ?", (root, row["id"]))
+            return False
+        lines = sum(data["lines"] for data in entities_metadata.values())
+        if row is None:
+            module_id = self.connection.execute(
+                "INSERT INTO modules (path, root, name, lines, digest) VALUES (?, ?, ?, ?, ?)",
+                (path, root, os.path.basename(path)[: -len(".py")], lines, digest),
+            ).lastrowid
+        else:
+            module_id = row["id"]
+            self.connection.execute(
+                "UPDATE modules SET root = ?, lines = ?, digest = ? WHERE id = ?", (root, lines, digest, module_id)
+            )
+            for table in ("entities", "imports", "edges"):
+                self.connection.execute(f"DELETE FROM {table} WHERE module_id = ?", (module_id,))
+        self.connection.executemany(
+            "INSERT INTO entities (module_id, name, type, lineno, endno, lines) VALUES (?, ?, ?, ?, ?, ?)",
+            [(module_id, *entity) for entity in rows["entities"]],
+        )
+        self.connection.executemany(
+            "INSERT INTO imports (module_id, path) VALUES (?, ?)", [(module_id, path) for path in rows["imports"]]
+        )
+        self.connection.executemany(
+            "INSERT INTO edges (module_id, entity, dependency, target_module, target_entity, count) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(module_id, *edge) for edge in rows["edges"]],
+        )
+        return True
+
+    def remove_modules(self, paths: Iterable[Text]) -> None:
+        self.connection.executemany("DELETE FROM modules WHERE path = ?", [(path,) for path in paths])
+
+    def write(
+        self,
+        modules_entities: Dict,
+        entity_metadata: Dict = None,
+        imports: Dict = None,
+        roots: Iterable[Text] = None,
+        deleted: Iterable[Text] = None,
+    ) -> Tuple[int, int]:
+        """
+            write usage graph in one transaction, modules of other roots are not changed
+        :param modules_entities: usage graph (CodeGraph.usage_graph())
+        :param entity_metadata: CodeGraph.get_entity_metadata()
+        :param imports: paths of modules imported by each module (CodeGraph.imports)
+        :param roots: scanned files and folders (PATHS), modules of database under them that are not in graph
+            are removed, if not set - common folder of graph modules
+        :param deleted: paths of deleted modules if graph is only a part of code base
+            (CodeGraph.get_affected_graph()), only these modules are removed
+        :return: count of written and removed modules
+        """
+        entity_metadata = entity_metadata or {}
+        imports = imports or {}
+        if roots is None and modules_entities:
+            roots = [os.path.commonpath([os.path.dirname(path) for path in modules_entities])]
+        roots = [Path(os.path.abspath(root)).as_posix() for root in roots or ()]
+        with self.connection:
+            stored = {row["path"] for row in self.connection.execute("SELECT path FROM modules")}
+            if deleted is None:
+                removed = {
+                    path for path in stored - modules_entities.keys() if any(is_under(path, root) for root in roots)
+                }
+            else:
+                removed = stored & set(deleted)
+            self.remove_modules(removed)
+            written = 0
+            for path, dependencies in modules_entities.items():
+                root = get_module_root(path, roots)
+                written += self.upsert_module(
+                    path, entity_metadata.get(path, {}), dependencies, imports.get(path, ()), root
+                )
+        return written, len(removed)
+
+    def query(self, sql: Text, parameters: Iterable = ()) -> List[sqlite3.Row]:
+        """run any SQL query over store tables"""
+        return self.connection.execute(sql, tuple(parameters)).fetchall()
+
+    def find_entities(
+        self,
+        entity_type: Text = None,
+        min_lines: int = None,
+        min_links_in: int = None,
+        min_links_out: int = None,
+        module: Text = None,
+        root: Text = None,
+        limit: int = None,
+    ) -> List[Dict]:
+        """
+            entities with count of incoming (edges from other entities) and outgoing links,
+            e.g. functions over 200 lines with more than 30 incoming links:
+            find_entities("function", min_lines=201, min_links_in=31)
+        :param entity_type: "function" or "class"
+        :param module: GLOB pattern of module path, e.g. "*/api/*"
+        :param root: only modules written with this root (scanned path of code base)
+        :return: dicts with path, root, name, type, lineno, endno, lines, links_in, links_out, sorted by links_in
+        """
+        conditions = []
+        parameters: List = []
+        if entity_type is not None:
+            conditions.append("t.type = ?")
+            parameters.append(entity_type)
+        if min_lines is not None:
+            conditions.append("t.lines >= ?")
+            parameters.append(min_lines)
+        if module is not None:
+            conditions.append("mm.path GLOB ?")
+            parameters.append(module)
+        if root is not None:
+            conditions.append("mm.root = ?")
+            parameters.append(Path(os.path.abspath(root)).as_posix())
+        having = []
+        if min_links_in is not None:
+            having.append("links_in >= ?")
+            parameters.append(min_links_in)
+        if min_links_out is not None:
+            having.append("links_out >= ?")
+            parameters.append(min_links_out)
+        sql = f"""
+            SELECT mm.path, mm.root, t.name, t.type, t.lineno, t.endno, t.lines,
+                (SELECT count(*) FROM edges e WHERE {LOCAL_EDGES})
+                + (SELECT count(*) FROM edges e WHERE {IMPORTED_EDGES}) AS links_in,
+                (SELECT count(*) FROM edges e WHERE e.module_id = t.module_id AND e.entity = t.name) AS links_out
+            FROM entities t JOIN modules mm ON mm.id = t.module_id
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        """
+        sql = f"SELECT * FROM ({sql}) {'WHERE ' + ' AND '.join(having) if having else ''}"
+        sql += " ORDER BY links_in DESC, path, name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [dict(row) for row in self.query(sql, parameters)]
+
+    def get_links_in(self, path: Text, entity: Text) -> List[Tuple[Text, Text]]:
+        """(module path, entity) of entities that use entity of module"""
+        rows = self.query(
+            f"""
+            SELECT m.path, e.entity FROM entities t
+            JOIN modules mm ON mm.id = t.module_id
+            JOIN edges e ON ({LOCAL_EDGES}) OR ({IMPORTED_EDGES})
+            JOIN modules m ON m.id = e.module_id
+            WHERE mm.path = ? AND t.name = ?
+            ORDER BY m.path, e.entity
+            """,
+            (path, entity),
+        )
+        return [(row["path"], row["entity"]) for row in rows]
+
+    def get_links_out(self, path: Text, entity: Text) -> List[Text]:
+        """dependencies of entity of module as they are in usage graph"""
+        rows = self.query(
+            "SELECT e.dependency FROM edges e JOIN modules m ON m.id = e.module_id "
+            "WHERE m.path = ? AND e.entity = ? ORDER BY e.id",
+            (path, entity),
+        )
+        return [row["dependency"] for row in rows]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "GraphStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def export_to_sqlite(
+    modules_entities: Dict,
+    entity_metadata: Dict = None,
+    imports: Dict = None,
+    output_path: str = None,
+    roots: Iterable[Text] = None,
+    deleted: Iterable[Text] = None,
+) -> None:
+    """Write graph to SQLite store, only changed modules are rewritten if database exists.
+
+    Args:
+        modules_entities: Graph data with modules and their entities.
+        entity_metadata: Metadata for entities (lines of code, type, lines numbers).
+        imports: Paths of modules imported by each module.
+        output_path: Path to database file. Default: ./codegraph.sqlite
+        roots: Scanned paths, stored modules under them that are not in graph are removed.
+        deleted: Paths of deleted modules if graph is only a part of code base, only they are removed.
+    """
+    import click
+
+    if output_path is None:
+        output_path = os.path.join(os.getcwd(), "codegraph.sqlite")
+    output_path = os.path.abspath(output_path)
+    with GraphStore(output_path) as store:
+        written, removed = store.write(modules_entities, entity_metadata, imports, roots=roots, deleted=deleted)
+    click.echo(f"Graph data written to SQLite store: {output_path} (modules written: {written}, removed: {removed})")
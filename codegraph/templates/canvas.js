@@ -0,0 +1,385 @@
+// Canvas renderer for large graphs: used instead of SVG when graph has more than CANVAS_NODES_THRESHOLD nodes
+// (renderer can be chosen with "?renderer=canvas" or "?renderer=svg" in page URL).
+// Nodes, links and labels are drawn on one <canvas> on animation frame, there is no DOM element per node.
+// main.js works with CanvasLayer objects as with d3 selections of SVG elements: classes and styles set
+// with classed() and style() are kept per item and used to draw it, handlers set with on() are called
+// for node under pointer, which is found with quadtree of visible nodes.
+
+const CANVAS_NODES_THRESHOLD = 3000;
+
+// Colors and widths are the same as in styles.css
+const CANVAS_NODE_STYLES = {
+    package: { fill: '#6a1b9a', collapsedFill: '#4a126c', stroke: '#ce93d8', width: 2, collapsedWidth: 3, dash: [6, 3] },
+    module: { fill: '#009c2c', collapsedFill: '#006618', stroke: '#00ff44', width: 2, collapsedWidth: 3, dash: [4, 2] },
+    entity: { fill: '#4a90d9', collapsedFill: '#2a5080', stroke: '#70b8ff', width: 1.5, collapsedWidth: 2, dash: [3, 2] },
+    external: { fill: '#808080', collapsedFill: '#808080', stroke: '#aaaaaa', width: 1, collapsedWidth: 1, dash: [] }
+};
+const CANVAS_LINK_STYLES = {
+    'package': { color: '#ce93d8', width: 3, opacity: 0.6, dash: [], arrow: 12 },
+    'module-module': { color: '#ff9800', width: 3, opacity: 0.8, dash: [], arrow: 12 },
+    'module-entity': { color: '#009c2c', width: 1.5, opacity: 0.6, dash: [5, 3], arrow: 8 },
+    'dependency': { color: '#d94a4a', width: 1.5, opacity: 0.6, dash: [], arrow: 8 }
+};
+// Stroke of nodes and links changed between snapshots (codegraph diff)
+const CANVAS_CHANGE_STYLES = {
+    added: { color: '#00e676', width: 4, opacity: 0.9, dash: [] },
+    removed: { color: '#ff1744', width: 4, opacity: 0.9, dash: [6, 3] }
+};
+// Labels smaller than this on screen (in pixels) are not drawn
+const CANVAS_MIN_FONT_SIZE = 6;
+
+function useCanvasRenderer(graph) {
+    const renderer = new URLSearchParams(window.location.search).get('renderer');
+    if (renderer === 'canvas' || renderer === 'svg') return renderer === 'canvas';
+    // In lazy mode entities are loaded later, but graph can grow up to all of them
+    return graph.nodes.length + (graph.entitiesCount || 0) > CANVAS_NODES_THRESHOLD;
+}
+
+class CanvasLayer {
+    constructor(renderer) {
+        this.renderer = renderer;
+        this.items = [];
+        this.classes = new Map();  // class name -> set of items with this class
+        this.styles = new Map();  // style name -> value or function of item
+        this.handlers = new Map();
+    }
+
+    has(item, className) {
+        const items = this.classes.get(className);
+        return items !== undefined && items.has(item);
+    }
+
+    getStyle(item, name) {
+        const value = this.styles.get(name);
+        return typeof value === 'function' ? value(item) : value;
+    }
+
+    classed(className, value) {
+        const items = new Set();
+        if (value) {
+            this.items.forEach(d => {
+                if (typeof value !== 'function' || value(d)) items.add(d);
+            });
+        }
+        this.classes.set(className, items);
+        this.renderer.redraw();
+        return this;
+    }
+
+    style(name, value) {
+        this.styles.set(name, value);
+        this.renderer.redraw();
+        return this;
+    }
+
+    on(type, handler) {
+        this.handlers.set(type, handler);
+        return this;
+    }
+
+    // Positions and sizes are taken from items on drawing, so attributes are not stored
+    attr() {
+        this.renderer.redraw();
+        return this;
+    }
+
+    select() {
+        return this;
+    }
+
+    selectAll() {
+        return this;
+    }
+
+    each() {
+        return this;
+    }
+}
+
+class CanvasRenderer {
+    // nodeRadius(d) - radius of node circle or half of module (package) square side, labelOffset(d) - label y offset
+    constructor(container, width, height, nodeRadius, labelOffset) {
+        this.width = width;
+        this.height = height;
+        this.nodeRadius = nodeRadius;
+        this.labelOffset = labelOffset;
+        this.ratio = window.devicePixelRatio || 1;
+        this.canvas = d3.select(container)
+            .append("canvas")
+            .attr("width", width * this.ratio)
+            .attr("height", height * this.ratio)
+            .style("width", width + "px")
+            .style("height", height + "px");
+        this.context = this.canvas.node().getContext("2d");
+        this.transform = d3.zoomIdentity;
+        this.nodes = new CanvasLayer(this);
+        this.links = new CanvasLayer(this);
+        this.labels = new CanvasLayer(this);
+        this.quadtree = null;
+        this.maxRadius = 0;
+        this.hovered = null;
+        this.frameRequested = false;
+        this.bindPointerEvents();
+    }
+
+    setData(nodes, links) {
+        this.nodes.items = nodes;
+        this.labels.items = nodes;
+        this.links.items = links;
+        this.redraw();
+    }
+
+    setTransform(transform) {
+        this.transform = transform;
+        this.redraw();
+    }
+
+    // Draw on next animation frame, all changes before it are drawn at once
+    redraw() {
+        this.quadtree = null;
+        if (this.frameRequested) return;
+        this.frameRequested = true;
+        requestAnimationFrame(() => {
+            this.frameRequested = false;
+            this.draw();
+        });
+    }
+
+    // Visible node under point in canvas coordinates
+    find(x, y) {
+        if (this.quadtree === null) {
+            const visibleNodes = this.nodes.items.filter(d => !this.nodes.has(d, 'node-hidden') && d.x !== undefined);
+            this.quadtree = d3.quadtree(visibleNodes, d => d.x, d => d.y);
+            this.maxRadius = d3.max(visibleNodes, this.nodeRadius) || 0;
+        }
+        const [px, py] = this.transform.invert([x, y]);
+        const r = this.maxRadius;
+        let found = null;
+        let foundDistance = Infinity;
+        this.quadtree.visit((quad, x0, y0, x1, y1) => {
+            if (!quad.length) {
+                do {
+                    const d = quad.data;
+                    const dx = Math.abs(d.x - px);
+                    const dy = Math.abs(d.y - py);
+                    const distance = d.type === 'module' || d.type === 'package' ? Math.max(dx, dy) : Math.hypot(dx, dy);
+                    if (distance <= this.nodeRadius(d) && distance < foundDistance) {
+                        found = d;
+                        foundDistance = distance;
+                    }
+                } while ((quad = quad.next));
+            }
+            return x0 > px + r || x1 < px - r || y0 > py + r || y1 < py - r;
+        });
+        return found;
+    }
+
+    bindPointerEvents() {
+        const dispatch = (type, event, d) => {
+            const handler = this.nodes.handlers.get(type);
+            if (handler && d) handler.call(this.canvas.node(), event, d);
+        };
+        this.canvas
+            .on("mousemove.nodes", event => {
+                const d = this.find(...d3.pointer(event));
+                if (d === this.hovered) return;
+                dispatch("mouseout", event, this.hovered);
+                this.hovered = d;
+                dispatch("mouseover", event, d);
+                this.canvas.style("cursor", d ? "pointer" : null);
+                this.redraw();
+            })
+            .on("mouseleave.nodes", event => {
+                dispatch("mouseout", event, this.hovered);
+                this.hovered = null;
+                this.redraw();
+            })
+            .on("click.nodes", event => {
+                // Click after drag of node or pan is prevented by d3.drag / d3.zoom
+                if (event.defaultPrevented) return;
+                dispatch("click", event, this.find(...d3.pointer(event)));
+            })
+            .on("dblclick.nodes", event => {
+                dispatch("dblclick", event, this.find(...d3.pointer(event)));
+            });
+    }
+
+    draw() {
+        const ctx = this.context;
+        const t = this.transform;
+        ctx.setTransform(1, 0, 0, 1, 0, 0);
+        ctx.clearRect(0, 0, this.width * this.ratio, this.height * this.ratio);
+        ctx.setTransform(this.ratio * t.k, 0, 0, this.ratio * t.k, this.ratio * t.x, this.ratio * t.y);
+
+        // Visible area in graph coordinates with margin for node sizes and labels, items out of it are not drawn
+        const margin = 100;
+        const [x0, y0] = t.invert([0, 0]);
+        const [x1, y1] = t.invert([this.width, this.height]);
+        const bounds = { x0: x0 - margin, y0: y0 - margin, x1: x1 + margin, y1: y1 + margin };
+
+        this.drawLinks(ctx, bounds);
+        this.drawNodes(ctx, bounds);
+        this.drawLabels(ctx, bounds);
+        ctx.globalAlpha = 1;
+    }
+
+    drawLinks(ctx, bounds) {
+        // Links with the same style are drawn with one path
+        const groups = new Map();
+        this.links.items.forEach(l => {
+            const s = l.source;
+            const t = l.target;
+            if (typeof s !== 'object' || typeof t !== 'object' || this.links.has(l, 'link-hidden')) return;
+            if (Math.max(s.x, t.x) < bounds.x0 || Math.min(s.x, t.x) > bounds.x1 ||
+                Math.max(s.y, t.y) < bounds.y0 || Math.min(s.y, t.y) > bounds.y1) return;
+            const state = this.links.has(l, 'dimmed') ? 'dimmed' : this.links.has(l, 'highlighted') ? 'highlighted' : '';
+            const opacity = this.links.getStyle(l, 'stroke-opacity');
+            // Width of weighted links depends on weight
+            const width = this.links.getStyle(l, 'stroke-width');
+            const key = `${l.type}|${state}|${opacity}|${width}|${l.change}`;
+            let group = groups.get(key);
+            if (group === undefined) {
+                group = { type: l.type, state: state, opacity: opacity, width: width, change: l.change, links: [] };
+                groups.set(key, group);
+            }
+            group.links.push(l);
+        });
+
+        groups.forEach(group => {
+            const typeStyle = CANVAS_LINK_STYLES[group.type] || CANVAS_LINK_STYLES.dependency;
+            const style = group.change ? { ...typeStyle, ...CANVAS_CHANGE_STYLES[group.change] } : typeStyle;
+            let opacity = group.opacity !== undefined ? +group.opacity : style.opacity;
+            if (group.state === 'highlighted') opacity = 1;
+            ctx.globalAlpha = group.state === 'dimmed' ? opacity * 0.05 : opacity;
+            ctx.strokeStyle = style.color;
+            ctx.fillStyle = style.color;
+            ctx.lineWidth = group.width ? parseFloat(group.width) : style.width;
+            ctx.setLineDash(style.dash);
+            ctx.beginPath();
+            group.links.forEach(l => {
+                ctx.moveTo(l.source.x, l.source.y);
+                ctx.lineTo(l.target.x, l.target.y);
+            });
+            ctx.stroke();
+
+            // Arrows at node border, not drawn when they are too small to see
+            const size = style.arrow;
+            if (size * this.transform.k < 2) return;
+            ctx.beginPath();
+            group.links.forEach(l => {
+                const dx = l.target.x - l.source.x;
+                const dy = l.target.y - l.source.y;
+                const length = Math.hypot(dx, dy);
+                if (!length) return;
+                const ux = dx / length;
+                const uy = dy / length;
+                const r = this.nodeRadius(l.target);
+                const x = l.target.x - ux * r;
+                const y = l.target.y - uy * r;
+                ctx.moveTo(x, y);
+                ctx.lineTo(x - ux * size - uy * size / 2, y - uy * size + ux * size / 2);
+                ctx.lineTo(x - ux * size + uy * size / 2, y - uy * size - ux * size / 2);
+                ctx.closePath();
+            });
+            ctx.fill();
+        });
+        ctx.setLineDash([]);
+    }
+
+    addNodeShape(ctx, d) {
+        const r = this.nodeRadius(d);
+        if (d.type === 'module' || d.type === 'package') {
+            ctx.rect(d.x - r, d.y - r, r * 2, r * 2);
+        } else {
+            ctx.moveTo(d.x + r, d.y);
+            ctx.arc(d.x, d.y, r, 0, 2 * Math.PI);
+        }
+    }
+
+    drawNodes(ctx, bounds) {
+        const groups = new Map();
+        const glowing = [];
+        this.nodes.items.forEach(d => {
+            if (d.x < bounds.x0 || d.x > bounds.x1 || d.y < bounds.y0 || d.y > bounds.y1) return;
+            if (this.nodes.has(d, 'node-hidden')) return;
+            const collapsed = this.nodes.has(d, 'collapsed');
+            const dimmed = this.nodes.has(d, 'dimmed');
+            const key = `${d.type}|${collapsed}|${dimmed}|${d.change}`;
+            let group = groups.get(key);
+            if (group === undefined) {
+                group = { type: d.type, collapsed: collapsed, dimmed: dimmed, change: d.change, nodes: [] };
+                groups.set(key, group);
+            }
+            group.nodes.push(d);
+            const filter = this.nodes.getStyle(d, 'filter');
+            if (d === this.hovered || (filter && filter !== 'none') ||
+                this.nodes.has(d, 'highlighted') || this.nodes.has(d, 'highlighted-main')) {
+                glowing.push(d);
+            }
+        });
+
+        groups.forEach(group => {
+            const style = CANVAS_NODE_STYLES[group.type] || CANVAS_NODE_STYLES.external;
+            const change = CANVAS_CHANGE_STYLES[group.change];
+            ctx.globalAlpha = group.dimmed ? 0.15 : group.change === 'removed' ? 0.6 : 1;
+            ctx.fillStyle = group.collapsed ? style.collapsedFill : style.fill;
+            ctx.strokeStyle = change ? change.color : style.stroke;
+            ctx.lineWidth = change ? change.width : group.collapsed ? style.collapsedWidth : style.width;
+            ctx.setLineDash(change ? change.dash : group.collapsed ? style.dash : []);
+            ctx.beginPath();
+            group.nodes.forEach(d => this.addNodeShape(ctx, d));
+            ctx.fill();
+            ctx.stroke();
+        });
+        ctx.setLineDash([]);
+
+        // Hovered and highlighted nodes are outlined with glow on top of others
+        glowing.forEach(d => {
+            const filter = this.nodes.getStyle(d, 'filter');
+            if (filter && filter !== 'none') {
+                ctx.shadowColor = '#ff9800';
+                ctx.shadowBlur = 10;
+            } else if (this.nodes.has(d, 'highlighted-main')) {
+                ctx.shadowColor = 'rgba(112, 184, 255, 0.8)';
+                ctx.shadowBlur = 15;
+            } else if (this.nodes.has(d, 'highlighted')) {
+                ctx.shadowColor = 'rgba(255, 255, 255, 0.5)';
+                ctx.shadowBlur = 8;
+            }
+            ctx.globalAlpha = 1;
+            ctx.strokeStyle = '#ffffff';
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            this.addNodeShape(ctx, d);
+            ctx.stroke();
+            ctx.shadowBlur = 0;
+        });
+    }
+
+    drawLabels(ctx, bounds) {
+        const k = this.transform.k;
+        ctx.textAlign = 'center';
+        ctx.lineJoin = 'round';
+        ctx.lineWidth = 3;
+        ctx.strokeStyle = '#000000';
+        ctx.fillStyle = '#ffffff';
+        let font = null;
+        this.labels.items.forEach(d => {
+            if (d.x < bounds.x0 || d.x > bounds.x1 || d.y < bounds.y0 || d.y > bounds.y1) return;
+            if (this.labels.has(d, 'label-hidden')) return;
+            const bold = d.type === 'module' || d.type === 'package';
+            const fontSize = bold ? 13 : 11;
+            if (fontSize * k < CANVAS_MIN_FONT_SIZE && !this.nodes.has(d, 'highlighted-main')) return;
+            const labelFont = bold ? `bold ${fontSize}px sans-serif` : `${fontSize}px sans-serif`;
+            if (labelFont !== font) {
+                font = labelFont;
+                ctx.font = font;
+            }
+            ctx.globalAlpha = this.labels.has(d, 'dimmed') ? 0.1 : 1;
+            const text = d.label || d.id;
+            const y = d.y + this.labelOffset(d);
+            ctx.strokeText(text, d.x, y);
+            ctx.fillText(text, d.x, y);
+        });
+    }
+}
@@ -0,0 +1,105 @@
+// Decode graph data embedded in compact form (convert_to_compact_format() in vizualyzer.py):
+// columns of integers with strings table -> nodes and links objects
+function decodeGraphData(data) {
+    if (data.format !== 'compact') return data;
+
+    const strings = data.strings;
+    const columns = data.nodes;
+    const nodes = new Array(columns.type.length);
+    for (let i = 0; i < nodes.length; i++) {
+        const type = data.nodeTypes[columns.type[i]];
+        const label = strings[columns.label[i]];
+        if (type === 'module') {
+            nodes[i] = {
+                id: label,
+                type: type,
+                collapsed: false,
+                fullPath: strings[columns.path[i]],
+                lines: columns.lines[i]
+            };
+        } else if (type === 'entity') {
+            const parent = nodes[columns.parent[i]].id;
+            nodes[i] = {
+                id: parent + ':' + label,
+                label: label,
+                type: type,
+                parent: parent,
+                lines: columns.lines[i],
+                entityType: strings[columns.entityType[i]]
+            };
+        } else {
+            nodes[i] = { id: label, type: type, label: label };
+        }
+        // Positions precomputed in Python (draw_graph(..., precompute_layout=True))
+        if (columns.x) {
+            nodes[i].x = columns.x[i];
+            nodes[i].y = columns.y[i];
+        }
+    }
+
+    const links = new Array(data.links.source.length);
+    const linkedModules = new Set();
+    for (let i = 0; i < links.length; i++) {
+        const type = data.linkTypes[data.links.type[i]];
+        const source = nodes[data.links.source[i]].id;
+        const target = nodes[data.links.target[i]].id;
+        links[i] = { source: source, target: target, type: type };
+        if (type === 'module-module') {
+            linkedModules.add(source);
+            linkedModules.add(target);
+        }
+    }
+
+    // Modules with no connections (neither incoming nor outgoing)
+    const unlinkedModules = nodes
+        .filter(n => n.type === 'module' && !linkedModules.has(n.id))
+        .map(n => ({ id: n.id, fullPath: n.fullPath }))
+        .sort((a, b) => (a.id < b.id ? -1 : a.id > b.id ? 1 : 0));
+
+    return { nodes: nodes, links: links, unlinkedModules: unlinkedModules, layout: data.layout };
+}
+
+// Graph data is embedded as JSON or as base64 string with gzip-compressed JSON (draw_graph(..., compress=True)),
+// compressed data is decompressed with DecompressionStream, so HTML file stays self-contained
+function loadGraphData(data) {
+    if (data.format === 'lazy') {
+        const url = new URL(data.url, document.baseURI).href;
+        return fetchJSON(url).then(graph => {
+            graph.baseUrl = url;
+            return graph;
+        });
+    }
+    if (typeof data !== 'string') {
+        return Promise.resolve(decodeGraphData(data));
+    }
+    const binary = atob(data);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return new Response(stream).json().then(decodeGraphData);
+}
+
+// Lazy mode (draw_graph(..., lazy=True)): module level graph and shards with entities are separate JSON files
+// next to HTML file, they can be fetched only when HTML file is served over HTTP
+function fetchJSON(url) {
+    return fetch(url)
+        .catch(error => {
+            throw new Error(error.message + ' (serve folder with HTML file over HTTP, e.g. python -m http.server)');
+        })
+        .then(response => {
+            if (!response.ok) throw new Error(url + ': ' + response.status + ' ' + response.statusText);
+            return response.json();
+        });
+}
+
+// Shard i of lazy graph: entities of one package with their links
+function fetchGraphShard(graph, index) {
+    return fetchJSON(new URL(graph.shards[index], graph.baseUrl).href);
+}
+
+function showLoadError(error) {
+    console.error(error);
+    document.getElementById('graph').textContent = 'Failed to load graph data: ' + error;
+}
@@ -45,25 +45,151 @@ document.querySelectorAll('.panel').forEach(panel => {
 
 // Calculate stats
 const moduleCount = graphData.nodes.filter(n => n.type === 'module').length;
-const entityCount = graphData.nodes.filter(n => n.type === 'entity').length;
+// In lazy mode entities are not loaded at start, their count comes with graph data
+const entityCount = graphData.entitiesCount !== undefined
+    ? graphData.entitiesCount
+    : graphData.nodes.filter(n => n.type === 'entity').length;
 const moduleLinks = graphData.links.filter(l => l.type === 'module-module').length;
 document.getElementById('stats-content').innerHTML = `
+    ${graphData.packages ? `<p>Packages: ${graphData.packages.length}</p>` : ''}
     <p>Modules: ${moduleCount}</p>
     <p>Entities: ${entityCount}</p>
     <p>Module connections: ${moduleLinks}</p>
+    ${graphData.diff ? Object.entries(graphData.diff).map(([kind, counts]) =>
+        `<p class="diff-stats">Changed ${kind}: <span class="diff-added">+${counts.added}</span> ` +
+        `<span class="diff-removed">-${counts.removed}</span></p>`).join('') : ''}
 `;
 
-// Calculate links count for each node
-const nodeLinksMap = {};
-graphData.nodes.forEach(n => {
-    nodeLinksMap[n.id] = { linksIn: 0, linksOut: 0 };
-});
-graphData.links.forEach(l => {
-    const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
-    const targetId = typeof l.target === 'object' ? l.target.id : l.target;
-    if (nodeLinksMap[sourceId]) nodeLinksMap[sourceId].linksOut++;
-    if (nodeLinksMap[targetId]) nodeLinksMap[targetId].linksIn++;
-});
+// Track collapsed nodes (modules and entities)
+const collapsedNodes = new Set();
+
+// In lazy mode entities are loaded when module is expanded, so modules start collapsed
+const lazyLoading = graphData.format === 'lazy';
+// In package mode graph starts with top level packages, package is replaced by its subpackages and modules
+// on click, links between packages are rolled up from weighted module links. Modules start collapsed too,
+// entities of module are added to graph when it is expanded
+const packageMode = graphData.format === 'packages';
+if (lazyLoading || packageMode) {
+    graphData.nodes.forEach(n => {
+        if (n.type === 'module') collapsedNodes.add(n.id);
+    });
+}
+
+// All nodes and links of graph, in package mode graphData has only nodes and links shown on graph
+const allNodes = graphData.nodes;
+const allLinks = graphData.links;
+const allNodesById = packageMode ? new Map(allNodes.map(n => [n.id, n])) : null;
+const packagesById = new Map((graphData.packages || []).map(p => [p.id, p]));
+const expandedPackages = new Set();
+
+// Id of node that shows module on graph: module itself or its top collapsed package
+function getVisibleNodeId(moduleNode) {
+    let visibleId = moduleNode.id;
+    for (let p = moduleNode.package; p && p !== graphData.rootPackage; p = packagesById.get(p).parent) {
+        if (!expandedPackages.has(p)) visibleId = p;
+    }
+    return visibleId;
+}
+
+// Package is shown when it is collapsed and all packages between it and root package are expanded
+function isPackageShown(packageId) {
+    let parent = packagesById.get(packageId).parent;
+    while (parent !== graphData.rootPackage) {
+        if (parent === null || !expandedPackages.has(parent)) return false;
+        parent = packagesById.get(parent).parent;
+    }
+    return !expandedPackages.has(packageId);
+}
+
+// Nodes and links shown with current expanded packages and modules
+function buildPackageView() {
+    const nodes = [];
+    const shown = new Set();
+    const show = n => {
+        if (!shown.has(n.id)) {
+            shown.add(n.id);
+            nodes.push(n);
+        }
+    };
+    graphData.packages.forEach(p => {
+        if (isPackageShown(p.id)) show(p);
+    });
+    // Module nodes go before nodes of their entities
+    const visibleIds = new Map();
+    allNodes.forEach(n => {
+        if (n.type === 'module') {
+            visibleIds.set(n.id, getVisibleNodeId(n));
+            if (visibleIds.get(n.id) === n.id) show(n);
+        } else if (n.type === 'entity' && shown.has(n.parent) && !collapsedNodes.has(n.parent)) {
+            show(n);
+        }
+    });
+
+    const links = [];
+    allLinks.forEach(l => {
+        if (!shown.has(linkEndId(l.source))) return;
+        const target = allNodesById.get(linkEndId(l.target));
+        // External dependencies are shown with entities that use them
+        if (target.type === 'external') show(target);
+        if (shown.has(target.id)) links.push(l);
+    });
+
+    // Links of modules in collapsed packages are rolled up to packages, their weights are summed
+    const packageLinks = new Map();
+    graphData.weightedLinks.forEach(l => {
+        const source = visibleIds.get(l.source);
+        const target = visibleIds.get(l.target);
+        if (source === target || (source === l.source && target === l.target)) return;
+        const key = `${source}\n${target}`;
+        const packageLink = packageLinks.get(key);
+        if (packageLink) {
+            packageLink.weight += l.weight;
+        } else {
+            packageLinks.set(key, { source: source, target: target, type: 'package', weight: l.weight });
+        }
+    });
+    return { nodes: nodes, links: links.concat(Array.from(packageLinks.values())) };
+}
+
+if (packageMode) {
+    const view = buildPackageView();
+    graphData.nodes = view.nodes;
+    graphData.links = view.links;
+}
+
+// Adjacency index: built once and extended when nodes are added, so highlight, collapse
+// and panels look at links of one node instead of scanning all links
+const nodesById = new Map();
+const linksOut = new Map();  // node id -> links from node
+const linksIn = new Map();  // node id -> links to node
+
+function linkEndId(end) {
+    return typeof end === 'object' ? end.id : end;
+}
+
+function addToIndex(nodes, links) {
+    nodes.forEach(n => {
+        nodesById.set(n.id, n);
+        linksOut.set(n.id, []);
+        linksIn.set(n.id, []);
+    });
+    links.forEach(l => {
+        const sourceLinks = linksOut.get(linkEndId(l.source));
+        const targetLinks = linksIn.get(linkEndId(l.target));
+        if (sourceLinks) sourceLinks.push(l);
+        if (targetLinks) targetLinks.push(l);
+    });
+}
+addToIndex(graphData.nodes, graphData.links);
+
+// Nodes sorted by lines of code for massive objects panel
+let nodesByLines = [];
+function sortNodesByLines() {
+    nodesByLines = graphData.nodes
+        .filter(n => (n.type === 'entity' || n.type === 'module') && n.lines)
+        .sort((a, b) => b.lines - a.lines);
+}
+sortNodesByLines();
 
 // Populate unlinked modules panel
 const unlinkedModules = graphData.unlinkedModules || [];
@@ -102,7 +228,7 @@ function updateLinksCount() {
     const nodesWithLinks = graphData.nodes
         .filter(n => n.type === 'module' || n.type === 'entity')
         .map(n => {
-            const links = nodeLinksMap[n.id] || { linksIn: 0, linksOut: 0 };
+            const links = { linksIn: linksIn.get(n.id).length, linksOut: linksOut.get(n.id).length };
             let total = 0;
             if (countIn && countOut) total = links.linksIn + links.linksOut;
             else if (countIn) total = links.linksIn;
@@ -148,7 +274,7 @@ updateLinksCount();
 let sizeByCode = true;
 
 // Calculate max lines for scaling
-const maxLines = Math.max(...graphData.nodes.map(n => n.lines || 0), 1);
+const maxLines = allNodes.reduce((max, n) => Math.max(max, n.lines || 0), 1);
 
 // Function to get node size based on lines of code
 function getNodeSize(d, baseSize) {
@@ -158,6 +284,35 @@ function getNodeSize(d, baseSize) {
     return baseSize * scale;
 }
 
+// Side of package square grows with count of its modules
+function getPackageSize(d) {
+    return 40 + 10 * Math.log2(d.modules);
+}
+
+// Width of weighted link between packages
+function linkStrokeWidth(l) {
+    return l.weight ? `${Math.min(1.5 + Math.log2(l.weight), 10)}px` : null;
+}
+
+// Radius of entity or external node circle, half of module (package) square side
+function nodeRadius(d) {
+    if (d.type === "package") return getPackageSize(d) / 2;
+    if (d.type === "module") return getNodeSize(d, 30) / 2;
+    if (d.type === "entity") return getNodeSize(d, 10);
+    return 7;
+}
+
+// Offset of label below node
+function labelOffset(d) {
+    if (d.type === "package") {
+        return getPackageSize(d) / 2 + 15;
+    }
+    if (d.type === "module") {
+        return getNodeSize(d, 30) / 2 + 15;
+    }
+    return getNodeSize(d, 10) + 10;
+}
+
 // Function to update massive objects list
 function updateMassiveObjects() {
     const threshold = parseInt(document.getElementById('massive-threshold').value) || 50;
@@ -165,15 +320,16 @@ function updateMassiveObjects() {
     const showClasses = document.getElementById('filter-classes').checked;
     const showFunctions = document.getElementById('filter-functions').checked;
 
-    const massiveNodes = graphData.nodes
-        .filter(n => (n.type === 'entity' || n.type === 'module') && n.lines >= threshold)
+    // Nodes are sorted by lines, so only nodes above threshold are looked at
+    const end = nodesByLines.findIndex(n => n.lines < threshold);
+    const massiveNodes = nodesByLines
+        .slice(0, end === -1 ? nodesByLines.length : end)
         .filter(n => {
             if (n.type === 'module') return showModules;
             if (n.entityType === 'class') return showClasses;
             if (n.entityType === 'function') return showFunctions;
             return true;
-        })
-        .sort((a, b) => b.lines - a.lines);
+        });
 
     document.getElementById('massive-count').textContent = `(${massiveNodes.length})`;
     document.getElementById('massive-list').innerHTML = massiveNodes.map(n => `
@@ -204,70 +360,112 @@ updateMassiveObjects();
 const width = window.innerWidth;
 const height = window.innerHeight;
 
-// Create SVG
-const svg = d3.select("#graph")
+// Large graphs are drawn on canvas instead of SVG (templates/canvas.js)
+const canvasRenderer = useCanvasRenderer(graphData)
+    ? new CanvasRenderer(document.getElementById("graph"), width, height, nodeRadius, labelOffset)
+    : null;
+
+// Create SVG (canvas element for canvas renderer, it is zoomed in the same way)
+const svg = canvasRenderer ? canvasRenderer.canvas : d3.select("#graph")
     .append("svg")
     .attr("width", width)
     .attr("height", height);
 
+if (canvasRenderer) {
+    // Drag of node under pointer, it must be added before zoom to stop panning when node is dragged
+    svg.call(d3.drag()
+        .container(svg.node())
+        .subject(event => {
+            const d = canvasRenderer.find(event.x, event.y);
+            // Subject position on screen, so node keeps its offset from pointer while dragged
+            return d && { node: d, x: canvasRenderer.transform.applyX(d.x), y: canvasRenderer.transform.applyY(d.y) };
+        })
+        .on("start", event => dragstarted(event, event.subject.node))
+        .on("drag", event => {
+            const [x, y] = canvasRenderer.transform.invert([event.x, event.y]);
+            dragged({ x: x, y: y }, event.subject.node);
+        })
+        .on("end", event => dragended(event, event.subject.node)));
+}
+
 // Add zoom behavior
-const g = svg.append("g");
+const g = canvasRenderer ? null : svg.append("g");
 
 const zoom = d3.zoom()
     .scaleExtent([0.05, 4])
     .on("zoom", (event) => {
-        g.attr("transform", event.transform);
+        if (canvasRenderer) {
+            canvasRenderer.setTransform(event.transform);
+        } else {
+            g.attr("transform", event.transform);
+        }
     });
 
 svg.call(zoom);
+if (canvasRenderer) {
+    // Double-click on node unpins or focuses it, as in SVG where node handler stops zoom on double-click
+    svg.on("dblclick.zoom", null);
+}
 
 // Tooltip
 const tooltip = d3.select("#tooltip");
 
-// Track collapsed nodes (modules and entities)
-const collapsedNodes = new Set();
-
-// Create arrow markers for different link types
-const defs = svg.append("defs");
-
-// Module-module arrow (orange)
-defs.append("marker")
-    .attr("id", "arrow-module-module")
-    .attr("viewBox", "0 -5 10 10")
-    .attr("refX", 25)
-    .attr("refY", 0)
-    .attr("markerWidth", 8)
-    .attr("markerHeight", 8)
-    .attr("orient", "auto")
-    .append("path")
-    .attr("fill", "#ff9800")
-    .attr("d", "M0,-5L10,0L0,5");
-
-// Module-entity arrow (green)
-defs.append("marker")
-    .attr("id", "arrow-module-entity")
-    .attr("viewBox", "0 -5 10 10")
-    .attr("refX", 18)
-    .attr("refY", 0)
-    .attr("markerWidth", 6)
-    .attr("markerHeight", 6)
-    .attr("orient", "auto")
-    .append("path")
-    .attr("fill", "#009c2c")
-    .attr("d", "M0,-5L10,0L0,5");
-
-// Dependency arrow (red)
-defs.append("marker")
-    .attr("id", "arrow-dependency")
-    .attr("viewBox", "0 -5 10 10")
-    .attr("refX", 18)
-    .attr("refY", 0)
-    .attr("markerWidth", 6)
-    .attr("markerHeight", 6)
-    .attr("orient", "auto")
-    .append("path")
-    .attr("fill", "#d94a4a")
-    .attr("d", "M0,-5L10,0L0,5");
+// Create arrow markers for different link types (canvas renderer draws arrows itself)
+if (!canvasRenderer) {
+    const defs = svg.append("defs");
+
+    // Package arrow (purple)
+    defs.append("marker")
+        .attr("id", "arrow-package")
+        .attr("viewBox", "0 -5 10 10")
+        .attr("refX", 10)
+        .attr("refY", 0)
+        .attr("markerWidth", 6)
+        .attr("markerHeight", 6)
+        .attr("orient", "auto")
+        .append("path")
+        .attr("fill", "#ce93d8")
+        .attr("d", "M0,-5L10,0L0,5");
+
+    // Module-module arrow (orange)
+    defs.append("marker")
+        .attr("id", "arrow-module-module")
+        .attr("viewBox", "0 -5 10 10")
+        .attr("refX", 25)
+        .attr("refY", 0)
+        .attr("markerWidth", 8)
+        .attr("markerHeight", 8)
+        .attr("orient", "auto")
+        .append("path")
+        .attr("fill", "#ff9800")
+        .attr("d", "M0,-5L10,0L0,5");
+
+    // Module-entity arrow (green)
+    defs.append("marker")
+        .attr("id", "arrow-module-entity")
+        .attr("viewBox", "0 -5 10 10")
+        .attr("refX", 18)
+        .attr("refY", 0)
+        .attr("markerWidth", 6)
+        .attr("markerHeight", 6)
+        .attr("orient", "auto")
+        .append("path")
+        .attr("fill", "#009c2c")
+        .attr("d", "M0,-5L10,0L0,5");
+
+    // Dependency arrow (red)
+    defs.append("marker")
+        .attr("id", "arrow-dependency")
+        .attr("viewBox", "0 -5 10 10")
+        .attr("refX", 18)
+        .attr("refY", 0)
+        .attr("markerWidth", 6)
+        .attr("markerHeight", 6)
+        .attr("orient", "auto")
+        .append("path")
+        .attr("fill", "#d94a4a")
+        .attr("d", "M0,-5L10,0L0,5");
+}
 
 // Scale spacing based on number of nodes
 const nodeCount = graphData.nodes.length;
@@ -276,45 +474,113 @@ const scaleFactor = nodeCount > 40 ? 1 + (nodeCount - 40) / 50 : 1;
 // Create force simulation with adjusted parameters for better spacing
 const simulation = d3.forceSimulation(graphData.nodes)
     .force("link", d3.forceLink(graphData.links).id(d => d.id).distance(d => {
-        const base = d.type === 'module-module' ? 300 : d.type === 'module-entity' ? 100 : 120;
+        const base = d.type === 'module-module' || d.type === 'package' ? 300 : d.type === 'module-entity' ? 100 : 120;
         return base * scaleFactor;
     }).strength(0.3 / scaleFactor))
     .force("charge", d3.forceManyBody().strength(d => {
-        const base = d.type === 'module' ? -800 : -300;
+        const base = d.type === 'module' || d.type === 'package' ? -800 : -300;
         return base * scaleFactor;
     }))
     .force("center", d3.forceCenter(width / 2, height / 2).strength(0.05 / scaleFactor))
     .force("collision", d3.forceCollide().radius(d => {
-        const base = d.type === 'module' ? 80 : 40;
+        const base = d.type === 'package' ? nodeRadius(d) + 40 : d.type === 'module' ? 80 : 40;
         return base * scaleFactor;
     }).strength(1));
 
-// Create links (module-module first so they appear behind)
-const link = g.append("g")
-    .selectAll("line")
-    .data(graphData.links.sort((a, b) => {
-        const order = {'module-module': 0, 'module-entity': 1, 'dependency': 2};
-        return (order[a.type] || 2) - (order[b.type] || 2);
-    }))
-    .join("line")
-    .attr("class", d => `link link-${d.type}`)
-    .attr("marker-end", d => `url(#arrow-${d.type})`);
-
-// Create nodes
-const node = g.append("g")
-    .selectAll("g")
-    .data(graphData.nodes)
-    .join("g")
-    .attr("class", "node")
-    .call(d3.drag()
-        .on("start", dragstarted)
-        .on("drag", dragged)
-        .on("end", dragended));
+// With layout precomputed in Python graph starts static, simulation runs only when "Live layout" is on
+let liveLayout = graphData.layout !== 'precomputed';
+if (!liveLayout) simulation.stop();
+document.getElementById('live-layout').checked = liveLayout;
+document.getElementById('live-layout').addEventListener('change', function() {
+    liveLayout = this.checked;
+    if (liveLayout) {
+        simulation.alpha(0.3).restart();
+    } else {
+        simulation.stop();
+    }
+});
+
+// Layers: links behind nodes, labels on top
+let linkLayer, nodeLayer, labelLayer, link, node, labels;
+if (canvasRenderer) {
+    link = canvasRenderer.links;
+    node = canvasRenderer.nodes;
+    labels = canvasRenderer.labels;
+    bindNodeEvents(node);
+} else {
+    linkLayer = g.append("g");
+    nodeLayer = g.append("g");
+    labelLayer = g.append("g");
+    link = linkLayer.selectAll("line");
+    node = nodeLayer.selectAll("g");
+    labels = labelLayer.selectAll("text");
+}
+
+// Packages on graph are always collapsed: expanded package is replaced by its subpackages and modules
+function isCollapsed(d) {
+    return collapsedNodes.has(d.id) || d.type === 'package';
+}
+
+// Create (or update after new data is loaded) links, nodes and labels
+function renderGraph() {
+    if (canvasRenderer) {
+        canvasRenderer.setData(graphData.nodes, graphData.links);
+        node.classed("collapsed", isCollapsed);
+        link.style("stroke-width", linkStrokeWidth);
+        return;
+    }
+
+    // Create links (module-module first so they appear behind)
+    link = linkLayer
+        .selectAll("line")
+        .data(graphData.links.sort((a, b) => {
+            const order = {'package': 0, 'module-module': 0, 'module-entity': 1, 'dependency': 2};
+            return (order[a.type] || 2) - (order[b.type] || 2);
+        }))
+        .join("line")
+        .attr("class", d => `link link-${d.type}${d.change ? ' change-' + d.change : ''}`)
+        .attr("marker-end", d => `url(#arrow-${d.type})`)
+        .style("stroke-width", linkStrokeWidth);
+
+    // Create nodes
+    node = nodeLayer
+        .selectAll("g")
+        .data(graphData.nodes, d => d.id)
+        .join(enter => enter.append("g")
+            .attr("class", d => `node${d.change ? ' change-' + d.change : ''}`)
+            .each(appendNodeShape)
+            .call(d3.drag()
+                .on("start", dragstarted)
+                .on("drag", dragged)
+                .on("end", dragended))
+            .call(bindNodeEvents));
+    node.select("rect, circle")
+        .classed("collapsed", isCollapsed);
+
+    // Add labels with dynamic positioning based on node size
+    labels = labelLayer
+        .selectAll("text")
+        .data(graphData.nodes, d => d.id)
+        .join("text")
+        .attr("class", d => `label ${d.type === 'module' || d.type === 'package' ? 'label-module' : ''}`)
+        .attr("dy", labelOffset)
+        .attr("text-anchor", "middle")
+        .text(d => d.label || d.id);
+}
 
 // Add shapes based on node type with size based on lines of code
-node.each(function(d) {
+function appendNodeShape(d) {
     const el = d3.select(this);
-    if (d.type === "module") {
+    if (d.type === "package") {
+        const size = getPackageSize(d);
+        el.append("rect")
+            .attr("class", "node-package")
+            .attr("width", size)
+            .attr("height", size)
+            .attr("x", -size / 2)
+            .attr("y", -size / 2)
+            .attr("rx", 10);
+    } else if (d.type === "module") {
         const size = getNodeSize(d, 30);
         el.append("rect")
             .attr("class", "node-module")
@@ -333,7 +599,7 @@ node.each(function(d) {
             .attr("class", "node-external")
             .attr("r", 7);
     }
-});
+}
 
 // Function to update node sizes
 function updateNodeSizes() {
@@ -352,12 +618,7 @@ function updateNodeSizes() {
         }
     });
     // Update labels position
-    labels.attr("dy", d => {
-        if (d.type === "module") {
-            return getNodeSize(d, 30) / 2 + 15;
-        }
-        return getNodeSize(d, 10) + 10;
-    });
+    labels.attr("dy", labelOffset);
 }
 
 // Size toggle event listener
@@ -409,7 +670,7 @@ document.getElementById('show-link-dependency').addEventListener('change', funct
 
 // Check if node should be hidden by display filter
 function isNodeFilteredOut(nodeData) {
-    if (nodeData.type === 'module') return !displayFilters.showModules;
+    if (nodeData.type === 'module' || nodeData.type === 'package') return !displayFilters.showModules;
     if (nodeData.type === 'external') return !displayFilters.showExternal;
     if (nodeData.type === 'entity') {
         if (nodeData.entityType === 'class') return !displayFilters.showClasses;
@@ -420,7 +681,7 @@ function isNodeFilteredOut(nodeData) {
 
 // Check if link should be hidden by display filter
 function isLinkFilteredOut(linkData) {
-    if (linkData.type === 'module-module') return !displayFilters.showLinkModule;
+    if (linkData.type === 'module-module' || linkData.type === 'package') return !displayFilters.showLinkModule;
     if (linkData.type === 'module-entity') return !displayFilters.showLinkEntity;
     if (linkData.type === 'dependency') return !displayFilters.showLinkDependency;
     return false;
@@ -428,11 +689,19 @@ function isLinkFilteredOut(linkData) {
 
 // Update display based on filters
 function updateDisplayFilters() {
+    // Filter and collapse state of each node is checked once
+    const filteredOutNodes = new Set();
+    const hiddenNodes = new Set();
+    graphData.nodes.forEach(n => {
+        if (isNodeFilteredOut(n)) filteredOutNodes.add(n.id);
+        if (isNodeHidden(n)) hiddenNodes.add(n.id);
+    });
+
     // Update node visibility
-    node.classed("node-hidden", d => isNodeFilteredOut(d) || isNodeHidden(d));
+    node.classed("node-hidden", d => filteredOutNodes.has(d.id) || hiddenNodes.has(d.id));
 
     // Update label visibility
-    labels.classed("label-hidden", d => isNodeFilteredOut(d) || isNodeHidden(d));
+    labels.classed("label-hidden", d => filteredOutNodes.has(d.id) || hiddenNodes.has(d.id));
 
     // Update link visibility
     link.classed("link-hidden", d => {
@@ -440,18 +709,16 @@ function updateDisplayFilters() {
         if (isLinkFilteredOut(d)) return true;
 
         // Check if connected nodes are filtered out
-        const sourceId = typeof d.source === 'object' ? d.source.id : d.source;
-        const targetId = typeof d.target === 'object' ? d.target.id : d.target;
-        const sourceNode = graphData.nodes.find(n => n.id === sourceId);
-        const targetNode = graphData.nodes.find(n => n.id === targetId);
+        const sourceId = linkEndId(d.source);
+        const targetId = linkEndId(d.target);
 
-        if (sourceNode && isNodeFilteredOut(sourceNode)) return true;
-        if (targetNode && isNodeFilteredOut(targetNode)) return true;
+        if (filteredOutNodes.has(sourceId)) return true;
+        if (filteredOutNodes.has(targetId)) return true;
 
         // Then check collapse state
-        if (d.type === 'module-module') return false;
-        if (sourceNode && isNodeHidden(sourceNode)) return true;
-        if (targetNode && isNodeHidden(targetNode)) return true;
+        if (d.type === 'module-module' || d.type === 'package') return false;
+        if (hiddenNodes.has(sourceId)) return true;
+        if (hiddenNodes.has(targetId)) return true;
         if (d.type === 'module-entity' && collapsedNodes.has(sourceId)) return true;
         if (d.type === 'dependency' && collapsedNodes.has(sourceId)) return true;
 
@@ -459,97 +726,205 @@ function updateDisplayFilters() {
     });
 }
 
-// Add labels with dynamic positioning based on node size
-const labels = g.append("g")
-    .selectAll("text")
-    .data(graphData.nodes)
-    .join("text")
-    .attr("class", d => `label ${d.type === 'module' ? 'label-module' : ''}`)
-    .attr("dy", d => {
-        if (d.type === "module") {
-            return getNodeSize(d, 30) / 2 + 15;
+// Node interactions
+function bindNodeEvents(selection) {
+    selection.on("mouseover", function(event, d) {
+        // Highlight connected links
+        const connectedLinks = new Set(getConnectedLinks(d.id));
+        link.style("stroke-opacity", l => connectedLinks.has(l) ? 1 : 0.2);
+
+        // Count connections
+        const outgoing = linksOut.get(d.id).length;
+        const incoming = linksIn.get(d.id).length;
+
+        tooltip
+            .style("opacity", 1)
+            .style("left", (event.pageX + 15) + "px")
+            .style("top", (event.pageY - 15) + "px")
+            .html(`
+                <strong>${d.label || d.id}</strong><br>
+                Type: ${d.entityType || d.type}<br>
+                ${d.lines ? 'Lines of code: ' + d.lines + '<br>' : ''}
+                ${d.fullPath ? 'Full Path: ' + d.fullPath + '<br>' : ''}
+                ${d.modules ? 'Modules: ' + d.modules + '<br>' : ''}
+                ${d.type === 'entity' ? 'Module: ' + d.parent + '<br>' : ''}
+                ${d.change ? 'Change: ' + d.change + '<br>' : ''}
+                <div class="links-info">
+                    <span class="links-out">Links out: ${outgoing}</span>
+                    <span class="links-in">Links in: ${incoming}</span>
+                </div>
+                ${isCollapsed(d) ? '<em>(collapsed)</em>' : ''}
+            `);
+    })
+    .on("mouseout", function() {
+        link.style("stroke-opacity", 0.6);
+        tooltip.style("opacity", 0);
+    })
+    .on("click", function(event, d) {
+        if (packageMode && event.altKey) {
+            collapsePackage(d);
+        } else if (d.type === "module" || d.type === "entity" || d.type === "package") {
+            toggleCollapse(d);
         }
-        return getNodeSize(d, 10) + 10;
     })
-    .attr("text-anchor", "middle")
-    .text(d => d.label || d.id);
-
-// Node interactions
-node.on("mouseover", function(event, d) {
-    // Highlight connected links
-    link.style("stroke-opacity", l => {
-        const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
-        const targetId = typeof l.target === 'object' ? l.target.id : l.target;
-        return (sourceId === d.id || targetId === d.id) ? 1 : 0.2;
+    .on("dblclick", function(event, d) {
+        event.stopPropagation();
+        // If node is pinned (was dragged), release it
+        if (d.fx !== null || d.fy !== null) {
+            d.fx = null;
+            d.fy = null;
+            if (liveLayout) simulation.alpha(0.3).restart();
+        } else {
+            // Focus on this node (zoom to it)
+            const scale = 1.5;
+            svg.transition()
+                .duration(500)
+                .call(zoom.transform, d3.zoomIdentity
+                    .translate(width / 2, height / 2)
+                    .scale(scale)
+                    .translate(-d.x, -d.y));
+        }
     });
+}
 
-    // Count connections
-    const outgoing = graphData.links.filter(l => {
-        const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
-        return sourceId === d.id;
-    }).length;
-    const incoming = graphData.links.filter(l => {
-        const targetId = typeof l.target === 'object' ? l.target.id : l.target;
-        return targetId === d.id;
-    }).length;
-
-    tooltip
-        .style("opacity", 1)
-        .style("left", (event.pageX + 15) + "px")
-        .style("top", (event.pageY - 15) + "px")
-        .html(`
-            <strong>${d.label || d.id}</strong><br>
-            Type: ${d.entityType || d.type}<br>
-            ${d.lines ? 'Lines of code: ' + d.lines + '<br>' : ''}
-            ${d.fullPath ? 'Full Path: ' + d.fullPath + '<br>' : ''}
-            ${d.parent ? 'Module: ' + d.parent + '<br>' : ''}
-            <div class="links-info">
-                <span class="links-out">Links out: ${outgoing}</span>
-                <span class="links-in">Links in: ${incoming}</span>
-            </div>
-            ${collapsedNodes.has(d.id) ? '<em>(collapsed)</em>' : ''}
-        `);
-})
-.on("mouseout", function() {
-    link.style("stroke-opacity", 0.6);
-    tooltip.style("opacity", 0);
-})
-.on("click", function(event, d) {
-    if (d.type === "module" || d.type === "entity") {
-        toggleCollapse(d);
+renderGraph();
+
+// Shards of entities loaded in lazy mode: shard index -> promise of load
+const loadedShards = new Map();
+// Links waiting for nodes from shards that are not loaded yet
+let pendingLinks = [];
+
+function loadShard(index) {
+    if (!loadedShards.has(index)) {
+        loadedShards.set(index, fetchGraphShard(graphData, index).then(addGraphData));
     }
-})
-.on("dblclick", function(event, d) {
-    event.stopPropagation();
-    // If node is pinned (was dragged), release it
-    if (d.fx !== null || d.fy !== null) {
-        d.fx = null;
-        d.fy = null;
+    return loadedShards.get(index);
+}
+
+// Add nodes and links from loaded shard to graph and restart simulation
+function addGraphData(data) {
+    const newNodes = data.nodes.filter(n => !nodesById.has(n.id));
+    newNodes.forEach(n => {
+        // Start new nodes near their module, so they don't fly in from the center
+        const parentNode = nodesById.get(n.parent);
+        if (parentNode && n.x === undefined) {
+            n.x = parentNode.x + (Math.random() - 0.5) * 50;
+            n.y = parentNode.y + (Math.random() - 0.5) * 50;
+        }
+        graphData.nodes.push(n);
+        searchIndex.push(toSearchEntry(n));
+    });
+    addToIndex(newNodes, []);
+
+    const newLinks = [];
+    const waitingLinks = [];
+    pendingLinks.concat(data.links).forEach(l => {
+        if (nodesById.has(l.source) && nodesById.has(l.target)) {
+            newLinks.push(l);
+            graphData.links.push(l);
+        } else {
+            waitingLinks.push(l);
+        }
+    });
+    pendingLinks = waitingLinks;
+    addToIndex([], newLinks);
+    refreshGraph();
+}
+
+// Show nodes and links of graphData after they are changed and restart simulation
+function refreshGraph() {
+    sortNodesByLines();
+    updateLinksCount();
+    updateMassiveObjects();
+    renderGraph();
+    simulation.nodes(graphData.nodes);
+    simulation.force("link").links(graphData.links);
+    if (liveLayout) {
         simulation.alpha(0.3).restart();
     } else {
-        // Focus on this node (zoom to it)
-        const scale = 1.5;
-        svg.transition()
-            .duration(500)
-            .call(zoom.transform, d3.zoomIdentity
-                .translate(width / 2, height / 2)
-                .scale(scale)
-                .translate(-d.x, -d.y));
+        ticked();
     }
-});
+}
+
+// Show package view after package or module is expanded or collapsed, nodes new on graph start near anchor node
+function updatePackageView(anchor) {
+    const view = buildPackageView();
+    view.nodes.forEach(n => {
+        if (anchor && n.x === undefined) {
+            n.x = anchor.x + (Math.random() - 0.5) * 50;
+            n.y = anchor.y + (Math.random() - 0.5) * 50;
+        }
+    });
+    graphData.nodes = view.nodes;
+    graphData.links = view.links;
+    nodesById.clear();
+    linksOut.clear();
+    linksIn.clear();
+    addToIndex(graphData.nodes, graphData.links);
+    refreshGraph();
+    updateVisibility();
+}
+
+// Collapse package that contains node back to package node (Alt+Click in package mode)
+function collapsePackage(d) {
+    const moduleNode = d.type === 'entity' ? allNodesById.get(d.parent) : d;
+    const packageId = moduleNode.type === 'package' ? moduleNode.parent : moduleNode.package;
+    if (!expandedPackages.has(packageId)) return;
+    expandedPackages.delete(packageId);
+    updatePackageView(d);
+}
+
+// Expand packages with node (and module of entity) when node hidden in package is selected
+function revealNode(nodeId) {
+    if (nodesById.has(nodeId)) return;
+    let target = allNodesById.get(nodeId) || packagesById.get(nodeId);
+    if (!target) return;
+    if (target.type === 'external') {
+        // External node is shown with entity that uses it
+        target = allNodesById.get(linkEndId(allLinks.find(l => linkEndId(l.target) === nodeId).source));
+    }
+    const moduleNode = target.type === 'entity' ? allNodesById.get(target.parent) : target;
+    if (target.type === 'entity') collapsedNodes.delete(moduleNode.id);
+    let anchor = nodesById.get(moduleNode.id);
+    const firstPackage = moduleNode.type === 'package' ? moduleNode.parent : moduleNode.package;
+    for (let p = firstPackage; p && p !== graphData.rootPackage; p = packagesById.get(p).parent) {
+        expandedPackages.add(p);
+        anchor = nodesById.get(p) || anchor;
+    }
+    updatePackageView(anchor);
+}
 
 function toggleCollapse(targetNode) {
     const nodeId = targetNode.id;
 
+    if (packageMode && targetNode.type === 'package') {
+        // Package is replaced by its subpackages and modules
+        expandedPackages.add(nodeId);
+        updatePackageView(targetNode);
+        return;
+    }
+
+    if (lazyLoading && targetNode.shard !== undefined && !loadedShards.has(targetNode.shard)) {
+        // Entities of module are not loaded yet, expand module after its shard is loaded
+        loadShard(targetNode.shard).then(() => toggleCollapse(targetNode)).catch(showLoadError);
+        return;
+    }
+
     if (collapsedNodes.has(nodeId)) {
         collapsedNodes.delete(nodeId);
     } else {
         collapsedNodes.add(nodeId);
     }
 
+    if (packageMode && targetNode.type === 'module') {
+        // Entities of module are added to graph on expand and removed on collapse
+        updatePackageView(targetNode);
+        return;
+    }
+
     // Update node visual to show collapsed state
     node.select("rect, circle")
-        .classed("collapsed", d => collapsedNodes.has(d.id));
+        .classed("collapsed", isCollapsed);
 
     updateVisibility();
 }
@@ -558,30 +933,21 @@ function getChildNodes(nodeId, nodeType) {
     // Get all nodes that are direct children of this node
     const children = new Set();
 
-    if (nodeType === 'module') {
-        // Module's children are entities with this module as parent
-        graphData.nodes.forEach(n => {
-            if (n.parent === nodeId) {
-                children.add(n.id);
-            }
-        });
-    } else if (nodeType === 'entity') {
-        // Entity's children are nodes it links to via dependency
-        graphData.links.forEach(l => {
-            const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
-            const targetId = typeof l.target === 'object' ? l.target.id : l.target;
-            if (sourceId === nodeId && l.type === 'dependency') {
-                children.add(targetId);
-            }
-        });
-    }
+    // Module's children are its entities (module-entity links),
+    // entity's children are nodes it links to via dependency
+    const childLinkType = nodeType === 'module' ? 'module-entity' : nodeType === 'entity' ? 'dependency' : null;
+    (linksOut.get(nodeId) || []).forEach(l => {
+        if (l.type === childLinkType) {
+            children.add(linkEndId(l.target));
+        }
+    });
 
     return children;
 }
 
 function isNodeHidden(nodeData) {
-    // Module nodes are never hidden
-    if (nodeData.type === 'module') return false;
+    // Module and package nodes are never hidden
+    if (nodeData.type === 'module' || nodeData.type === 'package') return false;
 
     // Check if parent module is collapsed
     if (nodeData.parent && collapsedNodes.has(nodeData.parent)) {
@@ -589,13 +955,11 @@ function isNodeHidden(nodeData) {
     }
 
     // Check if this is a dependency of a collapsed entity
-    for (const link of graphData.links) {
-        const sourceId = typeof link.source === 'object' ? link.source.id : link.source;
-        const targetId = typeof link.target === 'object' ? link.target.id : link.target;
-
-        if (targetId === nodeData.id && link.type === 'dependency') {
+    for (const link of linksIn.get(nodeData.id) || []) {
+        if (link.type === 'dependency') {
             // Check if source entity is collapsed or hidden
-            const sourceNode = graphData.nodes.find(n => n.id === sourceId);
+            const sourceId = linkEndId(link.source);
+            const sourceNode = nodesById.get(sourceId);
             if (sourceNode) {
                 if (collapsedNodes.has(sourceId)) return true;
                 if (sourceNode.parent && collapsedNodes.has(sourceNode.parent)) return true;
@@ -612,7 +976,7 @@ function updateVisibility() {
 }
 
 // Simulation tick
-simulation.on("tick", () => {
+function ticked() {
     link
         .attr("x1", d => d.source.x)
         .attr("y1", d => d.source.y)
@@ -624,11 +988,12 @@ simulation.on("tick", () => {
     labels
         .attr("x", d => d.x)
         .attr("y", d => d.y);
-});
+}
+simulation.on("tick", ticked);
 
 // Drag functions - nodes stay where you drag them
 function dragstarted(event, d) {
-    if (!event.active) simulation.alphaTarget(0.3).restart();
+    if (!event.active && liveLayout) simulation.alphaTarget(0.3).restart();
     d.fx = d.x;
     d.fy = d.y;
 }
@@ -636,6 +1001,12 @@ function dragstarted(event, d) {
 function dragged(event, d) {
     d.fx = event.x;
     d.fy = event.y;
+    if (!liveLayout) {
+        // Without simulation node is moved here
+        d.x = d.fx;
+        d.y = d.fy;
+        ticked();
+    }
 }
 
 function dragended(event, d) {
@@ -644,8 +1015,8 @@ function dragended(event, d) {
     // Double-click to release node back to simulation
 }
 
-// Initial zoom to fit content
-simulation.on("end", () => {
+// Zoom to fit all nodes
+function zoomToFit() {
     // Calculate bounds for ALL nodes
     let minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity;
     graphData.nodes.forEach(n => {
@@ -681,8 +1052,23 @@ simulation.on("end", () => {
             .translate(width / 2, height / 2)
             .scale(scale)
             .translate(-centerX, -centerY));
+}
+
+// Initial zoom to fit content (only once, simulation also ends after loading of shards)
+let initialZoomDone = false;
+simulation.on("end", () => {
+    if (initialZoomDone) return;
+    initialZoomDone = true;
+    zoomToFit();
 });
 
+// Static graph with precomputed layout is shown at once
+if (!liveLayout) {
+    ticked();
+    initialZoomDone = true;
+    zoomToFit();
+}
+
 // ==================== SEARCH FUNCTIONALITY ====================
 
 const searchInput = document.getElementById('searchInput');
@@ -697,46 +1083,38 @@ let currentHighlightedNode = null;
 let filteredNodes = [];
 
 // Build searchable index
-const searchIndex = graphData.nodes.map(n => ({
-    id: n.id,
-    label: n.label || n.id,
-    type: n.type,
-    parent: n.parent || null,
-    searchText: ((n.label || n.id) + ' ' + (n.parent || '')).toLowerCase()
-}));
+function toSearchEntry(n) {
+    return {
+        id: n.id,
+        label: n.label || n.id,
+        type: n.type,
+        parent: n.parent || null,
+        searchText: ((n.label || n.id) + ' ' + (n.parent || '')).toLowerCase()
+    };
+}
+const searchIndex = (graphData.packages || []).concat(allNodes).map(toSearchEntry);
 
 // Get connected nodes for a given node
 function getConnectedNodes(nodeId) {
     const connected = new Set();
     connected.add(nodeId);
 
-    graphData.links.forEach(l => {
-        const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
-        const targetId = typeof l.target === 'object' ? l.target.id : l.target;
-
-        if (sourceId === nodeId) {
-            connected.add(targetId);
-        }
-        if (targetId === nodeId) {
-            connected.add(sourceId);
-        }
-    });
+    (linksOut.get(nodeId) || []).forEach(l => connected.add(linkEndId(l.target)));
+    (linksIn.get(nodeId) || []).forEach(l => connected.add(linkEndId(l.source)));
 
     return connected;
 }
 
 // Get connected links for a given node
 function getConnectedLinks(nodeId) {
-    return graphData.links.filter(l => {
-        const sourceId = typeof l.source === 'object' ? l.source.id : l.source;
-        const targetId = typeof l.target === 'object' ? l.target.id : l.target;
-        return sourceId === nodeId || targetId === nodeId;
-    });
+    return (linksOut.get(nodeId) || []).concat(linksIn.get(nodeId) || []);
 }
 
 // Highlight a node and its connections
 function highlightNode(nodeId) {
+    if (packageMode) revealNode(nodeId);
     const connectedNodes = getConnectedNodes(nodeId);
+    const connectedLinks = new Set(getConnectedLinks(nodeId));
     currentHighlightedNode = nodeId;
 
     // Update nodes
@@ -745,27 +1123,19 @@ function highlightNode(nodeId) {
         .classed('highlighted-main', d => d.id === nodeId);
 
     // Update links
-    link.classed('dimmed', d => {
-        const sourceId = typeof d.source === 'object' ? d.source.id : d.source;
-        const targetId = typeof d.target === 'object' ? d.target.id : d.target;
-        return sourceId !== nodeId && targetId !== nodeId;
-    })
-    .classed('highlighted', d => {
-        const sourceId = typeof d.source === 'object' ? d.source.id : d.source;
-        const targetId = typeof d.target === 'object' ? d.target.id : d.target;
-        return sourceId === nodeId || targetId === nodeId;
-    });
+    link.classed('dimmed', d => !connectedLinks.has(d))
+        .classed('highlighted', d => connectedLinks.has(d));
 
     // Update labels
     labels.classed('dimmed', d => !connectedNodes.has(d.id));
 
     // Show highlight info
-    const nodeData = graphData.nodes.find(n => n.id === nodeId);
+    const nodeData = nodesById.get(nodeId);
     highlightText.textContent = `Highlighting: ${nodeData.label || nodeData.id} (${connectedNodes.size} connected)`;
     highlightInfo.classList.add('visible');
 
     // Zoom to the node
-    const targetNode = graphData.nodes.find(n => n.id === nodeId);
+    const targetNode = nodeData;
     if (targetNode) {
         const scale = 1.2;
         svg.transition()
@@ -842,9 +1212,9 @@ function hideAutocomplete() {
 
 // Select a node from autocomplete
 function selectNode(nodeId) {
-    const nodeData = searchIndex.find(n => n.id === nodeId);
+    const nodeData = nodesById.get(nodeId) || (packageMode && (allNodesById.get(nodeId) || packagesById.get(nodeId)));
     if (nodeData) {
-        searchInput.value = nodeData.label;
+        searchInput.value = nodeData.label || nodeData.id;
         hideAutocomplete();
         highlightNode(nodeId);
     }
@@ -947,7 +1317,8 @@ document.addEventListener('keydown', (e) => {
 document.querySelectorAll('#unlinked-list li').forEach(li => {
     li.addEventListener('click', () => {
         const moduleId = li.dataset.moduleId;
-        const targetNode = graphData.nodes.find(n => n.id === moduleId);
+        if (packageMode) revealNode(moduleId);
+        const targetNode = nodesById.get(moduleId);
         if (targetNode) {
             // Zoom and pan to the node
             const scale = 1.5;
@@ -1,12 +1,243 @@
-import glob
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union
+from typing import FrozenSet, Iterable, List, Optional, Pattern, Tuple, Union
 
+logger = logging.getLogger(__name__)
 
-def get_python_paths_list(paths: Union[str, List]) -> List[str]:
+# hidden files and folders (.git, .venv, .tox, ...) and folders of tools, virtual environments and builds
+# that are never walked (can be re-included with "!name"). Names that can be packages of code base are skipped
+# only in top level of scanned folder.
+DEFAULT_EXCLUDES = (
+    ".*",
+    "*.egg-info",
+    "__pycache__",
+    "node_modules",
+    "site-packages",
+    "/venv/",
+    "/env/",
+    "/build/",
+    "/dist/",
+)
+
+
+def translate_pattern(pattern: str) -> str:
+    """regular expression for .gitignore-style pattern (without "!" and trailing "/")"""
+    # pattern with "/" in the beginning or middle is matched from base folder, other - in any folder
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = "" if anchored else "(?:.*/)?"
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            chars = pattern[i + 1: end]
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            regex += "[" + chars.replace("\\", "\\\\") + "]"
+            i = end + 1
+        else:
+            if pattern[i] == "\\" and i + 1 < len(pattern):
+                i += 1
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex + "$"
+
+
+class IgnorePatterns:
     """
-        return list of paths to python files, that found in provided path
+    .gitignore-style patterns: "*" and "?" match inside one part of path, "**" - any count of parts,
+    pattern with "/" (except trailing) is matched from base folder, other - with the end of path,
+    trailing "/" - pattern matches only folders, "!" - path matched by previous patterns is not ignored.
+    Lines starting with "#" are comments.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        # regex, negated, only folders
+        self.rules: List[Tuple[Pattern, bool, bool]] = []
+        for pattern in patterns:
+            pattern = pattern.rstrip("\n").rstrip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            negated = pattern.startswith("!")
+            if negated:
+                pattern = pattern[1:]
+            elif pattern.startswith("\\"):
+                pattern = pattern[1:]
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if pattern:
+                self.rules.append((re.compile(translate_pattern(pattern)), negated, dir_only))
+
+    @classmethod
+    def from_file(cls, path: str) -> "IgnorePatterns":
+        with open(path, encoding="utf-8", errors="replace") as file:
+            return cls(file)
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """
+            check path relative to base folder (with "/" separators)
+        :return: True if path is ignored, False if it is re-included by "!" pattern, None if no pattern matches
+        """
+        result = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                result = not negated
+        return result
+
+
+# (folder, patterns of .gitignore file in folder), rules of nested folders go after rules of outer ones
+IgnoreRules = List[Tuple[str, IgnorePatterns]]
+# (folder, rules, (st_dev, st_ino) of folder and its parents) - folder is skipped if it is its own parent
+# by symlink, so symlinks to folders are followed without cycles
+WalkFolder = Tuple[str, IgnoreRules, FrozenSet[Tuple[int, int]]]
+
+
+def relative_path(path: str, base: str) -> str:
+    """path relative to base folder with "/" separators, path must be inside of base"""
+    relative = path[len(base):].lstrip(os.sep)
+    return relative if os.sep == "/" else relative.replace(os.sep, "/")
+
+
+def get_parent_ignore_rules(folder: str) -> IgnoreRules:
+    """patterns of .gitignore files in parent folders of folder up to root of git repository (folder with .git)"""
+    rules: IgnoreRules = []
+    parent = os.path.dirname(folder)
+    while parent != folder:
+        if os.path.exists(os.path.join(folder, ".git")):
+            return rules
+        folder, parent = parent, os.path.dirname(parent)
+        ignore_file = os.path.join(folder, ".gitignore")
+        if os.path.isfile(ignore_file):
+            rules.insert(0, (folder, IgnorePatterns.from_file(ignore_file)))
+    # folder is not in git repository
+    return []
+
+
+def is_included(includes: IgnorePatterns, path: str) -> bool:
+    """file is included if include pattern matches it or one of its folders"""
+    parts = path.split("/")
+    if includes.match(path, False):
+        return True
+    return any(includes.match("/".join(parts[:i]), True) for i in range(1, len(parts)))
+
+
+def walk_python_files(
+    root: str,
+    excludes: IgnorePatterns,
+    includes: Optional[IgnorePatterns] = None,
+    gitignore: bool = True,
+    jobs: int = 1,
+) -> List[str]:
+    """
+        find python files in root folder with os.scandir, excluded folders are not walked into,
+        symlinks to folders are followed unless they point to a folder that is already in the walked path (cycle)
+    :param excludes: patterns of paths relative to root to skip
+    :param includes: if set, only files matching these patterns (or inside of matching folders) are returned
+    :param gitignore: skip paths ignored by .gitignore files in walked folders (and in parent folders of root
+        inside of git repository)
+    :param jobs: count of threads to walk top level folders of root in parallel
+    """
+
+    def scan(
+        folder: str, rules: IgnoreRules, ancestors: FrozenSet[Tuple[int, int]]
+    ) -> Tuple[List[str], List[WalkFolder]]:
+        """python files of folder and its subfolders to walk"""
+        ignore_file = os.path.join(folder, ".gitignore")
+        if gitignore and os.path.isfile(ignore_file):
+            rules = rules + [(folder, IgnorePatterns.from_file(ignore_file))]
+        try:
+            with os.scandir(folder) as entries:
+                entries = list(entries)
+        except OSError as e:
+            logger.warning(f"Can't read folder {folder}: {e}")
+            return [], []
+        files: List[str] = []
+        folders: List[WalkFolder] = []
+        for entry in entries:
+            is_dir = entry.is_dir()
+            if not is_dir and not entry.name.endswith(".py"):
+                continue
+            path = relative_path(entry.path, root)
+            if excludes.match(path, is_dir):
+                continue
+            # patterns of nested .gitignore files override patterns of outer ones
+            ignored = False
+            for base, patterns in rules:
+                result = patterns.match(relative_path(entry.path, base), is_dir)
+                if result is not None:
+                    ignored = result
+            if ignored:
+                continue
+            if is_dir:
+                try:
+                    stat = entry.stat()
+                except OSError as e:
+                    logger.warning(f"Can't read folder {entry.path}: {e}")
+                    continue
+                key = (stat.st_dev, stat.st_ino)
+                if key in ancestors:
+                    logger.debug(f"Skipped symlink cycle: {entry.path}")
+                    continue
+                folders.append((entry.path, rules, ancestors | {key}))
+            elif entry.is_file() and (includes is None or is_included(includes, path)):
+                files.append(entry.path)
+        return files, folders
+
+    def walk(folder: str, rules: IgnoreRules, ancestors: FrozenSet[Tuple[int, int]]) -> List[str]:
+        files: List[str] = []
+        stack = [(folder, rules, ancestors)]
+        while stack:
+            folder_files, folders = scan(*stack.pop())
+            files += folder_files
+            stack += folders
+        return files
+
+    root_stat = os.stat(root)
+    files, folders = scan(
+        root, get_parent_ignore_rules(root) if gitignore else [], frozenset([(root_stat.st_dev, root_stat.st_ino)])
+    )
+    if jobs > 1 and len(folders) > 1:
+        # os.scandir releases GIL, so top level folders are walked in threads
+        with ThreadPoolExecutor(min(jobs, len(folders))) as executor:
+            for folder_files in executor.map(lambda item: walk(*item), folders):
+                files += folder_files
+    else:
+        for folder in folders:
+            files += walk(*folder)
+    return files
+
+
+def get_python_paths_list(
+    paths: Union[str, List],
+    exclude: Iterable[str] = (),
+    include: Iterable[str] = (),
+    gitignore: bool = True,
+    jobs: int = 1,
+) -> List[str]:
+    """
+        return sorted list of paths to python files, that found in provided paths (without duplicates)
     :param paths: paths to folder or python file that need to tests
+    :param exclude: .gitignore-style patterns of paths to skip, added to DEFAULT_EXCLUDES
+    :param include: .gitignore-style patterns, if set - only python files matching them are returned
+    :param gitignore: skip paths ignored by .gitignore files in walked folders
+    :param jobs: count of threads to walk top level folders of each path in parallel
     :return:
     """
     if isinstance(paths, str):
@@ -18,13 +249,18 @@ def get_python_paths_list(paths: Union[str, List]) -> List[str]:
             raise ValueError(f"Path {path.as_posix()} does not exists")
         return [path.as_posix()]
 
-    paths_list = []
+    excludes = IgnorePatterns([*DEFAULT_EXCLUDES, *exclude])
+    include = list(include)
+    includes = IgnorePatterns(include) if include else None
+    paths_set = set()
     for path in paths:
-        path = Path(path).absolute()
-        if not path.exists():
-            raise ValueError(f"Path {path.as_posix()} does not exist")
-        paths_list += [
-            Path(p).as_posix()
-            for p in glob.glob(str(path / "**" / "*.py"), recursive=True)
-        ]
-    return paths_list
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            raise ValueError(f"Path {Path(path).as_posix()} does not exist")
+        if os.path.isfile(path):
+            # files provided explicitly are not filtered
+            if path.endswith(".py"):
+                paths_set.add(path)
+            continue
+        paths_set.update(walk_python_files(path, excludes, includes, gitignore=gitignore, jobs=jobs))
+    return sorted(Path(path).as_posix() for path in paths_set)
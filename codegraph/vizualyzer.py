@@ -1,9 +1,13 @@
+import base64
 import csv
+import io
+import itertools
 import json
 import logging
 import os
 import webbrowser
-from typing import Dict, List
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -115,28 +119,35 @@ def draw_graph_matplotlib(modules_entities: Dict) -> None:
     plt.show()
 
 
-def convert_to_d3_format(modules_entities: Dict, entity_metadata: Dict = None) -> Dict:
-    """Convert the modules_entities graph data to D3.js format."""
-    nodes: List[Dict] = []
-    links: List[Dict] = []
+def resolve_entity_module(modules: List[str], preferred: str = None) -> str:
+    """
+    Choose module that defines entity: module from dependency name (or current module for local
+    dependencies) if it defines entity, otherwise the first module that defines it.
+    """
+    if not modules:
+        return None
+    if preferred in modules:
+        return preferred
+    return modules[0]
+
+
+def get_common_root(paths: List[str]) -> str:
+    """Common root of modules paths, one level up to include the root folder name."""
+    if not paths:
+        return ""
+    return os.path.dirname(os.path.commonpath(paths))
+
+
+def iter_d3_nodes(modules_entities: Dict, entity_metadata: Dict = None) -> Iterator[Dict]:
+    """Yield module and entity nodes in D3.js format, each module node goes before nodes of its entities."""
     node_ids = set()
-    module_links = set()  # Track module-to-module links
-    module_full_paths: Dict[str, str] = {}  # Map module name to full path
 
     if entity_metadata is None:
         entity_metadata = {}
 
     # Find common root path for relative paths
-    all_paths = list(modules_entities.keys())
-    if all_paths:
-        common_prefix = os.path.commonpath(all_paths)
-        # Go up one level to include the root folder name
-        common_root = os.path.dirname(common_prefix)
-    else:
-        common_root = ""
+    common_root = get_common_root(list(modules_entities.keys()))
 
-    # First pass: build entity-to-module mapping and create ALL nodes
-    entity_to_module: Dict[str, str] = {}
     for module_path, entities in modules_entities.items():
         module_name = os.path.basename(module_path)
         module_metadata = entity_metadata.get(module_path, {})
@@ -147,27 +158,23 @@ def convert_to_d3_format(modules_entities: Dict, entity_metadata: Dict = None) -
         else:
             relative_path = module_path
 
-        module_full_paths[module_name] = relative_path
-
         # Calculate total lines in module
         total_lines = sum(m.get("lines", 0) for m in module_metadata.values())
 
         # Add module node
         if module_name not in node_ids:
-            nodes.append({
+            yield {
                 "id": module_name,
                 "type": "module",
                 "collapsed": False,
                 "fullPath": relative_path,
                 "lines": total_lines
-            })
+            }
             node_ids.add(module_name)
 
-        # Add entity nodes and build mapping
+        # Add entity nodes
         for entity_name in entities.keys():
             entity_id = f"{module_name}:{entity_name}"
-            entity_to_module[entity_name] = module_name
-            entity_to_module[f"{module_name.replace('.py', '')}.{entity_name}"] = module_name
 
             # Get entity metadata
             ent_meta = module_metadata.get(entity_name, {})
@@ -175,17 +182,33 @@ def convert_to_d3_format(modules_entities: Dict, entity_metadata: Dict = None) -
             entity_type = ent_meta.get("entity_type", "function")
 
             if entity_id not in node_ids:
-                nodes.append({
+                yield {
                     "id": entity_id,
                     "label": entity_name,
                     "type": "entity",
                     "parent": module_name,
                     "lines": lines,
                     "entityType": entity_type
-                })
+                }
                 node_ids.add(entity_id)
 
-    # Second pass: create all links
+
+def iter_d3_links(modules_entities: Dict) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield links in D3.js format as ("link", link), external dependencies nodes are yielded
+    as ("node", node) before the first link to them. Module-to-module links go last.
+    """
+    module_names = {os.path.basename(module_path) for module_path in modules_entities}
+    external_ids = set()
+    module_links: Dict[tuple, None] = {}  # Track module-to-module links (in order of appearance)
+
+    # entity name -> modules that define entity
+    entity_modules: Dict[str, List[str]] = {}
+    for module_path, entities in modules_entities.items():
+        module_name = os.path.basename(module_path)
+        for entity_name in entities:
+            entity_modules.setdefault(entity_name, []).append(module_name)
+
     for module_path, entities in modules_entities.items():
         module_name = os.path.basename(module_path)
 
@@ -193,11 +216,11 @@ def convert_to_d3_format(modules_entities: Dict, entity_metadata: Dict = None) -
             entity_id = f"{module_name}:{entity_name}"
 
             # Link from module to entity
-            links.append({
+            yield "link", {
                 "source": module_name,
                 "target": entity_id,
                 "type": "module-entity"
-            })
+            }
 
             # Links from entity to dependencies
             for dep in dependencies:
@@ -209,67 +232,75 @@ def convert_to_d3_format(modules_entities: Dict, entity_metadata: Dict = None) -
                     parts = dep.split(".")
                     dep_module_name = parts[0]
                     dep_entity = parts[1] if len(parts) > 1 else parts[0]
-                    # Find the actual module from mapping
-                    if dep in entity_to_module:
-                        dep_module = entity_to_module[dep]
-                    elif f"{dep_module_name}.py" in node_ids:
+                    if f"{dep_module_name}.py" in module_names:
                         dep_module = f"{dep_module_name}.py"
 
                 # Special case: module._ means importing from a module (re-export)
                 # This creates a module-to-module link
                 if dep_entity == "_" and dep_module:
-                    link_key = (module_name, dep_module)
-                    if link_key not in module_links:
-                        module_links.add(link_key)
+                    module_links[(module_name, dep_module)] = None
                     continue  # Don't create entity-level link for module imports
 
                 # Try to resolve dependency to existing entity
-                dep_target = None
-                for m_path, m_entities in modules_entities.items():
-                    m_name = os.path.basename(m_path)
-                    if dep_entity in m_entities:
-                        dep_target = f"{m_name}:{dep_entity}"
-                        dep_module = m_name
-                        break
-
-                if dep_target and dep_target in node_ids:
+                dep_module = resolve_entity_module(
+                    entity_modules.get(dep_entity, ()), dep_module if "." in dep else module_name
+                )
+
+                if dep_module:
                     # Link to existing entity
-                    links.append({
+                    yield "link", {
                         "source": entity_id,
-                        "target": dep_target,
+                        "target": f"{dep_module}:{dep_entity}",
                         "type": "dependency"
-                    })
+                    }
                     # Add module-to-module link if different modules
-                    if dep_module and dep_module != module_name:
-                        link_key = (module_name, dep_module)
-                        if link_key not in module_links:
-                            module_links.add(link_key)
+                    if dep_module != module_name:
+                        module_links[(module_name, dep_module)] = None
                 else:
                     # Add as external dependency node
-                    if dep_entity not in node_ids:
-                        nodes.append({
+                    if dep_entity not in external_ids and dep_entity not in module_names:
+                        yield "node", {
                             "id": dep_entity,
                             "type": "external",
                             "label": dep_entity
-                        })
-                        node_ids.add(dep_entity)
+                        }
+                        external_ids.add(dep_entity)
 
-                    links.append({
+                    yield "link", {
                         "source": entity_id,
                         "target": dep_entity,
                         "type": "dependency"
-                    })
+                    }
 
     # Add module-to-module links
     for source_module, target_module in module_links:
-        links.append({
+        yield "link", {
             "source": source_module,
             "target": target_module,
             "type": "module-module"
-        })
+        }
+
+
+def convert_to_d3_format(modules_entities: Dict, entity_metadata: Dict = None, layout: Dict = None) -> Dict:
+    """
+    Convert the modules_entities graph data to D3.js format.
+    With layout (layout.compute_layout() result) nodes have "x" and "y" positions.
+    """
+    nodes: List[Dict] = list(iter_d3_nodes(modules_entities, entity_metadata))
+    links: List[Dict] = []
+    module_full_paths: Dict[str, str] = {
+        node["id"]: node["fullPath"] for node in nodes if node["type"] == "module"
+    }  # Map module name to full path
+
+    for kind, item in iter_d3_links(modules_entities):
+        if kind == "node":
+            nodes.append(item)
+        else:
+            links.append(item)
 
     # Find unlinked modules (no connections at all - neither incoming nor outgoing)
-    all_modules = {n["id"] for n in nodes if n["type"] == "module"}
+    all_modules = set(module_full_paths)
+    module_links = [(link["source"], link["target"]) for link in links if link["type"] == "module-module"]
     # Modules that import something (outgoing)
     modules_with_outgoing = {source for source, target in module_links}
     # Modules that are imported (incoming)
@@ -281,7 +312,204 @@ def convert_to_d3_format(modules_entities: Dict, entity_metadata: Dict = None) -
         for m in sorted(all_modules - linked_modules)
     ]
 
-    return {"nodes": nodes, "links": links, "unlinkedModules": unlinked_modules}
+    graph_data = {"nodes": nodes, "links": links, "unlinkedModules": unlinked_modules}
+    if layout is not None:
+        for node in nodes:
+            node["x"], node["y"] = layout[node["id"]]
+        graph_data["layout"] = "precomputed"
+    return graph_data
+
+
+COMPACT_FORMAT_VERSION = 1
+
+
+def convert_to_compact_format(modules_entities: Dict, entity_metadata: Dict = None, layout: Dict = None) -> Dict:
+    """
+    Convert the modules_entities graph data to compact form of D3.js data: nodes and links are columns
+    of integers, strings are stored once in strings table, links refer to nodes by index.
+    Entity id is not stored - it is "<parent module id>:<label>". Decoded by decodeGraphData() in templates/loader.js.
+    With layout (layout.compute_layout() result) nodes have "x" and "y" columns.
+    """
+    from codegraph.graph_file import LINK_TYPES, NODE_TYPES, StringsTable, build_columns
+
+    strings = StringsTable()
+    columns = build_columns(modules_entities, entity_metadata, strings)
+    compact_data = {
+        "format": "compact",
+        "version": COMPACT_FORMAT_VERSION,
+        "strings": list(strings.indexes),
+        "nodeTypes": list(NODE_TYPES),
+        "linkTypes": list(LINK_TYPES),
+        "nodes": {
+            "type": columns["node_type"].tolist(),
+            "label": columns["node_label"].tolist(),
+            "parent": columns["node_parent"].tolist(),
+            "path": columns["node_path"].tolist(),
+            "lines": columns["node_lines"].tolist(),
+            "entityType": columns["node_entity_type"].tolist(),
+        },
+        "links": {
+            "source": columns["link_source"].tolist(),
+            "target": columns["link_target"].tolist(),
+            "type": columns["link_type"].tolist(),
+        },
+    }
+    if layout is not None:
+        strings_list = compact_data["strings"]
+        positions = [layout[strings_list[node_id]] for node_id in columns["node_id"]]
+        compact_data["nodes"]["x"] = [x for x, _ in positions]
+        compact_data["nodes"]["y"] = [y for _, y in positions]
+        compact_data["layout"] = "precomputed"
+    return compact_data
+
+
+def convert_to_lazy_format(
+    modules_entities: Dict, entity_metadata: Dict = None, layout: Dict = None
+) -> Tuple[Dict, List[Dict]]:
+    """
+    Split D3.js data to module level graph and shards with entities, one shard per package (folder of modules).
+    Module nodes have index of their shard, shard has nodes of entities of its modules, external nodes
+    they use and links from its entities (and from modules to them). Links to entities from other shards
+    are shown by viewer when both shards are loaded.
+
+    Returns:
+        Module level graph (with "shards" - paths of shards files relative to it) and list of shards.
+    """
+    graph_data = convert_to_d3_format(modules_entities, entity_metadata, layout)
+    nodes_by_id = {node["id"]: node for node in graph_data["nodes"]}
+
+    packages: Dict[str, int] = {}
+    module_shards: Dict[str, int] = {}
+    module_nodes: List[Dict] = []
+    for node in graph_data["nodes"]:
+        if node["type"] == "module":
+            shard = packages.setdefault(os.path.dirname(node["fullPath"]), len(packages))
+            module_shards[node["id"]] = shard
+            module_nodes.append({**node, "shard": shard})
+
+    shards: List[Dict] = [{"nodes": [], "links": []} for _ in packages]
+    entities_count = 0
+    for node in graph_data["nodes"]:
+        if node["type"] == "entity":
+            shards[module_shards[node["parent"]]]["nodes"].append(node)
+            entities_count += 1
+
+    module_links: List[Dict] = []
+    shards_externals = [set() for _ in shards]
+    for link in graph_data["links"]:
+        if link["type"] == "module-module":
+            module_links.append(link)
+            continue
+        source = nodes_by_id[link["source"]]
+        shard = module_shards[source["id"] if source["type"] == "module" else source["parent"]]
+        shards[shard]["links"].append(link)
+        target = nodes_by_id[link["target"]]
+        if target["type"] == "external" and target["id"] not in shards_externals[shard]:
+            shards[shard]["nodes"].append(target)
+            shards_externals[shard].add(target["id"])
+
+    lazy_data = {
+        "format": "lazy",
+        "nodes": module_nodes,
+        "links": module_links,
+        "unlinkedModules": graph_data["unlinkedModules"],
+        "entitiesCount": entities_count,
+        "shards": [f"shards/{index}.json" for index in range(len(shards))],
+    }
+    if layout is not None:
+        lazy_data["layout"] = "precomputed"
+    return lazy_data, shards
+
+
+def write_lazy_graph(graph_data: Dict, shards: List[Dict], data_dir: str) -> None:
+    """Write module level graph to graph.json and shards next to it (convert_to_lazy_format() result)."""
+    os.makedirs(os.path.join(data_dir, "shards"), exist_ok=True)
+    with open(os.path.join(data_dir, "graph.json"), "w", encoding="utf-8") as f:
+        json.dump(graph_data, f, separators=(",", ":"))
+    for path, shard in zip(graph_data["shards"], shards):
+        with open(os.path.join(data_dir, path), "w", encoding="utf-8") as f:
+            json.dump(shard, f, separators=(",", ":"))
+
+
+def convert_to_packages_format(modules_entities: Dict, entity_metadata: Dict = None, layout: Dict = None) -> Dict:
+    """
+    D3.js data with package level of detail: modules are rolled up to package nodes (one per folder of modules,
+    id is "<folder>/"), package nodes have "parent" package, "modules" and "lines" of all their modules.
+    Module nodes have their "package", "weightedLinks" are links between modules with weight - count of
+    dependency links between entities of modules (1 for import of module), viewer rolls them up to shown packages.
+    Viewer starts with packages and modules of "rootPackage" - the first folder with more than one item.
+    With layout package positions are centers of their modules.
+    """
+    graph_data = convert_to_d3_format(modules_entities, entity_metadata, layout)
+    nodes_by_id = {node["id"]: node for node in graph_data["nodes"]}
+
+    packages: Dict[str, Dict] = {}
+    child_packages: Dict[Optional[str], List[str]] = {}
+    direct_modules: Dict[Optional[str], int] = {}
+
+    def add_package(folder: str) -> Optional[str]:
+        if not folder:
+            return None
+        package_id = f"{folder}/"
+        if package_id not in packages:
+            parent = add_package(os.path.dirname(folder))
+            packages[package_id] = {
+                "id": package_id,
+                "type": "package",
+                "label": f"{os.path.basename(folder)}/",
+                "fullPath": folder,
+                "parent": parent,
+                "modules": 0,
+                "lines": 0,
+            }
+            child_packages.setdefault(parent, []).append(package_id)
+        return package_id
+
+    positions: Dict[str, List[float]] = {}
+    for node in graph_data["nodes"]:
+        if node["type"] != "module":
+            continue
+        package_id = node["package"] = add_package(os.path.dirname(node["fullPath"]))
+        direct_modules[package_id] = direct_modules.get(package_id, 0) + 1
+        while package_id is not None:
+            package = packages[package_id]
+            package["modules"] += 1
+            package["lines"] += node.get("lines", 0)
+            if layout is not None:
+                position = positions.setdefault(package_id, [0.0, 0.0])
+                position[0] += node["x"]
+                position[1] += node["y"]
+            package_id = package["parent"]
+
+    for package_id, (x, y) in positions.items():
+        package = packages[package_id]
+        package["x"], package["y"] = round(x / package["modules"], 1), round(y / package["modules"], 1)
+
+    root_package = None
+    while not direct_modules.get(root_package) and len(child_packages.get(root_package, [])) == 1:
+        root_package = child_packages[root_package][0]
+
+    weights: Dict[Tuple[str, str], int] = {}
+    for link in graph_data["links"]:
+        if link["type"] == "module-module":
+            # module-module links go after dependency links, import without them has weight 1
+            weights.setdefault((link["source"], link["target"]), 1)
+        elif link["type"] == "dependency":
+            target = nodes_by_id[link["target"]]
+            source_module = nodes_by_id[link["source"]]["parent"]
+            if target["type"] == "entity" and target["parent"] != source_module:
+                key = (source_module, target["parent"])
+                weights[key] = weights.get(key, 0) + 1
+
+    graph_data.update(
+        format="packages",
+        packages=list(packages.values()),
+        rootPackage=root_package,
+        weightedLinks=[
+            {"source": source, "target": target, "weight": weight} for (source, target), weight in weights.items()
+        ],
+    )
+    return graph_data
 
 
 def _get_template_dir() -> str:
@@ -296,34 +524,111 @@ def _read_template_file(filename: str) -> str:
         return f.read()
 
 
-def get_d3_html_template(graph_data: Dict) -> str:
-    """Generate HTML with embedded D3.js visualization."""
-    graph_json = json.dumps(graph_data, indent=2)
+def iter_compressed_base64(chunks: Iterable[str], block_size: int = 3 * 2**16) -> Iterator[str]:
+    """Compress text chunks with gzip and encode compressed data with base64, block by block."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    text: List[str] = []
+    text_size = 0
+    pending = b''
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is not None:
+            # JSON encoder yields small chunks, they are compressed in batches
+            text.append(chunk)
+            text_size += len(chunk)
+            if text_size < block_size:
+                continue
+        pending += compressor.compress(''.join(text).encode('utf-8'))
+        text = []
+        text_size = 0
+        if len(pending) >= block_size:
+            # base64 of bytes count that is multiple of 3 has no padding, so blocks can be joined
+            cut = len(pending) - len(pending) % 3
+            yield base64.b64encode(pending[:cut]).decode('ascii')
+            pending = pending[cut:]
+    pending += compressor.flush()
+    yield base64.b64encode(pending).decode('ascii')
+
+
+def write_d3_html(output_file: TextIO, graph_data: Dict, compact: bool = False, compress: bool = False) -> None:
+    """Write HTML with embedded D3.js visualization to file object.
+
+    Template parts and graph JSON are written one by one, graph JSON is written in chunks
+    produced by JSON encoder, so the whole HTML is never built in memory.
 
+    Args:
+        output_file: Text file object to write HTML to.
+        graph_data: D3.js data (convert_to_d3_format() or convert_to_compact_format() result).
+        compact: Write JSON without indentation.
+        compress: Embed JSON as base64 string with gzip-compressed data, decompressed in browser by loadGraphData().
+    """
     # Read template files
     html_template = _read_template_file('index.html')
-    css_content = _read_template_file('styles.css')
-    js_content = _read_template_file('main.js')
-
-    # Replace placeholders
-    html_content = html_template.replace('/* STYLES_PLACEHOLDER */', css_content)
-    html_content = html_content.replace('/* GRAPH_DATA_PLACEHOLDER */', graph_json)
-    html_content = html_content.replace('/* SCRIPT_PLACEHOLDER */', js_content)
+    head, html_template = html_template.split('/* STYLES_PLACEHOLDER */', 1)
+    loader_head, html_template = html_template.split('/* LOADER_PLACEHOLDER */', 1)
+    body, html_template = html_template.split('/* GRAPH_DATA_PLACEHOLDER */', 1)
+    script_head, tail = html_template.split('/* SCRIPT_PLACEHOLDER */', 1)
 
-    return html_content
+    if compact or compress:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+    else:
+        encoder = json.JSONEncoder(indent=2)
+
+    output_file.write(head)
+    output_file.write(_read_template_file('styles.css'))
+    output_file.write(loader_head)
+    output_file.write(_read_template_file('loader.js'))
+    output_file.write(_read_template_file('canvas.js'))
+    output_file.write(body)
+    if compress:
+        output_file.write('"')
+        for chunk in iter_compressed_base64(encoder.iterencode(graph_data)):
+            output_file.write(chunk)
+        output_file.write('"')
+    else:
+        for chunk in encoder.iterencode(graph_data):
+            # "</script>" in strings must not close script tag
+            output_file.write(chunk.replace('</', '<\\/'))
+    output_file.write(script_head)
+    output_file.write(_read_template_file('main.js'))
+    output_file.write(tail)
 
 
-def draw_graph(modules_entities: Dict, entity_metadata: Dict = None, output_path: str = None) -> None:
+def get_d3_html_template(graph_data: Dict, compact: bool = False, compress: bool = False) -> str:
+    """Generate HTML with embedded D3.js visualization."""
+    html_content = io.StringIO()
+    write_d3_html(html_content, graph_data, compact=compact, compress=compress)
+    return html_content.getvalue()
+
+
+def draw_graph(
+    modules_entities: Dict,
+    entity_metadata: Dict = None,
+    output_path: str = None,
+    open_browser: bool = True,
+    compact: bool = False,
+    compress: bool = False,
+    lazy: bool = False,
+    precompute_layout: bool = False,
+    packages: bool = False,
+) -> None:
     """Generate interactive D3.js visualization and open in browser.
 
     Args:
         modules_entities: Graph data with modules and their entities.
         entity_metadata: Metadata for entities (lines of code, type).
         output_path: Path to save HTML file. Default: ./codegraph.html
+        open_browser: Open saved HTML file in browser.
+        compact: Embed graph data in compact form (convert_to_compact_format()) without indentation.
+        compress: Embed graph data as base64 string with gzip-compressed JSON, decompressed in browser.
+        lazy: Write graph data to "<HTML file name>_data" folder next to HTML file (convert_to_lazy_format()):
+            viewer fetches module level graph first and entities of package when its module is expanded.
+            Folder must be served over HTTP, browsers don't allow to fetch files from file:// page.
+        precompute_layout: Embed node positions computed by layout.compute_layout(), viewer starts
+            with them and doesn't run force simulation until it is turned on.
+        packages: Embed graph data with package nodes (convert_to_packages_format()), viewer starts with
+            top level packages and shows subpackages and modules of package on click.
+            Not used with lazy, used instead of compact.
     """
-    graph_data = convert_to_d3_format(modules_entities, entity_metadata)
-    html_content = get_d3_html_template(graph_data)
-
     # Determine output path
     if output_path is None:
         output_path = os.path.join(os.getcwd(), "codegraph.html")
@@ -331,62 +636,118 @@ def draw_graph(modules_entities: Dict, entity_metadata: Dict = None, output_path
     # Ensure absolute path
     output_path = os.path.abspath(output_path)
 
-    # Save to file
+    layout = None
+    if precompute_layout:
+        from codegraph.layout import compute_layout
+
+        layout = compute_layout(modules_entities, entity_metadata)
+
+    if lazy:
+        data_dir_name = f"{os.path.splitext(os.path.basename(output_path))[0]}_data"
+        lazy_data, shards = convert_to_lazy_format(modules_entities, entity_metadata, layout)
+        write_lazy_graph(lazy_data, shards, os.path.join(os.path.dirname(output_path), data_dir_name))
+        graph_data = {"format": "lazy", "url": f"{data_dir_name}/graph.json"}
+        compact, compress = True, False
+    elif packages:
+        graph_data = convert_to_packages_format(modules_entities, entity_metadata, layout)
+    elif compact:
+        graph_data = convert_to_compact_format(modules_entities, entity_metadata, layout)
+    else:
+        graph_data = convert_to_d3_format(modules_entities, entity_metadata, layout)
+
+    if lazy:
+        import click
+
+        click.echo(
+            f"Graph data saved to {data_dir_name} folder, serve it with HTML file over HTTP: "
+            f"python -m http.server --directory {os.path.dirname(output_path)}"
+        )
+
+    save_html(graph_data, output_path, open_browser=open_browser, compact=compact, compress=compress)
+
+
+def save_html(
+    graph_data: Dict, output_path: str, open_browser: bool = True, compact: bool = False, compress: bool = False
+) -> None:
+    """Save HTML with D3.js data (write_d3_html()) to absolute output_path and open it in browser."""
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+        write_d3_html(f, graph_data, compact=compact, compress=compress)
+
+    # Import click here to avoid circular imports and only when needed
+    import click
+
+    if not open_browser:
+        click.echo(f"Interactive graph saved: {output_path}")
+        return
 
     # Open in default browser
     webbrowser.open(f'file://{output_path}')
 
-    # Import click here to avoid circular imports and only when needed
-    import click
     click.echo(f"Interactive graph saved and opened in browser: {output_path}")
 
 
-def export_to_csv(modules_entities: Dict, entity_metadata: Dict = None, output_path: str = None) -> None:
+CSV_NODES_FIELDS = ['name', 'type', 'parent_module', 'full_path', 'links_out', 'links_in', 'lines']
+CSV_EDGES_FIELDS = ['source', 'target', 'type']
+
+
+def export_to_csv(
+    modules_entities: Dict, entity_metadata: Dict = None, output_path: str = None, edges_path: str = None
+) -> None:
     """Export graph data to CSV file.
 
+    Rows are written as they are produced: links are not kept in memory, only links counts per node.
+
     Args:
         modules_entities: Graph data with modules and their entities.
         entity_metadata: Metadata for entities (lines of code, type).
-        output_path: Path to save CSV file. Default: ./codegraph.csv
+        output_path: Path to save CSV file with nodes. Default: ./codegraph.csv
+        edges_path: Path to save CSV file with links (source, target, type). Not written if not set.
     """
     import click
 
-    # Get D3 format data to reuse link calculation logic
-    graph_data = convert_to_d3_format(modules_entities, entity_metadata)
-    nodes = graph_data["nodes"]
-    links = graph_data["links"]
-
-    # Build links_in and links_out counts
-    links_out: Dict[str, int] = {}
-    links_in: Dict[str, int] = {}
-
-    for link in links:
-        source = link["source"]
-        target = link["target"]
-        link_type = link.get("type", "")
-
-        # Skip module-entity links (structural, not dependency)
-        if link_type == "module-entity":
-            continue
-
-        links_out[source] = links_out.get(source, 0) + 1
-        links_in[target] = links_in.get(target, 0) + 1
-
     # Determine output path
     if output_path is None:
         output_path = os.path.join(os.getcwd(), "codegraph.csv")
 
     output_path = os.path.abspath(output_path)
 
+    # Build links_in and links_out counts, links are written to edges file on the way
+    links_out: Dict[str, int] = {}
+    links_in: Dict[str, int] = {}
+    external_nodes: List[Dict] = []
+
+    edges_file = None
+    edges_writer = None
+    if edges_path:
+        edges_path = os.path.abspath(edges_path)
+        edges_file = open(edges_path, 'w', newline='', encoding='utf-8')
+        edges_writer = csv.DictWriter(edges_file, fieldnames=CSV_EDGES_FIELDS)
+        edges_writer.writeheader()
+    try:
+        for kind, item in iter_d3_links(modules_entities):
+            if kind == "node":
+                external_nodes.append(item)
+                continue
+            if edges_writer:
+                edges_writer.writerow(item)
+
+            # Skip module-entity links (structural, not dependency)
+            if item["type"] == "module-entity":
+                continue
+
+            links_out[item["source"]] = links_out.get(item["source"], 0) + 1
+            links_in[item["target"]] = links_in.get(item["target"], 0) + 1
+    finally:
+        if edges_file:
+            edges_file.close()
+
     # Write CSV
     with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['name', 'type', 'parent_module', 'full_path', 'links_out', 'links_in', 'lines']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_NODES_FIELDS)
         writer.writeheader()
 
-        for node in nodes:
+        module_full_paths: Dict[str, str] = {}
+        for node in itertools.chain(iter_d3_nodes(modules_entities, entity_metadata), external_nodes):
             node_id = node["id"]
             node_type = node.get("type", "")
 
@@ -395,17 +756,14 @@ def export_to_csv(modules_entities: Dict, entity_metadata: Dict = None, output_p
                 display_type = "module"
                 parent_module = ""
                 full_path = node.get("fullPath", "")
+                module_full_paths[node_id] = full_path
                 lines = node.get("lines", 0)
                 name = node_id
             elif node_type == "entity":
                 display_type = node.get("entityType", "function")
                 parent_module = node.get("parent", "")
-                # Find full path from parent module
-                full_path = ""
-                for n in nodes:
-                    if n["id"] == parent_module and n["type"] == "module":
-                        full_path = n.get("fullPath", "")
-                        break
+                # Module node goes before nodes of its entities
+                full_path = module_full_paths.get(parent_module, "")
                 lines = node.get("lines", 0)
                 name = node.get("label", node_id)
             else:  # external
@@ -426,3 +784,5 @@ def export_to_csv(modules_entities: Dict, entity_metadata: Dict = None, output_p
             })
 
     click.echo(f"Graph data exported to CSV: {output_path}")
+    if edges_path:
+        click.echo(f"Graph links exported to CSV: {edges_path}")
@@ -0,0 +1,92 @@
+"""watch python files of code base to re-build graph on changes"""
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Text, Tuple, Union
+
+from codegraph.utils import get_python_paths_list
+
+logger = logging.getLogger(__name__)
+
+
+def get_files_state(paths_list: List[Text]) -> Dict[Text, Tuple[int, int]]:
+    """return mtime and size for each file"""
+    state = {}
+    for path in paths_list:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # file was removed after search of files
+            continue
+        state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+class Watcher:
+    """
+    Poll files state (mtime & size) in paths to find changed, added and deleted python modules.
+    Changes that come one after another with pause less than debounce seconds
+    are returned together, so one save of several files triggers only one graph update.
+    """
+
+    def __init__(
+        self,
+        paths: Union[Text, List],
+        interval: float = 1.0,
+        debounce: float = 0.5,
+        paths_list: List[Text] = None,
+        exclude: Iterable[Text] = (),
+        include: Iterable[Text] = (),
+    ):
+        self.paths = paths
+        self.interval = interval
+        self.debounce = debounce
+        # filters of files search, the same as for get_python_paths_list()
+        self.exclude = list(exclude)
+        self.include = list(include)
+        if paths_list is None:
+            paths_list = get_python_paths_list(paths, exclude=self.exclude, include=self.include)
+        self.files_state = get_files_state(paths_list)
+
+    def poll(self) -> Tuple[List[Text], List[Text]]:
+        """
+            check files once
+        :return: changed (or added) and deleted paths since previous check
+        """
+        try:
+            paths_list = get_python_paths_list(self.paths, exclude=self.exclude, include=self.include)
+        except ValueError:
+            # watched path was removed
+            paths_list = []
+        files_state = get_files_state(paths_list)
+        changed = [path for path, state in files_state.items() if self.files_state.get(path) != state]
+        deleted = [path for path in self.files_state if path not in files_state]
+        self.files_state = files_state
+        return changed, deleted
+
+    def wait_changes(self) -> Tuple[List[Text], List[Text]]:
+        """
+            block until files are changed and burst of changes is ended
+        :return: changed (or added) and deleted paths
+        """
+        # path: True if file exists, False if deleted
+        changes = {}
+        while True:
+            time.sleep(self.debounce if changes else self.interval)
+            changed, deleted = self.poll()
+            if not changed and not deleted:
+                if changes:
+                    break
+                continue
+            logger.debug(f"Changed files: {changed}, deleted files: {deleted}")
+            changes.update(dict.fromkeys(changed, True))
+            changes.update(dict.fromkeys(deleted, False))
+        return (
+            [path for path, exists in changes.items() if exists],
+            [path for path, exists in changes.items() if not exists],
+        )
+
+    def watch(self, callback: Callable[[List[Text], List[Text]], None]) -> None:
+        """call callback(changed, deleted) on each burst of changes, until KeyboardInterrupt"""
+        while True:
+            callback(*self.wait_changes())
@@ -0,0 +1,113 @@
+"""Tests for persistent parse cache."""
+import json
+import os
+import pathlib
+from argparse import Namespace
+
+from codegraph import core
+from codegraph.cache import ParseCache, read_content_with_stat
+from codegraph.core import CodeGraph, get_code_objects
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+def write_module(path: pathlib.Path, source: str) -> str:
+    path.write_text(source)
+    return path.as_posix()
+
+
+def test_cache_get_set(tmp_path):
+    module_path = write_module(tmp_path / "module.py", "def func():\n    pass\n")
+    cache = ParseCache(tmp_path / "cache")
+
+    assert cache.get(module_path) is None
+    cache.set(module_path, core.parse_code_file(module_path))
+
+    objects = cache.get(module_path)
+    assert [obj.name for obj in objects] == ["func"]
+
+
+def test_cache_invalidated_on_content_change(tmp_path):
+    module_path = write_module(tmp_path / "module.py", "def func():\n    pass\n")
+    cache = ParseCache(tmp_path / "cache")
+    cache.set(module_path, core.parse_code_file(module_path))
+
+    write_module(tmp_path / "module.py", "def other_func():\n    pass\n")
+    assert cache.get(module_path) is None
+
+
+def test_cache_valid_after_touch(tmp_path):
+    module_path = write_module(tmp_path / "module.py", "def func():\n    pass\n")
+    cache = ParseCache(tmp_path / "cache")
+    cache.set(module_path, core.parse_code_file(module_path))
+
+    stat = os.stat(module_path)
+    os.utime(module_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert [obj.name for obj in cache.get(module_path)] == ["func"]
+
+
+def test_cache_invalidated_on_version_change(tmp_path, monkeypatch):
+    module_path = write_module(tmp_path / "module.py", "def func():\n    pass\n")
+    cache = ParseCache(tmp_path / "cache")
+    cache.set(module_path, core.parse_code_file(module_path))
+
+    monkeypatch.setattr("codegraph.cache.__version__", "0.0.0")
+    assert cache.get(module_path) is None
+
+
+def test_cache_eviction(tmp_path):
+    cache = ParseCache(tmp_path / "cache", max_size=0)
+    module_path = write_module(tmp_path / "module.py", "def func():\n    pass\n")
+    cache.set(module_path, core.parse_code_file(module_path))
+    cache.evict()
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_code_objects_loaded_from_cache(tmp_path, monkeypatch):
+    paths_list = sorted(str(p) for p in TEST_DATA_DIR.glob("*.py"))
+    cache = ParseCache(tmp_path / "cache")
+    expected = get_code_objects(paths_list, cache=cache)
+
+    def fail_parse(path, source):
+        raise AssertionError(f"{path} must be loaded from cache")
+
+    monkeypatch.setattr(core, "parse_source", fail_parse)
+    result = get_code_objects(paths_list, cache=cache)
+    assert list(result) == list(expected)
+    for path in paths_list:
+        assert [getattr(obj, "name", None) for obj in result[path]] == [
+            getattr(obj, "name", None) for obj in expected[path]
+        ]
+
+
+def test_usage_graph_with_cache(tmp_path):
+    args = Namespace(paths=[TEST_DATA_DIR.as_posix()], cache_dir=(tmp_path / "cache").as_posix())
+    expected = CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()])).usage_graph()
+    CodeGraph(args).usage_graph()
+    assert repr(CodeGraph(args).usage_graph()) == repr(expected)
+
+
+def test_cache_entry_is_json(tmp_path):
+    module_path = write_module(tmp_path / "module.py", "class A(Base):\n    def method(self):\n        pass\n")
+    cache = ParseCache(tmp_path / "cache")
+    cache.set(module_path, core.parse_code_file(module_path))
+
+    with open(cache.entry_path(module_path)) as entry_file:
+        assert json.load(entry_file)["path"] == module_path
+    objects = cache.get(module_path)
+    assert [(obj.name, obj.super, obj.lineno, obj.endno) for obj in objects] == [("A", ["Base"], 1, 3)]
+
+
+def test_cache_entry_not_valid_for_content_changed_after_read(tmp_path):
+    module_path = write_module(tmp_path / "module.py", "def func():\n    pass\n")
+    cache = ParseCache(tmp_path / "cache")
+    content, stat = read_content_with_stat(module_path)
+    objects = core.parse_code_file(module_path)
+
+    # file is changed after it was read and before entry is written
+    write_module(tmp_path / "module.py", "def fun2():\n    pass\n")
+    stat_now = os.stat(module_path)
+    os.utime(module_path, ns=(stat_now.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache.set(module_path, objects, content, stat)
+
+    assert cache.get(module_path) is None
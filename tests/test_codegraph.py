@@ -1,6 +1,7 @@
 import pathlib
 from argparse import Namespace
 
+from codegraph import core
 from codegraph.core import CodeGraph
 
 
@@ -17,3 +18,62 @@ def test_main():
         }
     }
     assert sorted(usage_graph) == sorted(excepted)
+
+
+def test_each_module_read_once(monkeypatch):
+    test_data_path = pathlib.Path(__file__).parents[0] / "test_data"
+    read_paths = []
+    read_content_with_stat = core.read_content_with_stat
+
+    def counted_read(path):
+        read_paths.append(path)
+        return read_content_with_stat(path)
+
+    monkeypatch.setattr(core, "read_content_with_stat", counted_read)
+    code_graph = CodeGraph(Namespace(paths=[test_data_path.as_posix()]))
+    code_graph.usage_graph()
+    assert sorted(read_paths) == sorted(code_graph.paths_list)
+
+
+def test_usage_graph_is_built_once(monkeypatch):
+    test_data_path = pathlib.Path(__file__).parents[0] / "test_data"
+    code_graph = CodeGraph(Namespace(paths=[test_data_path.as_posix()]))
+    graph = code_graph.usage_graph()
+    expected = repr(graph)
+    built = []
+    get_module_dependencies = core.get_module_dependencies
+
+    def counted_dependencies(path, *args, **kwargs):
+        built.append(path)
+        return get_module_dependencies(path, *args, **kwargs)
+
+    monkeypatch.setattr(core, "get_module_dependencies", counted_dependencies)
+    assert code_graph.usage_graph() is graph
+    code_graph.get_dependencies(code_graph.paths_list[0], 2)
+    assert built == []
+    assert repr(code_graph.usage_graph(rebuild=True)) == expected
+    assert sorted(built) == sorted(code_graph.paths_list)
+
+
+def test_read_file_content_decodes_source(tmp_path):
+    module_path = tmp_path / "module.py"
+    module_path.write_bytes(b"# -*- coding: latin-1 -*-\r\nname = '\xe9'\r\n")
+    assert core.read_file_content(module_path.as_posix()) == "# -*- coding: latin-1 -*-\nname = '\xe9'\n"
+
+
+def test_lines_index_find():
+    index = core.LinesIndex({(1, 3): "func_a", (5, 20): "Cls", (6, 8): "method", (10, 12): "other_method"})
+    assert index.find(2) == "func_a"
+    assert index.find(4) is None
+    assert index.find(7) == "method"
+    assert index.find(9) == "Cls"
+    assert index.find(11) == "other_method"
+    assert index.find(20) == "Cls"
+    assert index.find(21) is None
+
+
+def test_lines_index_entity_without_end():
+    index = core.LinesIndex({(1, None): "func_a", (3, 4): "func_b"})
+    assert index.find(1) == "func_a"
+    assert index.find(2) is None
+    assert index.find(4) == "func_b"
@@ -0,0 +1,81 @@
+"""Tests for module level dependencies queries."""
+import pathlib
+import shutil
+from argparse import Namespace
+
+import pytest
+
+from codegraph.core import CodeGraph, DependenciesIndex
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+@pytest.fixture
+def code_dir(tmp_path):
+    code_dir = tmp_path / "code"
+    shutil.copytree(TEST_DATA_DIR, code_dir)
+    return code_dir
+
+
+def module(code_dir, name):
+    return (code_dir / f"{name}.py").as_posix()
+
+
+def test_get_dependencies(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    dependencies = code_graph.get_dependencies(module(code_dir, "module_a"), 2)
+    assert dependencies == {
+        1: {module(code_dir, "module_b"), module(code_dir, "module_c")},
+        2: set(),
+    }
+
+
+def test_get_dependencies_unknown_file(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    assert code_graph.get_dependencies(module(code_dir, "missing"), 2) == {1: set(), 2: set()}
+
+
+def test_get_dependencies_many(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    dependencies = code_graph.get_dependencies_many(
+        [module(code_dir, "alias_imports"), module(code_dir, "module_b")], 2
+    )
+    assert dependencies == {1: {module(code_dir, "module_a"), module(code_dir, "module_c")}, 2: set()}
+
+
+def test_get_dependents(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    dependents = code_graph.get_dependents(module(code_dir, "module_c"), 3)
+    assert dependents == {
+        1: {module(code_dir, name) for name in ("module_a", "module_b", "comma_imports")},
+        2: {module(code_dir, "alias_imports")},
+        3: set(),
+    }
+
+
+def test_index_is_built_once(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    index = code_graph.get_dependencies_index()
+    code_graph.get_dependents(module(code_dir, "module_c"), 1)
+    assert code_graph.get_dependencies_index() is index
+
+
+def test_index_is_updated(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    code_graph.get_dependencies_index()
+
+    module_d = code_dir / "module_d.py"
+    module_d.write_text("from tests.test_data import module_a\n\n\ndef func_d():\n    module_a.func_a()\n")
+    module_b = code_dir / "module_b.py"
+    module_b.unlink()
+    code_graph.update(changed=[module_d.as_posix()], deleted=[module_b.as_posix()])
+
+    expected = DependenciesIndex(code_graph.usage_graph(), code_graph.imports)
+    index = code_graph.get_dependencies_index()
+    assert {path: used for path, used in index.forward.items() if used} == {
+        path: used for path, used in expected.forward.items() if used
+    }
+    assert code_graph.get_dependents(module(code_dir, "module_a"), 1) == {
+        1: {module(code_dir, name) for name in ("alias_imports", "comma_imports", "module_d")}
+    }
+    assert module_b.as_posix() not in code_graph.get_dependents(module(code_dir, "module_c"), 1)[1]
@@ -0,0 +1,164 @@
+"""Tests for diff of graph snapshots."""
+import csv
+import json
+import pathlib
+import shutil
+from argparse import Namespace
+
+import pytest
+from click.testing import CliRunner
+
+from codegraph.core import CodeGraph
+from codegraph.diff import (
+    SnapshotError,
+    convert_to_diff_format,
+    diff_graphs,
+    export_diff_to_csv,
+    get_snapshot_root,
+    load_snapshot,
+    save_snapshot,
+)
+from codegraph.main import cli
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+OLD_GRAPH = {
+    "a.py": {"func_a": ["b.func_b"], "func_old": ["os"]},
+    "b.py": {"func_b": []},
+    "c.py": {"func_c": ["a.func_a"]},
+}
+NEW_GRAPH = {
+    "a.py": {"func_a": ["b.func_b", "b.func_new"], "func_new_a": []},
+    "b.py": {"func_b": [], "func_new": []},
+}
+
+
+def test_diff_graphs():
+    diff = diff_graphs(OLD_GRAPH, NEW_GRAPH)
+
+    assert diff == {
+        "modules": {"added": [], "removed": ["c.py"]},
+        "entities": {
+            "added": [("a.py", "func_new_a"), ("b.py", "func_new")],
+            "removed": [("a.py", "func_old"), ("c.py", "func_c")],
+        },
+        "edges": {
+            "added": [("a.py", "func_a", "b.func_new")],
+            "removed": [("a.py", "func_old", "os"), ("c.py", "func_c", "a.func_a")],
+        },
+    }
+    assert diff_graphs(OLD_GRAPH, OLD_GRAPH) == {
+        kind: {"added": [], "removed": []} for kind in ("modules", "entities", "edges")
+    }
+
+
+def test_convert_to_diff_format():
+    graph_data = convert_to_diff_format(OLD_GRAPH, NEW_GRAPH)
+
+    changes = {node["id"]: node.get("change") for node in graph_data["nodes"]}
+    assert changes["a.py"] is None
+    assert changes["c.py"] == "removed"
+    assert changes["c.py:func_c"] == "removed"
+    assert changes["a.py:func_old"] == "removed"
+    assert changes["os"] == "removed"
+    assert changes["b.py:func_new"] == "added"
+    assert changes["a.py:func_new_a"] == "added"
+    links = {(link["source"], link["target"]): link.get("change") for link in graph_data["links"]}
+    assert links[("a.py:func_a", "b.py:func_b")] is None
+    assert links[("a.py:func_a", "b.py:func_new")] == "added"
+    assert links[("c.py:func_c", "a.py:func_a")] == "removed"
+    assert links[("c.py", "a.py")] == "removed"
+    assert graph_data["diff"]["entities"] == {"added": 2, "removed": 2}
+
+
+def test_snapshot_round_trip(tmp_path):
+    code_graph = CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()]))
+    snapshot = tmp_path / "graph.json"
+
+    save_snapshot(snapshot.as_posix(), code_graph.usage_graph(), code_graph.get_entity_metadata())
+    graph, metadata = load_snapshot(snapshot.as_posix())
+
+    # paths are relative to folder of modules
+    assert "module_a.py" in graph
+    assert graph["module_a.py"] == code_graph.usage_graph()[(TEST_DATA_DIR / "module_a.py").as_posix()]
+    assert set(metadata) <= set(graph)
+
+
+def test_snapshot_paths_relative_to_root(tmp_path):
+    old = {"/r/src/pkg/a.py": {"func_a": ["b.func_b"]}, "/r/src/pkg/b.py": {"func_b": []}}
+    new = {**old, "/r/src/setup.py": {"_": []}}
+    for name, graph in (("old", old), ("new", new)):
+        save_snapshot((tmp_path / f"{name}.json").as_posix(), graph, root="/r/src")
+
+    old_graph, _ = load_snapshot((tmp_path / "old.json").as_posix())
+    new_graph, _ = load_snapshot((tmp_path / "new.json").as_posix())
+
+    # added top level module doesn't move paths of other modules
+    assert sorted(old_graph) == ["pkg/a.py", "pkg/b.py"]
+    assert diff_graphs(old_graph, new_graph)["modules"] == {"added": ["setup.py"], "removed": []}
+
+
+def test_snapshot_root(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "module.py").write_text("")
+    (tmp_path / "tools").mkdir()
+
+    assert get_snapshot_root([(tmp_path / "pkg").as_posix()]) == (tmp_path / "pkg").as_posix()
+    assert get_snapshot_root([(tmp_path / "pkg" / "module.py").as_posix()]) == (tmp_path / "pkg").as_posix()
+    assert get_snapshot_root([(tmp_path / "pkg").as_posix(), (tmp_path / "tools").as_posix()]) == tmp_path.as_posix()
+
+
+def test_load_not_snapshot(tmp_path):
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps({"nodes": []}))
+    with pytest.raises(SnapshotError):
+        load_snapshot(path.as_posix())
+
+    path.write_text(json.dumps({"format": "codegraph-snapshot", "version": 100}))
+    with pytest.raises(SnapshotError) as e:
+        load_snapshot(path.as_posix())
+    assert "version 100" in str(e.value)
+
+
+def test_export_diff_to_csv(tmp_path):
+    output_path = tmp_path / "diff.csv"
+    export_diff_to_csv(diff_graphs(OLD_GRAPH, NEW_GRAPH), output_path.as_posix())
+
+    with open(output_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0] == {"change": "removed", "kind": "modules", "module": "c.py", "entity": "", "dependency": ""}
+    added_edge = {"change": "added", "kind": "edges", "module": "a.py", "entity": "func_a", "dependency": "b.func_new"}
+    assert added_edge in rows
+    assert len(rows) == 8
+
+
+def test_cli_diff(tmp_path):
+    shutil.copytree(TEST_DATA_DIR, tmp_path / "old")
+    shutil.copytree(TEST_DATA_DIR, tmp_path / "new")
+    with open(tmp_path / "new" / "module_c.py", "a") as f:
+        f.write("\n\ndef func_new():\n    pass\n")
+    runner = CliRunner()
+    for name in ("old", "new"):
+        result = runner.invoke(
+            cli, [(tmp_path / name).as_posix(), "--no-cache", "--snapshot", (tmp_path / f"{name}.json").as_posix()]
+        )
+        assert result.exit_code == 0, result.output
+
+    result = runner.invoke(
+        cli,
+        [
+            "diff",
+            (tmp_path / "old.json").as_posix(),
+            (tmp_path / "new.json").as_posix(),
+            "--json",
+            (tmp_path / "diff.json").as_posix(),
+            "--fail-on-change",
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert "modules: +0 -0, entities: +1 -0, edges: +0 -0" in result.output
+    with open(tmp_path / "diff.json") as f:
+        assert json.load(f)["entities"]["added"] == [["module_c.py", "func_new"]]
+    # HTML is not written when diff is exported to JSON or CSV
+    assert not (tmp_path / "codegraph_diff.html").exists()
@@ -0,0 +1,169 @@
+"""Tests for graph of modules changed in git diff."""
+import pathlib
+import shutil
+import subprocess
+from argparse import Namespace
+
+import pytest
+from click.testing import CliRunner
+
+from codegraph import main
+from codegraph.core import CodeGraph
+from codegraph.git import GitError, get_changed_files, get_diff_files
+from codegraph.main import cli
+from codegraph.store import GraphStore
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    shutil.copytree(TEST_DATA_DIR, tmp_path / "code")
+    (tmp_path / "README.md").write_text("code\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    git(tmp_path, "tag", "base")
+    return tmp_path
+
+
+def commit_changes(repo):
+    code_dir = repo / "code"
+    with open(code_dir / "module_c.py", "a") as f:
+        f.write("\n\ndef func_new():\n    pass\n")
+    (code_dir / "alias_imports.py").unlink()
+    (repo / "README.md").write_text("changed\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "change")
+
+
+def test_get_changed_files(repo):
+    commit_changes(repo)
+
+    changed = get_changed_files("base..HEAD", (repo / "code").as_posix())
+
+    # deleted and not python files are skipped
+    assert changed == [(repo / "code" / "module_c.py").as_posix()]
+    assert get_diff_files("base..HEAD", (repo / "code").as_posix()) == (
+        [(repo / "code" / "module_c.py").as_posix()],
+        [(repo / "code" / "alias_imports.py").as_posix()],
+    )
+    # files out of path are not included
+    assert get_diff_files("base..HEAD", (repo / "code" / "module_a.py").as_posix()) == ([], [])
+
+
+def test_get_changed_files_unknown_revision(repo):
+    with pytest.raises(GitError) as e:
+        get_changed_files("missing..HEAD", repo.as_posix())
+    assert "missing" in str(e.value)
+    with pytest.raises(GitError):
+        get_changed_files("--output=file", repo.as_posix())
+
+
+def test_affected_graph(repo):
+    code_dir = repo / "code"
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+
+    graph = code_graph.get_affected_graph([(code_dir / "module_c.py").as_posix()])
+
+    # module_c and modules that use it
+    assert sorted(pathlib.Path(path).name for path in graph) == [
+        "comma_imports.py",
+        "module_a.py",
+        "module_b.py",
+        "module_c.py",
+    ]
+    assert code_graph.get_affected_graph([(repo / "README.md").as_posix()]) == {}
+
+
+def test_git_diff_option(repo, monkeypatch):
+    commit_changes(repo)
+    code_dir = repo / "code"
+    outputs = []
+    monkeypatch.setattr("codegraph.vizualyzer.draw_graph", lambda graph, **kwargs: outputs.append(graph))
+
+    args = Namespace(
+        paths=[code_dir.as_posix()],
+        object_only=False,
+        file_path=None,
+        distance=None,
+        git_diff="base..HEAD",
+        matplotlib=False,
+        output=None,
+        csv=None,
+    )
+    main.main(args)
+
+    assert sorted(pathlib.Path(path).name for path in outputs[0]) == [
+        "comma_imports.py",
+        "module_a.py",
+        "module_b.py",
+        "module_c.py",
+    ]
+
+
+def test_affected_graph_of_deleted_module(repo):
+    code_dir = repo / "code"
+    (code_dir / "module_b.py").unlink()
+    git(repo, "commit", "-q", "-am", "delete module_b")
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+
+    changed, deleted = get_diff_files("base..HEAD", code_dir.as_posix())
+    graph = code_graph.get_affected_graph(changed, deleted_paths=deleted)
+
+    # modules that imported deleted module
+    assert sorted(pathlib.Path(path).name for path in graph) == [
+        "alias_imports.py",
+        "comma_imports.py",
+        "module_a.py",
+    ]
+
+
+def test_git_diff_option_with_several_paths(repo, capsys):
+    commit_changes(repo)
+    (repo / "tools").mkdir()
+    (repo / "tools" / "tool.py").write_text("def tool():\n    pass\n")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "add tool")
+    args = Namespace(
+        paths=[(repo / "code").as_posix(), (repo / "tools").as_posix()],
+        object_only=True,
+        file_path=None,
+        distance=None,
+        git_diff="base..HEAD",
+        csv=None,
+    )
+
+    main.main(args)
+
+    output = capsys.readouterr().out
+    assert "Files changed in base..HEAD: 2, deleted: 1" in output
+    assert "tool.py" in output
+
+
+def test_git_diff_option_with_sqlite(repo):
+    code_dir = repo / "code"
+    path = (repo / "graph.sqlite").as_posix()
+    runner = CliRunner()
+    result = runner.invoke(cli, [code_dir.as_posix(), "--no-cache", "--sqlite", path])
+    assert "modules written: 6, removed: 0" in result.output
+    commit_changes(repo)
+
+    result = runner.invoke(cli, [code_dir.as_posix(), "--no-cache", "--git-diff", "base..HEAD", "--sqlite", path])
+
+    # modules out of affected graph are kept, deleted module is removed
+    assert result.exit_code == 0, result.output
+    assert "modules written: 1, removed: 1" in result.output
+    with GraphStore(path) as store:
+        assert store.query("SELECT count(*) FROM modules")[0][0] == 5
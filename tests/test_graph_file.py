@@ -0,0 +1,71 @@
+"""Tests for compact binary graph file."""
+import pathlib
+from argparse import Namespace
+
+import pytest
+
+import codegraph
+from codegraph.core import CodeGraph
+from codegraph.graph_file import GraphFileError, export_to_graph_file
+from codegraph.vizualyzer import convert_to_d3_format
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+@pytest.fixture
+def code_graph():
+    return CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()]))
+
+
+def test_graph_file_round_trip(code_graph, tmp_path):
+    usage_graph = code_graph.usage_graph()
+    entity_metadata = code_graph.get_entity_metadata()
+    output_path = tmp_path / "graph.cgraph"
+
+    export_to_graph_file(usage_graph, entity_metadata=entity_metadata, output_path=output_path.as_posix())
+
+    expected = convert_to_d3_format(usage_graph, entity_metadata)
+    with codegraph.load_graph(output_path.as_posix()) as graph:
+        assert graph.nodes_count == len(expected["nodes"])
+        assert graph.links_count == len(expected["links"])
+        assert list(graph.iter_nodes()) == expected["nodes"]
+        assert list(graph.iter_links()) == expected["links"]
+
+
+def test_graph_file_columns(tmp_path):
+    usage_graph = {
+        "/path/to/a.py": {"func_a": ["b.func_b", "os"]},
+        "/path/to/b.py": {"func_b": []},
+    }
+    output_path = tmp_path / "graph.cgraph"
+    export_to_graph_file(usage_graph, output_path=output_path.as_posix())
+
+    graph = codegraph.load_graph(output_path.as_posix())
+    columns = graph.columns
+    assert isinstance(columns["link_source"], memoryview)
+    assert [graph.string(index) for index in columns["node_id"]] == ["a.py", "a.py:func_a", "b.py", "b.py:func_b", "os"]
+    assert list(columns["node_type"]) == [0, 1, 0, 1, 2]
+    assert list(columns["node_parent"]) == [-1, 0, -1, 2, -1]
+    assert list(zip(columns["link_source"], columns["link_target"], columns["link_type"])) == [
+        (0, 1, 0),
+        (1, 3, 1),
+        (1, 4, 1),
+        (2, 3, 0),
+        (0, 2, 2),
+    ]
+    graph.close()
+
+
+def test_empty_graph_file(tmp_path):
+    output_path = tmp_path / "graph.cgraph"
+    export_to_graph_file({}, output_path=output_path.as_posix())
+    with codegraph.load_graph(output_path.as_posix()) as graph:
+        assert graph.nodes_count == 0
+        assert list(graph.iter_links()) == []
+
+
+def test_not_graph_file(tmp_path):
+    path = tmp_path / "graph.csv"
+    path.write_text("name,type\n")
+    with pytest.raises(GraphFileError):
+        codegraph.load_graph(path.as_posix())
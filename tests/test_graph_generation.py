@@ -1,12 +1,26 @@
 """Tests for graph generation functionality."""
+import base64
 import csv
+import gzip
+import json
+import os
+import re
 import pathlib
 import tempfile
 from argparse import Namespace
 
-from codegraph.core import CodeGraph
+from codegraph.core import CodeGraph, search_entities_from_modules_in_code
 from codegraph.parser import create_objects_array, Import
-from codegraph.vizualyzer import convert_to_d3_format, export_to_csv
+from codegraph.vizualyzer import (
+    convert_to_compact_format,
+    convert_to_d3_format,
+    convert_to_lazy_format,
+    convert_to_packages_format,
+    draw_graph,
+    export_to_csv,
+    get_d3_html_template,
+    iter_compressed_base64,
+)
 
 
 TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
@@ -157,6 +171,35 @@ class TestCodeGraphConnections:
         assert "func_c2" in usage_graph[module_path]
 
 
+class TestUsageSearch:
+    """Tests for search of entities usage in code lines."""
+
+    def search(self, line, module_name="module_b", current=False):
+        entities = create_objects_array("module_b.py", "def func():\n    pass\n\n\nclass Cls:\n    pass\n")
+        return dict(search_entities_from_modules_in_code([(module_name, entities, current)], [line])[0])
+
+    def test_call_detected(self):
+        assert self.search("    module_b.func()") == {"module_b.func": [1]}
+        assert self.search("    func()") == {"module_b.func": [1]}
+        assert self.search("    x = obj.func(1)") == {"module_b.func": [1]}
+
+    def test_attribute_access_detected(self):
+        assert self.search("    Cls.attr") == {"module_b.Cls": [1]}
+        assert self.search("    module_b.Cls.attr") == {"module_b.Cls": [1]}
+        assert self.search("    other.Cls.attr") == {}
+
+    def test_name_suffix_not_detected(self):
+        assert self.search("    other_func()") == {}
+        assert self.search("    func_name = 1") == {}
+
+    def test_comment_lines_skipped(self):
+        assert self.search("# func()") == {}
+        assert self.search('"func()"') == {}
+
+    def test_current_module_keys(self):
+        assert self.search("    func() + Cls()", current=True) == {"func": [1], "Cls": [1]}
+
+
 class TestD3FormatConversion:
     """Tests for D3.js format conversion."""
 
@@ -243,6 +286,36 @@ class TestD3FormatConversion:
         dep_links = [link for link in result["links"] if link["type"] == "dependency"]
         assert len(dep_links) >= 1
 
+    def test_same_entity_name_in_several_modules(self):
+        """Test that dependency is linked to entity of module from its name, not to the first found."""
+        usage_graph = {
+            "/path/to/a.py": {
+                "helper": [],
+                "func_a": ["helper", "c.helper"],
+            },
+            "/path/to/b.py": {
+                "helper": [],
+                "func_b": ["helper"],
+            },
+            "/path/to/c.py": {
+                "helper": [],
+            },
+        }
+        result = convert_to_d3_format(usage_graph)
+
+        dep_links = {
+            (link["source"], link["target"]) for link in result["links"] if link["type"] == "dependency"
+        }
+        assert dep_links == {
+            ("a.py:func_a", "a.py:helper"),
+            ("a.py:func_a", "c.py:helper"),
+            ("b.py:func_b", "b.py:helper"),
+        }
+        module_links = [
+            (link["source"], link["target"]) for link in result["links"] if link["type"] == "module-module"
+        ]
+        assert module_links == [("a.py", "c.py")]
+
     def test_nodes_have_required_fields(self):
         """Test that all nodes have required fields."""
         usage_graph = {
@@ -276,6 +349,223 @@ class TestD3FormatConversion:
             assert "type" in link
 
 
+def decode_compact_format(data):
+    """Python version of decodeGraphData() from main.js"""
+    strings = data["strings"]
+    columns = data["nodes"]
+    nodes = []
+    for i, node_type in enumerate(columns["type"]):
+        node_type = data["nodeTypes"][node_type]
+        label = strings[columns["label"][i]]
+        if node_type == "module":
+            nodes.append({
+                "id": label, "type": node_type, "collapsed": False,
+                "fullPath": strings[columns["path"][i]], "lines": columns["lines"][i],
+            })
+        elif node_type == "entity":
+            parent = nodes[columns["parent"][i]]["id"]
+            nodes.append({
+                "id": f"{parent}:{label}", "label": label, "type": node_type, "parent": parent,
+                "lines": columns["lines"][i], "entityType": strings[columns["entityType"][i]],
+            })
+        else:
+            nodes.append({"id": label, "type": node_type, "label": label})
+    links = [
+        {"source": nodes[source]["id"], "target": nodes[target]["id"], "type": data["linkTypes"][link_type]}
+        for source, target, link_type in zip(data["links"]["source"], data["links"]["target"], data["links"]["type"])
+    ]
+    return nodes, links
+
+
+class TestHTMLOutput:
+    """Tests for graph data embedded in HTML."""
+
+    def test_compact_format_has_the_same_nodes_and_links(self):
+        """Test that compact data is decoded to the same nodes and links as D3 data."""
+        code_graph = CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()]))
+        usage_graph = code_graph.usage_graph()
+        entity_metadata = code_graph.get_entity_metadata()
+
+        expected = convert_to_d3_format(usage_graph, entity_metadata)
+        compact = convert_to_compact_format(usage_graph, entity_metadata)
+
+        assert decode_compact_format(compact) == (expected["nodes"], expected["links"])
+        assert len(compact["strings"]) == len(set(compact["strings"]))
+
+    def test_compact_html(self):
+        """Test that compact HTML has graph data without indentation."""
+        usage_graph = {"/path/to/module.py": {"func_a": ["func_b"], "func_b": []}}
+        graph_data = convert_to_compact_format(usage_graph)
+
+        html = get_d3_html_template(graph_data, compact=True)
+
+        assert 'loadGraphData({"format":"compact",' in html
+        assert "function decodeGraphData" in html
+        assert "/* GRAPH_DATA_PLACEHOLDER */" not in html
+
+    def test_html_is_the_same_as_dumped_json(self):
+        """Test that default HTML has graph data dumped with indentation."""
+        usage_graph = {"/path/to/module.py": {"func_a": ["func_b"], "func_b": []}}
+        graph_data = convert_to_d3_format(usage_graph)
+
+        html = get_d3_html_template(graph_data)
+
+        assert f"loadGraphData({json.dumps(graph_data, indent=2)})" in html
+
+    def test_compressed_html(self):
+        """Test that graph data is embedded as base64 string with gzip-compressed JSON."""
+        usage_graph = {"/path/to/module.py": {"func_a": ["func_b"], "func_b": []}}
+        graph_data = convert_to_compact_format(usage_graph)
+
+        html = get_d3_html_template(graph_data, compress=True)
+
+        payload = re.search(r'loadGraphData\("([A-Za-z0-9+/=]+)"\)', html).group(1)
+        assert json.loads(gzip.decompress(base64.b64decode(payload))) == graph_data
+        assert "function loadGraphData" in html
+
+    def test_compressed_blocks_are_joined(self):
+        """Test that base64 blocks of compressed data can be joined to one string."""
+        chunks = [f"chunk {i} " * (i % 50) for i in range(5000)]
+        payload = "".join(iter_compressed_base64(chunks, block_size=3 * 100))
+        assert gzip.decompress(base64.b64decode(payload)).decode() == "".join(chunks)
+
+    def test_canvas_renderer_is_embedded(self):
+        """Test that HTML has canvas renderer used for large graphs."""
+        html = get_d3_html_template({"nodes": [], "links": []})
+
+        assert "class CanvasRenderer" in html
+        assert html.index("class CanvasRenderer") < html.index("useCanvasRenderer(graphData)")
+
+    def test_script_tag_in_names_is_escaped(self):
+        """Test that graph data can't close script tag."""
+        graph_data = {"nodes": [{"id": "</script><b>"}], "links": []}
+
+        html = get_d3_html_template(graph_data, compact=True)
+
+        assert "</script><b>" not in html
+        assert '"<\\/script><b>"' in html
+
+
+class TestLazyOutput:
+    """Tests for graph data written to separate files next to HTML."""
+
+    def test_shards_have_all_nodes_and_links(self):
+        """Test that module level graph and shards together have the same nodes and links as D3 data."""
+        code_graph = CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()]))
+        usage_graph = code_graph.usage_graph()
+        entity_metadata = code_graph.get_entity_metadata()
+
+        expected = convert_to_d3_format(usage_graph, entity_metadata)
+        graph_data, shards = convert_to_lazy_format(usage_graph, entity_metadata)
+
+        nodes = [{k: v for k, v in node.items() if k != "shard"} for node in graph_data["nodes"]]
+        links = list(graph_data["links"])
+        for shard in shards:
+            nodes.extend(node for node in shard["nodes"] if node not in nodes)
+            links.extend(shard["links"])
+
+        key = json.dumps
+        assert sorted(map(key, nodes)) == sorted(map(key, expected["nodes"]))
+        assert sorted(map(key, links)) == sorted(map(key, expected["links"]))
+        assert {node["type"] for node in graph_data["nodes"]} == {"module"}
+        assert {link["type"] for link in graph_data["links"]} == {"module-module"}
+        assert graph_data["entitiesCount"] == len([n for n in expected["nodes"] if n["type"] == "entity"])
+        assert graph_data["unlinkedModules"] == expected["unlinkedModules"]
+
+    def test_shard_per_package(self):
+        """Test that entities of modules from one folder are in one shard."""
+        usage_graph = {
+            "/project/pkg_a/module_a.py": {"func_a": ["module_b.func_b", "os"]},
+            "/project/pkg_a/module_b.py": {"func_b": []},
+            "/project/pkg_b/module_c.py": {"func_c": ["module_a.func_a"]},
+        }
+
+        graph_data, shards = convert_to_lazy_format(usage_graph)
+
+        assert {node["id"]: node["shard"] for node in graph_data["nodes"]} == {
+            "module_a.py": 0,
+            "module_b.py": 0,
+            "module_c.py": 1,
+        }
+        assert graph_data["shards"] == ["shards/0.json", "shards/1.json"]
+        assert [node["id"] for node in shards[0]["nodes"]] == ["module_a.py:func_a", "module_b.py:func_b", "os"]
+        assert [node["id"] for node in shards[1]["nodes"]] == ["module_c.py:func_c"]
+        assert {"source": "module_c.py:func_c", "target": "module_a.py:func_a", "type": "dependency"} in (
+            shards[1]["links"]
+        )
+
+    def test_draw_graph_lazy(self, tmp_path):
+        """Test that lazy HTML refers to graph.json and shards are written next to it."""
+        usage_graph = {"/path/to/module.py": {"func_a": ["func_b"], "func_b": []}}
+        output_path = tmp_path / "graph.html"
+
+        draw_graph(usage_graph, output_path=str(output_path), open_browser=False, lazy=True)
+
+        html = output_path.read_text(encoding="utf-8")
+        assert 'loadGraphData({"format":"lazy","url":"graph_data/graph.json"}' in html
+        graph_data = json.loads((tmp_path / "graph_data" / "graph.json").read_text(encoding="utf-8"))
+        assert graph_data["format"] == "lazy"
+        assert [node["id"] for node in graph_data["nodes"]] == ["module.py"]
+        shard = json.loads((tmp_path / "graph_data" / graph_data["shards"][0]).read_text(encoding="utf-8"))
+        assert [node["id"] for node in shard["nodes"]] == ["module.py:func_a", "module.py:func_b"]
+
+
+class TestPackagesOutput:
+    """Tests for graph data with modules rolled up to packages."""
+
+    usage_graph = {
+        "/project/pkg_a/module_a.py": {"func_a": ["module_b.func_b", "module_c.func_c", "os"]},
+        "/project/pkg_a/module_b.py": {"func_b": ["module_c.func_c"], "func_d": ["module_c.func_c"]},
+        "/project/pkg_a/sub/module_e.py": {"func_e": []},
+        "/project/pkg_b/module_c.py": {"func_c": ["module_e._"]},
+    }
+
+    def test_packages_tree(self):
+        """Test that package nodes are created for folders with modules and counted up to top package."""
+        graph_data = convert_to_packages_format(self.usage_graph)
+
+        packages = {package["id"]: package for package in graph_data["packages"]}
+        assert {package_id: package["parent"] for package_id, package in packages.items()} == {
+            "project/": None,
+            "project/pkg_a/": "project/",
+            "project/pkg_a/sub/": "project/pkg_a/",
+            "project/pkg_b/": "project/",
+        }
+        assert packages["project/pkg_a/"]["modules"] == 3
+        assert packages["project/pkg_a/"]["label"] == "pkg_a/"
+        assert {node["id"]: node["package"] for node in graph_data["nodes"] if node["type"] == "module"} == {
+            "module_a.py": "project/pkg_a/",
+            "module_b.py": "project/pkg_a/",
+            "module_e.py": "project/pkg_a/sub/",
+            "module_c.py": "project/pkg_b/",
+        }
+        # "project/" has only one item - viewer starts with its packages
+        assert graph_data["rootPackage"] == "project/"
+        assert graph_data["format"] == "packages"
+
+    def test_weighted_links(self):
+        """Test that links between modules have weight of entity dependencies and imports between them."""
+        graph_data = convert_to_packages_format(self.usage_graph)
+
+        weights = {(link["source"], link["target"]): link["weight"] for link in graph_data["weightedLinks"]}
+        assert weights == {
+            ("module_a.py", "module_b.py"): 1,
+            ("module_a.py", "module_c.py"): 1,
+            ("module_b.py", "module_c.py"): 2,
+            ("module_c.py", "module_e.py"): 1,
+        }
+
+    def test_draw_graph_packages(self, tmp_path):
+        """Test that HTML has graph data with packages."""
+        output_path = tmp_path / "graph.html"
+
+        draw_graph(self.usage_graph, output_path=str(output_path), open_browser=False, packages=True)
+
+        html = output_path.read_text(encoding="utf-8")
+        assert '"format": "packages"' in html
+        assert '"rootPackage": "project/"' in html
+
+
 class TestCodeGraphOnItself:
     """Tests for running CodeGraph on the codegraph package itself."""
 
@@ -511,3 +801,41 @@ class TestCSVExport:
         assert int(codegraph_row['lines']) > 0
 
         pathlib.Path(output_path).unlink()
+
+    def test_export_edges_csv(self, tmp_path):
+        """Test that links are exported to separate CSV file."""
+        usage_graph = {
+            "/path/to/a.py": {
+                "func_a": ["b.func_b", "os"],
+            },
+            "/path/to/b.py": {
+                "func_b": [],
+            },
+        }
+        nodes_path = tmp_path / "nodes.csv"
+        edges_path = tmp_path / "edges.csv"
+
+        export_to_csv(usage_graph, output_path=nodes_path.as_posix(), edges_path=edges_path.as_posix())
+
+        with open(edges_path, 'r') as csvfile:
+            reader = csv.DictReader(csvfile)
+            assert reader.fieldnames == ['source', 'target', 'type']
+            edges = [(r['source'], r['target'], r['type']) for r in reader]
+        assert edges == [
+            ("a.py", "a.py:func_a", "module-entity"),
+            ("a.py:func_a", "b.py:func_b", "dependency"),
+            ("a.py:func_a", "os", "dependency"),
+            ("b.py", "b.py:func_b", "module-entity"),
+            ("a.py", "b.py", "module-module"),
+        ]
+
+        with open(nodes_path, 'r') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        assert [(r['name'], r['type'], r['links_out'], r['links_in']) for r in rows] == [
+            ("a.py", "module", "1", "0"),
+            ("func_a", "function", "2", "0"),
+            ("b.py", "module", "0", "1"),
+            ("func_b", "function", "0", "1"),
+            ("os", "external", "0", "1"),
+        ]
+        assert rows[1]['full_path'] == os.path.join("to", "a.py")
@@ -0,0 +1,84 @@
+"""Tests for saving and loading of CodeGraph."""
+import pathlib
+import shutil
+from argparse import Namespace
+
+import pytest
+
+from codegraph.core import CodeGraph
+from codegraph.diff import load_snapshot
+from codegraph.graph_state import GraphStateError
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+@pytest.fixture
+def code_graph():
+    return CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()]))
+
+
+@pytest.fixture
+def saved_path(code_graph, tmp_path):
+    path = tmp_path / "graph.cgstate"
+    code_graph.save(path.as_posix())
+    return path.as_posix()
+
+
+def test_load_saved_graph(code_graph, saved_path):
+    loaded = CodeGraph.load(saved_path)
+
+    assert loaded.paths_list == code_graph.paths_list
+    assert loaded.usage_graph() == code_graph.usage_graph()
+    assert list(loaded.usage_graph()) == list(code_graph.usage_graph())
+    assert loaded.get_entity_metadata() == code_graph.get_entity_metadata()
+    assert loaded.get_lines_numbers() == code_graph.get_lines_numbers()
+    module_a = (TEST_DATA_DIR / "module_a.py").as_posix()
+    assert loaded.get_dependencies(module_a, 2) == code_graph.get_dependencies(module_a, 2)
+    assert loaded.get_dependents(module_a, 2) == code_graph.get_dependents(module_a, 2)
+
+
+def test_update_loaded_graph(tmp_path):
+    code_dir = tmp_path / "code"
+    shutil.copytree(TEST_DATA_DIR, code_dir)
+    (code_dir / "models.py").write_text(
+        "from module_c import func_c1\n\n\nclass Base:\n    pass\n\n\nclass Model(Base):\n    x = func_c1()\n"
+    )
+    args = Namespace(paths=[code_dir.as_posix()])
+    code_graph = CodeGraph(args)
+    saved_path = (tmp_path / "graph.cgstate").as_posix()
+    code_graph.save(saved_path)
+    loaded = CodeGraph.load(saved_path)
+
+    models_path = (code_dir / "models.py").as_posix()
+    assert [entity.super for entity in loaded.modules_data[models_path]] == [[], ["Base"]]
+    assert loaded.raw_imports == code_graph.raw_imports
+
+    with open(code_dir / "module_c.py", "a") as f:
+        f.write("\n\ndef func_new():\n    pass\n")
+    (code_dir / "alias_imports.py").unlink()
+    graph = loaded.update(
+        changed=[(code_dir / "module_c.py").as_posix()], deleted=[(code_dir / "alias_imports.py").as_posix()]
+    )
+
+    # sources of affected modules are read from disk
+    assert graph == CodeGraph(args).usage_graph()
+    assert loaded.usage_graph(rebuild=True) == graph
+
+
+def test_load_not_saved_graph(tmp_path):
+    path = tmp_path / "graph.cgstate"
+    path.write_bytes(b"CODEGRPH" + b"\0" * 8)
+    with pytest.raises(GraphStateError):
+        CodeGraph.load(path.as_posix())
+
+    path.write_bytes(b"CODEGSAV" + (100).to_bytes(4, "little") + b"\0" * 4)
+    with pytest.raises(GraphStateError) as e:
+        CodeGraph.load(path.as_posix())
+    assert "version 100" in str(e.value)
+
+
+def test_saved_graph_as_diff_snapshot(saved_path):
+    graph, metadata = load_snapshot(saved_path)
+
+    assert "module_a.py" in graph
+    assert "module_a.py" in metadata
@@ -0,0 +1,126 @@
+"""Tests for incremental update of usage graph."""
+import pathlib
+import shutil
+import tokenize
+from argparse import Namespace
+
+import pytest
+
+from codegraph import core
+from codegraph.core import CodeGraph, get_affected_modules
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+@pytest.fixture
+def code_dir(tmp_path):
+    code_dir = tmp_path / "code"
+    shutil.copytree(TEST_DATA_DIR, code_dir)
+    return code_dir
+
+
+def full_graph(code_dir):
+    return CodeGraph(Namespace(paths=[code_dir.as_posix()])).usage_graph()
+
+
+def test_update_changed_module(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    code_graph.usage_graph()
+
+    module_c = code_dir / "module_c.py"
+    module_c.write_text(module_c.read_text().replace("func_c2", "func_c3"))
+    graph = code_graph.update(changed=[module_c.as_posix()])
+
+    assert graph == full_graph(code_dir)
+    assert "func_c3" in graph[module_c.as_posix()]
+
+
+def test_update_added_module(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    code_graph.usage_graph()
+
+    module_d = code_dir / "module_d.py"
+    module_d.write_text("from tests.test_data import module_c\n\n\ndef func_d():\n    module_c.func_c1()\n")
+    graph = code_graph.update(changed=[module_d.as_posix()])
+
+    assert graph == full_graph(code_dir)
+    assert graph[module_d.as_posix()]["func_d"] == ["module_c.func_c1"]
+    # added module is in the same place as in graph built from scratch
+    assert list(graph) == list(full_graph(code_dir))
+    assert code_graph.paths_list == sorted(code_graph.paths_list)
+
+
+def test_update_deleted_module(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    code_graph.usage_graph()
+
+    module_b = code_dir / "module_b.py"
+    module_b.unlink()
+    graph = code_graph.update(deleted=[module_b.as_posix()])
+
+    assert module_b.as_posix() not in graph
+    assert graph == full_graph(code_dir)
+
+
+def test_failed_update_keeps_graph(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    paths_list = list(code_graph.paths_list)
+    graph = {path: dict(entities) for path, entities in code_graph.usage_graph().items()}
+
+    module_b = code_dir / "module_b.py"
+    module_b.unlink()
+    module_d = code_dir / "module_d.py"
+    module_d.write_text('def broken():\n    """unterminated')
+    with pytest.raises(tokenize.TokenError):
+        code_graph.update(changed=[module_d.as_posix()], deleted=[module_b.as_posix()])
+
+    # nothing is changed by failed update, next update applies all changes
+    assert code_graph.paths_list == paths_list
+    assert code_graph.usage_graph() == graph
+    module_d.write_text("def fixed():\n    pass\n")
+    assert code_graph.update(changed=[module_d.as_posix()], deleted=[module_b.as_posix()]) == full_graph(code_dir)
+
+
+def test_update_without_previous_graph(code_dir):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    module_a = code_dir / "module_a.py"
+    assert code_graph.update(changed=[module_a.as_posix()]) == full_graph(code_dir)
+
+
+def test_get_affected_modules():
+    modules_imports = {
+        "/code/a.py": {"pkg.b.func"},
+        "/code/c.py": {"os.path"},
+        "/code/d.py": {"pkg"},
+        "/code/e.py": {"pkg.new.func"},
+    }
+    imports = {
+        "/code/a.py": ["/code/pkg/b.py"],
+        "/code/c.py": [],
+        "/code/d.py": ["/code/pkg/__init__.py"],
+        "/code/e.py": [],
+    }
+    assert get_affected_modules(["/code/pkg/b.py"], modules_imports, imports) == {"/code/a.py"}
+    assert get_affected_modules(["/code/pkg/__init__.py"], modules_imports, imports) == {"/code/d.py"}
+    assert get_affected_modules([], modules_imports, imports, added_or_deleted=["/code/pkg/new.py"]) == {
+        "/code/e.py"
+    }
+
+
+def test_update_uses_kept_sources(code_dir, monkeypatch):
+    code_graph = CodeGraph(Namespace(paths=[code_dir.as_posix()]))
+    code_graph.usage_graph()
+    module_c = code_dir / "module_c.py"
+    module_c.write_text(module_c.read_text() + "\n\ndef func_c3():\n    pass\n")
+
+    read_paths = []
+    read_content_with_stat = core.read_content_with_stat
+
+    def counted_read(path):
+        read_paths.append(path)
+        return read_content_with_stat(path)
+
+    monkeypatch.setattr(core, "read_content_with_stat", counted_read)
+    code_graph.update(changed=[module_c.as_posix()])
+    # modules that import module_c are re-scanned from sources in memory
+    assert read_paths == [module_c.as_posix()]
@@ -0,0 +1,75 @@
+"""Tests for graph layout computed in Python."""
+import math
+import pathlib
+from argparse import Namespace
+
+import pytest
+
+from codegraph.core import CodeGraph
+from codegraph.layout import compute_layout, get_ring_offsets, pack_rows
+from codegraph.vizualyzer import convert_to_compact_format, convert_to_d3_format
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+@pytest.fixture
+def usage_graph():
+    return {
+        "/project/pkg_a/module_a.py": {f"func_{i}": ["module_b.func_b", "os"] for i in range(30)},
+        "/project/pkg_a/module_b.py": {"func_b": []},
+        "/project/pkg_b/module_c.py": {"func_c": ["module_a.func_0"]},
+    }
+
+
+def test_all_nodes_have_positions():
+    code_graph = CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()]))
+    usage_graph = code_graph.usage_graph()
+    entity_metadata = code_graph.get_entity_metadata()
+
+    layout = compute_layout(usage_graph, entity_metadata)
+
+    graph_data = convert_to_d3_format(usage_graph, entity_metadata)
+    assert set(layout) == {node["id"] for node in graph_data["nodes"]}
+    assert len(set(layout.values())) == len(layout)
+
+
+def test_layout_is_the_same_on_each_run(usage_graph):
+    assert compute_layout(usage_graph) == compute_layout(dict(reversed(list(usage_graph.items()))))
+
+
+def test_entities_are_around_module(usage_graph):
+    layout = compute_layout(usage_graph)
+
+    module_x, module_y = layout["module_a.py"]
+    for i in range(30):
+        x, y = layout[f"module_a.py:func_{i}"]
+        assert 80 <= math.hypot(x - module_x, y - module_y) <= 200
+    # modules with their entities don't overlap
+    assert math.dist(layout["module_a.py"], layout["module_b.py"]) > 200
+
+
+def test_ring_offsets():
+    offsets, radius = get_ring_offsets(20)
+    assert len(offsets) == 20
+    assert radius > 90
+    assert get_ring_offsets(0) == ([], 0.0)
+
+
+def test_pack_rows():
+    centers, width, height = pack_rows([(10, 10)] * 4)
+    assert centers == [(5, 5), (15, 5), (5, 15), (15, 15)]
+    assert (width, height) == (20, 20)
+
+
+def test_graph_data_with_layout(usage_graph):
+    layout = compute_layout(usage_graph)
+
+    graph_data = convert_to_d3_format(usage_graph, layout=layout)
+    assert graph_data["layout"] == "precomputed"
+    assert all((node["x"], node["y"]) == layout[node["id"]] for node in graph_data["nodes"])
+
+    compact = convert_to_compact_format(usage_graph, layout=layout)
+    assert compact["layout"] == "precomputed"
+    assert list(zip(compact["nodes"]["x"], compact["nodes"]["y"])) == [
+        layout[node["id"]] for node in graph_data["nodes"]
+    ]
@@ -0,0 +1,75 @@
+"""Tests for resolution of imports to modules of code base."""
+from argparse import Namespace
+
+from codegraph.core import CodeGraph, ModulesIndex
+
+PATHS = [
+    "/code/app.py",
+    "/code/pkg_a/__init__.py",
+    "/code/pkg_a/utils.py",
+    "/code/pkg_a/client.py",
+    "/code/pkg_b/__init__.py",
+    "/code/pkg_b/utils.py",
+    "/code/pkg_b/sub/__init__.py",
+    "/code/pkg_b/sub/worker.py",
+]
+
+
+def test_resolve_by_module_name():
+    index = ModulesIndex(PATHS)
+    assert index.resolve("/code/app.py", "pkg_b.sub.worker.run") == "/code/pkg_b/sub/worker.py"
+    assert index.resolve("/code/app.py", "worker") == "/code/pkg_b/sub/worker.py"
+    assert index.resolve("/code/app.py", "os.path") is None
+
+
+def test_resolve_package():
+    index = ModulesIndex(PATHS)
+    assert index.resolve("/code/app.py", "pkg_b.sub.Worker") == "/code/pkg_b/sub/__init__.py"
+    assert index.resolve("/code/app.py", "pkg_a.Client as C") == "/code/pkg_a/__init__.py"
+
+
+def test_resolve_same_named_modules_by_dotted_name():
+    index = ModulesIndex(PATHS)
+    assert index.resolve("/code/app.py", "pkg_a.utils") == "/code/pkg_a/utils.py"
+    assert index.resolve("/code/app.py", "pkg_b.utils.helper") == "/code/pkg_b/utils.py"
+
+
+def test_resolve_same_named_modules_by_folder():
+    index = ModulesIndex(PATHS)
+    assert index.resolve("/code/pkg_a/client.py", "utils") == "/code/pkg_a/utils.py"
+    assert index.resolve("/code/pkg_b/sub/worker.py", "utils") == "/code/pkg_b/utils.py"
+
+
+def test_resolve_relative_imports():
+    index = ModulesIndex(PATHS)
+    # from . import utils
+    assert index.resolve("/code/pkg_b/sub/worker.py", "..utils") == "/code/pkg_b/sub/__init__.py"
+    assert index.resolve("/code/pkg_a/client.py", "..utils") == "/code/pkg_a/utils.py"
+    # from ..utils import helper
+    assert index.resolve("/code/pkg_b/sub/worker.py", "..utils.helper") == "/code/pkg_b/utils.py"
+    # from .worker import run
+    assert index.resolve("/code/pkg_b/sub/__init__.py", ".worker.run") == "/code/pkg_b/sub/worker.py"
+
+
+def test_add_remove():
+    index = ModulesIndex(PATHS)
+    index.remove("/code/pkg_a/utils.py")
+    assert index.resolve("/code/app.py", "pkg_a.utils") == "/code/pkg_a/__init__.py"
+    index.add("/code/pkg_a/utils.py")
+    assert index.resolve("/code/app.py", "pkg_a.utils") == "/code/pkg_a/utils.py"
+
+
+def test_usage_graph_same_named_modules(tmp_path):
+    for package, func in (("pkg_a", "helper_a"), ("pkg_b", "helper_b")):
+        (tmp_path / package).mkdir()
+        (tmp_path / package / "__init__.py").write_text("")
+        (tmp_path / package / "utils.py").write_text(f"def {func}():\n    pass\n")
+    (tmp_path / "app.py").write_text(
+        "from pkg_a import utils\n\n\ndef run():\n    utils.helper_a()\n"
+    )
+    (tmp_path / "pkg_b" / "client.py").write_text(
+        "from . import utils\n\n\ndef call():\n    utils.helper_b()\n"
+    )
+    graph = CodeGraph(Namespace(paths=[tmp_path.as_posix()])).usage_graph()
+    assert graph[(tmp_path / "app.py").as_posix()]["run"] == ["utils.helper_a"]
+    assert graph[(tmp_path / "pkg_b" / "client.py").as_posix()]["call"] == ["utils.helper_b"]
@@ -0,0 +1,40 @@
+"""Tests for parsing modules in parallel processes."""
+import pathlib
+import pickle
+from argparse import Namespace
+
+from codegraph.core import CodeGraph, get_chunk_size, get_code_objects, get_jobs_count
+from codegraph.utils import get_python_paths_list
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+def test_get_jobs_count():
+    assert get_jobs_count(3) == 3
+    assert get_jobs_count(0) >= 1
+    assert get_jobs_count(None) >= 1
+
+
+def test_get_chunk_size():
+    assert get_chunk_size(1, 4) == 1
+    assert get_chunk_size(100, 4) == 6
+
+
+def test_parsed_objects_are_picklable():
+    paths_list = get_python_paths_list(TEST_DATA_DIR.as_posix())
+    code_objects = get_code_objects(paths_list)
+    restored = pickle.loads(pickle.dumps(code_objects))
+    assert list(restored) == list(code_objects)
+
+
+def test_parallel_parsing_keeps_order():
+    paths_list = sorted(get_python_paths_list(TEST_DATA_DIR.as_posix()))
+    code_objects = get_code_objects(paths_list, jobs=2)
+    assert list(code_objects) == paths_list
+
+
+def test_parallel_usage_graph_same_as_serial():
+    codegraph_path = (pathlib.Path(__file__).parents[1] / "codegraph").as_posix()
+    serial = CodeGraph(Namespace(paths=[codegraph_path])).usage_graph()
+    parallel = CodeGraph(Namespace(paths=[codegraph_path]), jobs=2).usage_graph()
+    assert repr(serial) == repr(parallel)
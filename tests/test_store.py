@@ -0,0 +1,129 @@
+"""Tests for SQLite graph store."""
+import pathlib
+import shutil
+import sqlite3
+from argparse import Namespace
+
+import pytest
+from click.testing import CliRunner
+
+from codegraph.core import CodeGraph
+from codegraph.main import cli
+from codegraph.store import GraphStore, StoreError
+
+TEST_DATA_DIR = pathlib.Path(__file__).parent / "test_data"
+
+
+def module_path(name):
+    return (TEST_DATA_DIR / name).as_posix()
+
+
+@pytest.fixture
+def code_graph():
+    return CodeGraph(Namespace(paths=[TEST_DATA_DIR.as_posix()]))
+
+
+@pytest.fixture
+def store(code_graph, tmp_path):
+    with GraphStore((tmp_path / "graph.sqlite").as_posix()) as store:
+        store.write(code_graph.usage_graph(), code_graph.get_entity_metadata(), code_graph.imports)
+        yield store
+
+
+def test_find_entities(store):
+    found = store.find_entities("function", min_lines=3, min_links_in=2)
+
+    assert [(pathlib.Path(entity["path"]).name, entity["name"], entity["links_in"]) for entity in found] == [
+        ("module_b.py", "func_b", 3),
+        ("module_a.py", "func_a", 2),
+        ("module_c.py", "func_c1", 2),
+    ]
+    assert found[1] == {
+        "path": module_path("module_a.py"),
+        "root": TEST_DATA_DIR.as_posix(),
+        "name": "func_a",
+        "type": "function",
+        "lineno": 5,
+        "endno": 8,
+        "lines": 4,
+        "links_in": 2,
+        "links_out": 2,
+    }
+    assert [entity["name"] for entity in store.find_entities(min_lines=50)] == ["draw_graph"]
+    assert [entity["name"] for entity in store.find_entities(module="*/module_c.py", limit=1)] == ["func_c1"]
+
+
+def test_links(store):
+    assert store.get_links_in(module_path("module_b.py"), "func_b") == [
+        (module_path("alias_imports.py"), "use_aliases"),
+        (module_path("comma_imports.py"), "use_all"),
+        (module_path("module_a.py"), "func_a"),
+    ]
+    assert store.get_links_out(module_path("module_a.py"), "func_a") == ["module_b.func_b", "module_c.func_c1"]
+    rows = store.query("SELECT path FROM imports WHERE module_id = (SELECT id FROM modules WHERE name = 'module_a')")
+    assert sorted(row["path"] for row in rows) == [module_path("module_b.py"), module_path("module_c.py")]
+
+
+def test_write_only_changed_modules(store, code_graph):
+    graph = dict(code_graph.usage_graph())
+    metadata = code_graph.get_entity_metadata()
+    assert store.write(graph, metadata, code_graph.imports) == (0, 0)
+
+    del graph[module_path("comma_imports.py")]
+    graph[module_path("module_c.py")] = {**graph[module_path("module_c.py")], "func_c3": ["func_c1"]}
+    assert store.write(graph, metadata, code_graph.imports) == (1, 1)
+
+    # rows of removed module are deleted with it
+    assert store.query("SELECT count(*) FROM modules")[0][0] == 5
+    assert store.query("SELECT count(*) FROM edges WHERE entity = 'use_all'")[0][0] == 0
+    assert store.get_links_in(module_path("module_c.py"), "func_c1") == [
+        (module_path("module_a.py"), "func_a"),
+        (module_path("module_c.py"), "func_c3"),
+    ]
+
+
+def test_several_roots(store, tmp_path):
+    other_dir = tmp_path / "other"
+    shutil.copytree(TEST_DATA_DIR, other_dir)
+    other_graph = CodeGraph(Namespace(paths=[other_dir.as_posix()]))
+    graph = dict(other_graph.usage_graph())
+    metadata = other_graph.get_entity_metadata()
+    assert store.write(graph, metadata, other_graph.imports, roots=[other_dir.as_posix()]) == (6, 0)
+
+    del graph[(other_dir / "comma_imports.py").as_posix()]
+    assert store.write(graph, metadata, other_graph.imports, roots=[other_dir.as_posix()]) == (0, 1)
+
+    # modules of other root are not removed
+    assert store.query("SELECT count(*) FROM modules")[0][0] == 11
+    assert store.query("SELECT count(*) FROM modules WHERE root = ?", (TEST_DATA_DIR.as_posix(),))[0][0] == 6
+    assert [entity["path"] for entity in store.find_entities(root=other_dir.as_posix(), min_lines=50)] == [
+        (other_dir / "vizualyzer.py").as_posix()
+    ]
+    assert store.get_links_in((other_dir / "module_b.py").as_posix(), "func_b") == [
+        ((other_dir / "alias_imports.py").as_posix(), "use_aliases"),
+        ((other_dir / "module_a.py").as_posix(), "func_a"),
+    ]
+
+
+def test_not_store_database(tmp_path):
+    path = (tmp_path / "other.sqlite").as_posix()
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE items (id INTEGER)")
+    with pytest.raises(StoreError):
+        GraphStore(path)
+
+    path = (tmp_path / "new.sqlite").as_posix()
+    with sqlite3.connect(path) as connection:
+        connection.execute("PRAGMA user_version = 100")
+    with pytest.raises(StoreError) as e:
+        GraphStore(path)
+    assert "version 100" in str(e.value)
+
+
+def test_cli_sqlite(tmp_path):
+    path = tmp_path / "graph.sqlite"
+    runner = CliRunner()
+    for written in (6, 0):
+        result = runner.invoke(cli, [TEST_DATA_DIR.as_posix(), "--no-cache", "--sqlite", path.as_posix()])
+        assert result.exit_code == 0, result.output
+        assert f"modules written: {written}, removed: 0" in result.output
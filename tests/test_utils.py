@@ -1,8 +1,10 @@
+import os
 import pathlib
+import sys
 
 import pytest
 
-from codegraph.utils import get_python_paths_list
+from codegraph.utils import IgnorePatterns, get_python_paths_list
 
 
 def test_get_python_paths_list_error():
@@ -15,7 +17,137 @@ def test_get_python_paths_list():
     base_path = pathlib.Path(__file__).parents[1] / "codegraph"
     expected = [
         (base_path / x).as_posix()
-        for x in ["__init__.py", "core.py", "parser.py", "utils.py", "vizualyzer.py", "main.py"]
+        for x in [
+            "__init__.py",
+            "cache.py",
+            "core.py",
+            "parser.py",
+            "utils.py",
+            "vizualyzer.py",
+            "main.py",
+            "watcher.py",
+            "graph_file.py",
+            "layout.py",
+            "git.py",
+            "diff.py",
+            "graph_state.py",
+            "store.py",
+        ]
     ]
     result = get_python_paths_list(base_path.as_posix())
     assert sorted(result) == sorted(expected)
+
+
+@pytest.fixture
+def code_tree(tmp_path):
+    for path in [
+        "pkg/module.py",
+        "pkg/sub/module.py",
+        "pkg/generated/schema.py",
+        "pkg/generated/keep.py",
+        "pkg/notes.txt",
+        ".venv/lib/site.py",
+        ".env/lib/six.py",
+        ".hidden.py",
+        "env/lib/site-packages/six.py",
+        "dist/pkg/module.py",
+        "node_modules/tool/script.py",
+        "build/lib/pkg/module.py",
+        "pkg/build/module.py",
+        "tests/test_module.py",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    (tmp_path / ".gitignore").write_text("# generated code\ngenerated/\n")
+    (tmp_path / ".git").mkdir()
+    return tmp_path
+
+
+def relative_paths(paths, base):
+    return [pathlib.Path(path).relative_to(base).as_posix() for path in paths]
+
+
+def test_default_excludes_and_gitignore(code_tree):
+    result = get_python_paths_list(code_tree.as_posix())
+    # package named as build folder is not skipped
+    assert relative_paths(result, code_tree) == [
+        "pkg/build/module.py",
+        "pkg/module.py",
+        "pkg/sub/module.py",
+        "tests/test_module.py",
+    ]
+
+    result = get_python_paths_list(code_tree.as_posix(), gitignore=False)
+    assert "pkg/generated/schema.py" in relative_paths(result, code_tree)
+
+
+def test_hidden_paths_are_skipped(code_tree):
+    result = relative_paths(get_python_paths_list(code_tree.as_posix(), gitignore=False), code_tree)
+    assert not [path for path in result if path.startswith((".", "env/", "dist/"))]
+
+    result = get_python_paths_list(code_tree.as_posix(), exclude=["!.hidden.py"], gitignore=False)
+    assert ".hidden.py" in relative_paths(result, code_tree)
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or sys.platform == "win32", reason="symlinks are not supported")
+def test_symlinks_to_folders_are_followed(tmp_path):
+    (tmp_path / "real" / "pkg").mkdir(parents=True)
+    (tmp_path / "real" / "pkg" / "module.py").write_text("")
+    root = tmp_path / "root"
+    root.mkdir()
+    os.symlink(tmp_path / "real" / "pkg", root / "pkg", target_is_directory=True)
+    # symlink back to root is not walked again
+    os.symlink(root, tmp_path / "real" / "pkg" / "loop", target_is_directory=True)
+
+    result = get_python_paths_list(root.as_posix())
+    assert relative_paths(result, root) == ["pkg/module.py"]
+
+
+def test_nested_gitignore_re_includes(code_tree):
+    (code_tree / "pkg" / "generated" / ".gitignore").write_text("schema.py\n")
+    (code_tree / ".gitignore").write_text("/pkg/generated/*\n!keep.py\n")
+
+    result = get_python_paths_list(code_tree.as_posix())
+    assert "pkg/generated/keep.py" in relative_paths(result, code_tree)
+    assert "pkg/generated/schema.py" not in relative_paths(result, code_tree)
+
+
+def test_exclude_and_include(code_tree):
+    result = get_python_paths_list(code_tree.as_posix(), exclude=["tests/", "!build"], gitignore=False)
+    assert relative_paths(result, code_tree) == [
+        "build/lib/pkg/module.py",
+        "pkg/build/module.py",
+        "pkg/generated/keep.py",
+        "pkg/generated/schema.py",
+        "pkg/module.py",
+        "pkg/sub/module.py",
+    ]
+
+    result = get_python_paths_list(code_tree.as_posix(), include=["pkg/sub", "test_*.py"])
+    assert relative_paths(result, code_tree) == ["pkg/sub/module.py", "tests/test_module.py"]
+
+
+def test_paths_are_sorted_without_duplicates(code_tree):
+    result = get_python_paths_list([(code_tree / "pkg").as_posix(), (code_tree / "pkg" / "sub").as_posix()])
+    assert relative_paths(result, code_tree) == ["pkg/module.py", "pkg/sub/module.py"]
+
+
+def test_parallel_walk(code_tree):
+    assert get_python_paths_list(code_tree.as_posix(), jobs=4) == get_python_paths_list(code_tree.as_posix())
+
+
+@pytest.mark.parametrize(
+    "pattern, path, is_dir, expected",
+    [
+        ("*.pyc", "pkg/module.pyc", False, True),
+        ("/build", "build", True, True),
+        ("/build", "pkg/build", True, None),
+        ("docs/", "docs", False, None),
+        ("pkg/**/gen_*.py", "pkg/a/b/gen_models.py", False, True),
+        ("pkg/**/gen_*.py", "pkg/gen_models.py", False, True),
+        ("module_[!ab].py", "module_c.py", False, True),
+        ("module_[!ab].py", "module_a.py", False, None),
+    ],
+)
+def test_ignore_patterns(pattern, path, is_dir, expected):
+    assert IgnorePatterns([pattern]).match(path, is_dir) is expected
@@ -0,0 +1,109 @@
+"""Tests for watching python files changes."""
+import copy
+import os
+import pathlib
+from argparse import Namespace
+
+from codegraph import main
+from codegraph.watcher import Watcher
+
+
+def touch(path: pathlib.Path, source: str) -> None:
+    path.write_text(source)
+    # make sure mtime differs even on file systems with low mtime resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_poll_changes(tmp_path):
+    module_a = tmp_path / "module_a.py"
+    module_b = tmp_path / "module_b.py"
+    module_a.write_text("def func_a():\n    pass\n")
+    module_b.write_text("def func_b():\n    pass\n")
+    watcher = Watcher(tmp_path.as_posix())
+
+    assert watcher.poll() == ([], [])
+
+    touch(module_a, "def func_a2():\n    pass\n")
+    module_b.unlink()
+    module_c = tmp_path / "module_c.py"
+    module_c.write_text("def func_c():\n    pass\n")
+
+    changed, deleted = watcher.poll()
+    assert sorted(changed) == [module_a.as_posix(), module_c.as_posix()]
+    assert deleted == [module_b.as_posix()]
+    assert watcher.poll() == ([], [])
+
+
+def test_wait_changes(tmp_path):
+    module_a = tmp_path / "module_a.py"
+    module_a.write_text("def func_a():\n    pass\n")
+    watcher = Watcher(tmp_path.as_posix(), interval=0.01, debounce=0.01)
+
+    touch(module_a, "def func_a2():\n    pass\n")
+    assert watcher.wait_changes() == ([module_a.as_posix()], [])
+
+
+def test_watch_updates_output(tmp_path, monkeypatch):
+    module_a = tmp_path / "module_a.py"
+    module_a.write_text("def func_a():\n    pass\n")
+    outputs = []
+
+    def wait_changes(self):
+        if len(outputs) > 1:
+            raise KeyboardInterrupt
+        touch(module_a, "def func_a():\n    func_a2()\n\n\ndef func_a2():\n    pass\n")
+        return [module_a.as_posix()], []
+
+    monkeypatch.setattr(Watcher, "wait_changes", wait_changes)
+    monkeypatch.setattr(main.pprint, "pprint", outputs.append)
+    args = Namespace(
+        paths=[tmp_path.as_posix()],
+        object_only=True,
+        file_path=None,
+        distance=None,
+        watch=True,
+    )
+    main.main(args)
+
+    assert len(outputs) == 2
+    assert outputs[-1][module_a.as_posix()]["func_a"] == ["func_a2"]
+
+
+def test_watch_skips_broken_module(tmp_path, monkeypatch, capsys):
+    module_a = tmp_path / "module_a.py"
+    module_a.write_text("def func_a():\n    pass\n")
+    missing = tmp_path / "module_b.py"
+    outputs = []
+    sources = [
+        # saved in the middle of editing and file deleted before it is read
+        ('def func_a():\n    """unterminated', [module_a.as_posix(), missing.as_posix()]),
+        ("def func_a():\n    func_a2()\n\n\ndef func_a2():\n    pass\n", [module_a.as_posix()]),
+    ]
+
+    def wait_changes(self):
+        if not sources:
+            raise KeyboardInterrupt
+        source, changed = sources.pop(0)
+        touch(module_a, source)
+        return changed, []
+
+    monkeypatch.setattr(Watcher, "wait_changes", wait_changes)
+    # graph is patched in place, so copy of each output is kept
+    monkeypatch.setattr(main.pprint, "pprint", lambda graph: outputs.append(copy.deepcopy(graph)))
+    args = Namespace(
+        paths=[tmp_path.as_posix()],
+        object_only=True,
+        file_path=None,
+        distance=None,
+        watch=True,
+    )
+    main.main(args)
+
+    assert len(outputs) == 3
+    # graph is not changed by broken module
+    assert outputs[1][module_a.as_posix()] == {"func_a": []}
+    assert outputs[2][module_a.as_posix()]["func_a"] == ["func_a2"]
+    errors = capsys.readouterr().err
+    assert f"Skipped {module_a.as_posix()}: TokenError" in errors
+    assert f"Skipped {missing.as_posix()}: FileNotFoundError" in errors